@@ -19,12 +19,17 @@
 
 __version__ = "1.4.2"  # noqa: F401
 
-from .base import Base  # noqa: F401
+from .base import Base, SetupLayer  # noqa: F401
 from .errors import ProviderError  # noqa: F401
-from .executor import Executor  # noqa: F401
+from .executor import Executor, FileContent  # noqa: F401
+from .parallel import LaunchResult, LaunchSpec  # noqa: F401
 
 __all__ = [
     "Base",
     "Executor",
+    "FileContent",
+    "LaunchResult",
+    "LaunchSpec",
     "ProviderError",
+    "SetupLayer",
 ]
@@ -208,18 +208,14 @@ def inject_from_host(*, executor: Executor, snap_name: str, classic: bool) -> No
 
     target_snap_path = pathlib.Path(f"/tmp/{snap_name}.snap")
     try:
-        # Clean outdated snap, if exists.
-        executor.execute_run(
-            ["rm", "-f", target_snap_path.as_posix()],
-            check=True,
-            capture_output=True,
-        )
-
         with _get_host_snap(snap_name) as host_snap_path:
             try:
+                # An outdated snap from a previous injection is replaced, but
+                # an identical one need not be transferred again.
                 executor.push_file(
                     source=host_snap_path,
                     destination=target_snap_path,
+                    skip_if_unchanged=True,
                 )
             except ProviderError as error:
                 raise SnapInstallationError(
@@ -17,15 +17,29 @@
 
 """Base configuration module."""
 
+import dataclasses
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 
 from .executor import Executor
 
 logger = logging.getLogger(__name__)
 
 
+@dataclasses.dataclass(frozen=True)
+class SetupLayer:
+    """Stage of setup after which an instance may be snapshotted.
+
+    :param name: Name of stage, e.g. "packages".
+    :param fingerprint: Digest of the inputs of this stage and all earlier
+        ones, which changes whenever an instance set up to this stage would.
+    """
+
+    name: str
+    fingerprint: str
+
+
 class Base(ABC):
     """Interface for providers to configure instantiated environments.
 
@@ -63,6 +77,17 @@ class Base(ABC):
                   indicate that a value should be unset.
         """
 
+    def get_setup_layers(self) -> List[SetupLayer]:
+        """Get the stages of setup after which an instance may be snapshotted.
+
+        The layers are those which setup() may resume after, and for which
+        it calls its layer_callback.
+
+        :returns: Layers, in the order set up.  By default there are none, as
+            setup is not done in stages.
+        """
+        return []
+
     @abstractmethod
     def setup(
         self,
@@ -70,6 +95,8 @@ class Base(ABC):
         executor: Executor,
         retry_wait: float = 0.25,
         timeout: Optional[float] = None,
+        resume_after: Optional[str] = None,
+        layer_callback: Optional[Callable[[str], None]] = None,
     ) -> None:
         """Prepare base instance for use by the application.
 
@@ -87,6 +114,10 @@ class Base(ABC):
         :param retry_wait: Duration to sleep() between status checks (if
             required).
         :param timeout: Timeout in seconds.
+        :param resume_after: Name of the layer from get_setup_layers() from
+            which the instance was created, to only set up later stages.
+        :param layer_callback: Function called with the name of each layer
+            when its stage has completed.
 
         :raises BaseCompatibilityError: if instance is incompatible.
         :raises BaseConfigurationError: on other unexpected error.
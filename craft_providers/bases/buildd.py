@@ -16,7 +16,9 @@
 #
 
 """Buildd image(s)."""
+
 import enum
+import functools
 import io
 import logging
 import pathlib
@@ -26,15 +28,17 @@ import sys
 import time
 from textwrap import dedent
 from time import sleep
-from typing import Dict, List, Optional, Type
+from typing import Callable, Dict, List, Optional, Type
 
 import pydantic
 from pydantic import ValidationError
 
-from craft_providers import Base, Executor, errors
+from craft_providers import Base, Executor, FileContent, errors, instrumentation
 from craft_providers.actions import snap_installer
+from craft_providers.base import SetupLayer
 from craft_providers.util.os_release import parse_os_release
 
+from . import setup_layers
 from .errors import BaseCompatibilityError, BaseConfigurationError
 from .instance_config import InstanceConfiguration
 
@@ -78,6 +82,11 @@ def _check_deadline(
         raise BaseConfigurationError(brief=message)
 
 
+def _get_deadline(timeout: Optional[float]) -> Optional[float]:
+    """Get the time.time() deadline for a timeout in seconds, if any."""
+    return None if timeout is None else time.time() + timeout
+
+
 class BuilddBaseAlias(enum.Enum):
     """Mappings for supported buildd images."""
 
@@ -202,6 +211,7 @@ class BuilddBase(Base):
         logger.debug("Using hostname %r", valid_name)
         self.hostname = valid_name
 
+    @instrumentation.traced("buildd.ensure_instance_config_compatible")
     def _ensure_instance_config_compatible(
         self, *, executor: Executor, deadline: Optional[float]
     ) -> None:
@@ -240,6 +250,7 @@ class BuilddBase(Base):
             "Instance is compatible with compatibility tag %r", config.compatibility_tag
         )
 
+    @instrumentation.traced("buildd.ensure_os_compatible")
     def _ensure_os_compatible(
         self, *, executor: Executor, deadline: Optional[float]
     ) -> None:
@@ -294,12 +305,62 @@ class BuilddBase(Base):
         """
         return self.environment.copy()
 
+    def get_setup_layers(self) -> List[SetupLayer]:
+        """Get the stages of setup after which an instance may be snapshotted.
+
+        The stages are:
+          - system: OS, network and apt configured
+          - snapd: snapd installed and ready
+          - packages: packages installed
+
+        Snaps are not part of any layer, as injected snaps depend on the host.
+        Neither is the hostname, which is applied when resuming from a layer.
+
+        :returns: Layers, in the order set up.
+        """
+        # Propagated to the instance by _setup_snapd().
+        no_cdn = pathlib.Path("/etc/systemd/system/snapd.service.d/no-cdn.conf")
+        system = [self.alias.value, self.compatibility_tag, self.environment]
+        return setup_layers.fingerprint_layers(
+            [
+                ("system", system),
+                ("snapd", {"no_cdn": no_cdn.read_text() if no_cdn.exists() else None}),
+                ("packages", {"packages": self.packages or []}),
+            ]
+        )
+
+    @instrumentation.traced("buildd.setup_system")
+    def _setup_system(
+        self, *, executor: Executor, deadline: Optional[float], retry_wait: float
+    ) -> None:
+        """Configure OS, network and apt.
+
+        :param executor: Executor for target container.
+        :param deadline: Optional time.time() deadline.
+        :param retry_wait: Duration to sleep() between status checks.
+        """
+        self._setup_files(executor=executor, deadline=deadline)
+        self._setup_wait_for_system_ready(
+            executor=executor, deadline=deadline, retry_wait=retry_wait
+        )
+        self._setup_instance_config(executor=executor, deadline=deadline)
+        self._setup_hostname(executor=executor, deadline=deadline)
+        self._setup_resolved(executor=executor, deadline=deadline)
+        self._setup_networkd(executor=executor, deadline=deadline)
+        self._setup_wait_for_network(
+            executor=executor, deadline=deadline, retry_wait=retry_wait
+        )
+        self._setup_apt(executor=executor, deadline=deadline)
+
+    @instrumentation.traced("buildd.setup")
     def setup(
         self,
         *,
         executor: Executor,
         retry_wait: float = 0.25,
         timeout: Optional[float] = None,
+        resume_after: Optional[str] = None,
+        layer_callback: Optional[Callable[[str], None]] = None,
     ) -> None:
         """Prepare base instance for use by the application.
 
@@ -325,34 +386,45 @@ class BuilddBase(Base):
         :param retry_wait: Duration to sleep() between status checks (if
             required).
         :param timeout: Timeout in seconds.
+        :param resume_after: Name of the layer from get_setup_layers() from
+            which the instance was created, to only set up later stages.
+        :param layer_callback: Function called with the name of each layer
+            when its stage has completed, e.g. to snapshot the instance.
 
         :raises BaseCompatibilityError: if instance is incompatible.
         :raises BaseConfigurationError: on other unexpected error.
         """
-        if timeout is not None:
-            deadline: Optional[float] = time.time() + timeout
-        else:
-            deadline = None
+        deadline = _get_deadline(timeout)
+
+        stages: List[setup_layers.SetupStage] = [
+            ("system", functools.partial(self._setup_system, retry_wait=retry_wait)),
+            ("snapd", self._setup_snapd),
+            ("packages", self._setup_packages),
+        ]
+        stages = setup_layers.get_stages_after(stages, resume_after)
 
         self._ensure_os_compatible(executor=executor, deadline=deadline)
         self._ensure_instance_config_compatible(executor=executor, deadline=deadline)
-        self._disable_automatic_apt(executor=executor, deadline=deadline)
-        self._setup_environment(executor=executor, deadline=deadline)
-        self._setup_wait_for_system_ready(
-            executor=executor, deadline=deadline, retry_wait=retry_wait
-        )
-        self._setup_instance_config(executor=executor, deadline=deadline)
-        self._setup_hostname(executor=executor, deadline=deadline)
-        self._setup_resolved(executor=executor, deadline=deadline)
-        self._setup_networkd(executor=executor, deadline=deadline)
-        self._setup_wait_for_network(
-            executor=executor, deadline=deadline, retry_wait=retry_wait
+
+        if resume_after is not None:
+            # The instance has been booted from a layer of an earlier setup,
+            # which may have been set up with another hostname.
+            self._setup_wait_for_system_ready(
+                executor=executor, deadline=deadline, retry_wait=retry_wait
+            )
+            self._setup_hostname(executor=executor, deadline=deadline)
+            self._setup_wait_for_network(
+                executor=executor, deadline=deadline, retry_wait=retry_wait
+            )
+
+        setup_layers.run_stages(
+            stages, executor=executor, deadline=deadline, layer_callback=layer_callback
         )
-        self._setup_apt(executor=executor, deadline=deadline)
-        self._setup_snapd(executor=executor, deadline=deadline)
+
         self._setup_snapd_proxy(executor=executor, deadline=deadline)
         self._install_snaps(executor=executor, deadline=deadline)
 
+    @instrumentation.traced("buildd.warmup")
     def warmup(
         self,
         *,
@@ -378,10 +450,7 @@ class BuilddBase(Base):
         :raises BaseCompatibilityError: if instance is incompatible.
         :raises BaseConfigurationError: on other unexpected error.
         """
-        if timeout is not None:
-            deadline: Optional[float] = time.time() + timeout
-        else:
-            deadline = None
+        deadline = _get_deadline(timeout)
 
         self._ensure_os_compatible(executor=executor, deadline=deadline)
         self._ensure_instance_config_compatible(executor=executor, deadline=deadline)
@@ -394,33 +463,7 @@ class BuilddBase(Base):
         self._setup_snapd_proxy(executor=executor, deadline=deadline)
         self._install_snaps(executor=executor, deadline=deadline)
 
-    def _disable_automatic_apt(
-        self, *, executor: Executor, deadline: Optional[float]
-    ) -> None:
-        """Disable automatic apt actions.
-
-        This should happen as soon as possible in the instance overall setup,
-        to reduce the chances of an automatic apt work being triggered during
-        the setup itself (because it includes apt work which may clash
-        the triggered unattended jobs).
-
-        :param executor: Executor for target container.
-        :param deadline: Optional time.time() deadline.
-        """
-        _check_deadline(deadline)
-        # set the verification frequency in 10000 days and disable the upgrade
-        content = dedent(
-            """\
-            APT::Periodic::Update-Package-Lists "10000";
-            APT::Periodic::Unattended-Upgrade "0";
-        """
-        ).encode()
-        executor.push_file_io(
-            destination=pathlib.Path("/etc/apt/apt.conf.d/20auto-upgrades"),
-            content=io.BytesIO(content),
-            file_mode="0644",
-        )
-
+    @instrumentation.traced("buildd.install_snaps")
     def _install_snaps(self, *, executor: Executor, deadline: Optional[float]) -> None:
         """Install snaps.
 
@@ -490,26 +533,15 @@ class BuilddBase(Base):
                         )
                     ) from error
 
+    @instrumentation.traced("buildd.setup_apt")
     def _setup_apt(self, *, executor: Executor, deadline: Optional[float]) -> None:
-        """Configure apt, update cache and install needed packages.
+        """Update apt cache and install packages needed by setup.
+
+        The apt configuration is written by _setup_files().
 
         :param executor: Executor for target container.
         :param deadline: Optional time.time() deadline.
         """
-        _check_deadline(deadline)
-        executor.push_file_io(
-            destination=pathlib.Path("/etc/apt/apt.conf.d/00no-recommends"),
-            content=io.BytesIO('APT::Install-Recommends "false";\n'.encode()),
-            file_mode="0644",
-        )
-
-        _check_deadline(deadline)
-        executor.push_file_io(
-            destination=pathlib.Path("/etc/apt/apt.conf.d/00update-errors"),
-            content=io.BytesIO('APT::Update::Error-Mode "any";\n'.encode()),
-            file_mode="0644",
-        )
-
         try:
             _check_deadline(deadline)
             executor.execute_run(
@@ -523,15 +555,34 @@ class BuilddBase(Base):
                 details=errors.details_from_called_process_error(error),
             ) from error
 
-        # install required packages and user-defined packages
-        packages_to_install = ["apt-utils", "curl"]
-        if self.packages:
-            packages_to_install.extend(self.packages)
+        try:
+            _check_deadline(deadline)
+            executor.execute_run(
+                ["apt-get", "install", "-y", "apt-utils", "curl"],
+                capture_output=True,
+                check=True,
+            )
+        except subprocess.CalledProcessError as error:
+            raise BaseConfigurationError(
+                brief="Failed to install packages.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    @instrumentation.traced("buildd.setup_packages")
+    def _setup_packages(self, *, executor: Executor, deadline: Optional[float]) -> None:
+        """Install user-defined packages.
+
+        :param executor: Executor for target container.
+        :param deadline: Optional time.time() deadline.
+        """
+        if not self.packages:
+            logger.debug("No packages to install.")
+            return
 
         try:
             _check_deadline(deadline)
             executor.execute_run(
-                ["apt-get", "install", "-y"] + packages_to_install,
+                ["apt-get", "install", "-y"] + self.packages,
                 capture_output=True,
                 check=True,
             )
@@ -541,36 +592,77 @@ class BuilddBase(Base):
                 details=errors.details_from_called_process_error(error),
             ) from error
 
-    def _setup_environment(
-        self,
-        *,
-        executor: Executor,
-        deadline: Optional[float],
-    ) -> None:
-        """Configure /etc/environment.
+    @instrumentation.traced("buildd.setup_files")
+    def _setup_files(self, *, executor: Executor, deadline: Optional[float]) -> None:
+        """Write configuration files in a single transfer.
 
-        If environment is None, reset /etc/environment to the default.
+        This should happen as soon as possible in the instance overall setup,
+        to reduce the chances of an automatic apt work being triggered during
+        the setup itself (because it includes apt work which may clash
+        the triggered unattended jobs).
+
+        Installs:
+        - apt configuration disabling automatic actions and recommends
+        - /etc/environment (reset to the default if environment is None)
+        - eth0 network configuration using ipv4
 
         :param executor: Executor for target container.
         :param deadline: Optional time.time() deadline.
         """
-        content = (
+        environment = (
             "\n".join(
                 [f"{k}={v}" for k, v in self.environment.items() if v is not None]
             )
             + "\n"
-        ).encode()
+        )
+        # set the verification frequency in 10000 days and disable the upgrade
+        auto_upgrades = dedent(
+            """\
+            APT::Periodic::Update-Package-Lists "10000";
+            APT::Periodic::Unattended-Upgrade "0";
+            """
+        )
+        network = dedent(
+            """\
+            [Match]
+            Name=eth0
+
+            [Network]
+            DHCP=ipv4
+            LinkLocalAddressing=ipv6
+
+            [DHCP]
+            RouteMetric=100
+            UseMTU=true
+            """
+        )
+        files = {
+            "/etc/apt/apt.conf.d/20auto-upgrades": auto_upgrades,
+            "/etc/environment": environment,
+            "/etc/systemd/network/10-eth0.network": network,
+            "/etc/apt/apt.conf.d/00no-recommends": 'APT::Install-Recommends "false";\n',
+            "/etc/apt/apt.conf.d/00update-errors": 'APT::Update::Error-Mode "any";\n',
+        }
 
         _check_deadline(deadline)
-        executor.push_file_io(
-            destination=pathlib.Path("/etc/environment"),
-            content=io.BytesIO(content),
-            file_mode="0644",
+        executor.push_files_io(
+            [
+                FileContent(
+                    destination=pathlib.Path(path),
+                    content=io.BytesIO(content.encode()),
+                    file_mode="0644",
+                )
+                for path, content in files.items()
+            ]
         )
 
+    @instrumentation.traced("buildd.setup_hostname")
     def _setup_hostname(self, *, executor: Executor, deadline: Optional[float]) -> None:
         """Configure hostname, installing /etc/hostname.
 
+        This must happen once the system is ready, as cloud-init may rewrite
+        /etc/hostname while booting.
+
         :param executor: Executor for target container.
         :param deadline: Optional time.time() deadline.
         """
@@ -594,6 +686,7 @@ class BuilddBase(Base):
                 details=errors.details_from_called_process_error(error),
             ) from error
 
+    @instrumentation.traced("buildd.setup_instance_config")
     def _setup_instance_config(
         self, *, executor: Executor, deadline: Optional[float]
     ) -> None:
@@ -604,36 +697,15 @@ class BuilddBase(Base):
         )
         _check_deadline(deadline)
 
+    @instrumentation.traced("buildd.setup_networkd")
     def _setup_networkd(self, *, executor: Executor, deadline: Optional[float]) -> None:
-        """Configure networkd and start it.
+        """Enable networkd and restart it.
 
-        Installs eth0 network configuration using ipv4.
+        The eth0 network configuration is written by _setup_files().
 
         :param executor: Executor for target container.
         :param deadline: Optional time.time() deadline.
         """
-        _check_deadline(deadline)
-        executor.push_file_io(
-            destination=pathlib.Path("/etc/systemd/network/10-eth0.network"),
-            content=io.BytesIO(
-                dedent(
-                    """\
-                [Match]
-                Name=eth0
-
-                [Network]
-                DHCP=ipv4
-                LinkLocalAddressing=ipv6
-
-                [DHCP]
-                RouteMetric=100
-                UseMTU=true
-                """
-                ).encode()
-            ),
-            file_mode="0644",
-        )
-
         try:
             _check_deadline(deadline)
             executor.execute_run(
@@ -654,6 +726,7 @@ class BuilddBase(Base):
                 details=errors.details_from_called_process_error(error),
             ) from error
 
+    @instrumentation.traced("buildd.setup_resolved")
     def _setup_resolved(self, *, executor: Executor, deadline: Optional[float]) -> None:
         """Configure system-resolved to manage resolve.conf.
 
@@ -692,6 +765,7 @@ class BuilddBase(Base):
                 details=errors.details_from_called_process_error(error),
             ) from error
 
+    @instrumentation.traced("buildd.setup_snapd")
     def _setup_snapd(
         self, *, executor: Executor, deadline: Optional[float] = None
     ) -> None:
@@ -780,6 +854,7 @@ class BuilddBase(Base):
                 details=errors.details_from_called_process_error(error),
             ) from error
 
+    @instrumentation.traced("buildd.setup_snapd_proxy")
     def _setup_snapd_proxy(
         self, *, executor: Executor, deadline: Optional[float] = None
     ) -> None:
@@ -811,6 +886,7 @@ class BuilddBase(Base):
                 details=errors.details_from_called_process_error(error),
             ) from error
 
+    @instrumentation.traced("buildd.setup_wait_for_network")
     def _setup_wait_for_network(
         self,
         *,
@@ -841,6 +917,7 @@ class BuilddBase(Base):
             )
             sleep(retry_wait)
 
+    @instrumentation.traced("buildd.setup_wait_for_system_ready")
     def _setup_wait_for_system_ready(
         self,
         *,
@@ -906,10 +983,7 @@ class BuilddBase(Base):
 
         :raises ProviderError: on timeout or unexpected error.
         """
-        if timeout is not None:
-            deadline: Optional[float] = time.time() + timeout
-        else:
-            deadline = None
+        deadline = _get_deadline(timeout)
 
         self._setup_wait_for_system_ready(
             executor=executor,
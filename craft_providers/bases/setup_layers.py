@@ -0,0 +1,97 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""Setup of bases in stages, after each of which an instance may be snapshotted."""
+
+import hashlib
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from craft_providers.base import SetupLayer
+from craft_providers.executor import Executor
+
+from .errors import BaseConfigurationError
+
+# Name of a stage of setup, and function running it with executor and deadline
+# keyword arguments.
+SetupStage = Tuple[str, Callable[..., None]]
+
+
+def fingerprint_layers(inputs: Sequence[Tuple[str, Any]]) -> List[SetupLayer]:
+    """Get the layers of the stages of setup with the given inputs.
+
+    The fingerprint of each layer is a digest of the inputs of its stage and
+    all earlier ones, so changes whenever an instance set up to it would.
+
+    :param inputs: Name of each stage and its inputs, serializable to JSON, in
+        the order set up.
+
+    :returns: Layers, in the order set up.
+    """
+    digest = hashlib.sha256()
+    layers = []
+    for name, stage_inputs in inputs:
+        digest.update(json.dumps([name, stage_inputs], sort_keys=True).encode())
+        layers.append(SetupLayer(name=name, fingerprint=digest.hexdigest()[:12]))
+    return layers
+
+
+def get_stages_after(
+    stages: Sequence[SetupStage], resume_after: Optional[str]
+) -> List[SetupStage]:
+    """Get the stages of setup left after resuming from a layer.
+
+    :param stages: Stages of setup, in order.
+    :param resume_after: Name of the layer from which the instance was
+        created, or None to get all stages.
+
+    :returns: Stages after resume_after.
+
+    :raises BaseConfigurationError: If there is no stage named resume_after.
+    """
+    names = [name for name, _ in stages]
+    if resume_after is None:
+        return list(stages)
+
+    if resume_after not in names:
+        raise BaseConfigurationError(
+            brief=f"Unknown setup layer {resume_after!r}.",
+            details=f"Setup layers: {names!r}",
+        )
+    start = names.index(resume_after) + 1
+    return list(stages[start:])
+
+
+def run_stages(
+    stages: Sequence[SetupStage],
+    *,
+    executor: Executor,
+    deadline: Optional[float],
+    layer_callback: Optional[Callable[[str], None]],
+) -> None:
+    """Run stages of setup, calling back once each has completed.
+
+    :param stages: Stages of setup to run, in order.
+    :param executor: Executor for target container.
+    :param deadline: Optional time.time() deadline.
+    :param layer_callback: Function called with the name of each stage once
+        it has completed, e.g. to snapshot the instance.
+    """
+    for name, stage in stages:
+        stage(executor=executor, deadline=deadline)
+        if layer_callback is not None:
+            layer_callback(name)
@@ -18,17 +18,81 @@
 """Executor module."""
 
 import contextlib
+import dataclasses
+import hashlib
 import io
 import logging
+import os
 import pathlib
 import subprocess
+import tarfile
 import tempfile
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Generator, List, Optional
+from typing import Any, Callable, Dict, Generator, List, Optional, Sequence
+
+from craft_providers import errors
 
 logger = logging.getLogger(__name__)
 
 
+@dataclasses.dataclass
+class FileContent:
+    """A file to create with Executor.push_files_io().
+
+    :param destination: Path to file.
+    :param content: Contents of file.
+    :param file_mode: File mode string (e.g. '0644').
+    :param group: File owner group.
+    :param user: File owner user.
+    """
+
+    destination: pathlib.PurePath
+    content: io.BytesIO
+    file_mode: str
+    group: str = "root"
+    user: str = "root"
+
+
+# Exit status of pull_tree's command if the source directory is missing, chosen
+# to be distinct from those of tar.
+_MISSING_DIRECTORY_STATUS = 66
+
+# Use the safest extraction filter where tarfile supports them.
+_EXTRACT_KWARGS: Dict[str, Any] = (
+    {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+)
+
+
+def _check_tar_member(member: tarfile.TarInfo, destination: pathlib.Path) -> None:
+    """Refuse to extract members which would escape destination.
+
+    :raises ProviderError: If member is unsafe.
+    """
+    root = os.path.realpath(destination)
+    name = os.path.normpath(member.name)
+    # The final component is replaced on extraction, so only its parent needs
+    # resolving.
+    target = os.path.join(
+        os.path.realpath(os.path.join(root, os.path.dirname(name))),
+        os.path.basename(name),
+    )
+    paths = [target]
+    if member.issym():
+        paths.append(
+            os.path.realpath(os.path.join(os.path.dirname(target), member.linkname))
+        )
+    elif member.islnk():
+        paths.append(os.path.realpath(os.path.join(root, member.linkname)))
+
+    if member.isdev() or any(
+        os.path.commonpath([root, path]) != root for path in paths
+    ):
+        raise errors.ProviderError(
+            brief=f"Refusing to extract unsafe archive member {member.name!r}."
+        )
+
+
 class Executor(ABC):
     """Interfaces to execute commands and move data in/out of an environment."""
 
@@ -131,19 +195,229 @@ class Executor(ABC):
         finally:
             local_filepath.unlink()
 
+    def pull_tree(
+        self,
+        *,
+        source: pathlib.PurePath,
+        destination: pathlib.Path,
+        include_globs: Optional[List[str]] = None,
+    ) -> None:
+        """Copy a directory tree from the environment to host.
+
+        The tree is archived by a single tar process in the environment and
+        streamed straight into extraction on the host, without an intermediate
+        archive file.  The destination directory is created if it does not
+        exist.
+
+        :param source: Environment directory to copy the contents of.
+        :param destination: Host directory to copy to.
+        :param include_globs: Optional patterns, relative to source, selecting
+            what to copy, e.g. ``["*.snap", "logs"]``.  They are matched as by
+            ``find -path``, so ``*`` also matches ``/``.  Matching directories
+            are copied with all their contents.  By default, everything is
+            copied.
+
+        :raises FileNotFoundError: If source directory does not exist.
+        :raises ProviderError: On error copying tree.
+        """
+        if include_globs is None:
+            script = 'cd -- "$1" && exec tar -c -f - .'
+            find_args: List[str] = []
+        else:
+            script = (
+                'cd -- "$1" && shift && find . "$@" -print0'
+                " | tar --null --files-from=- -c -f -"
+            )
+            find_args = ["("]
+            for glob in include_globs:
+                if len(find_args) > 1:
+                    find_args.append("-o")
+                find_args.extend(["-path", f"./{glob}", "-prune"])
+            find_args.append(")")
+
+        command = [
+            "sh",
+            "-c",
+            f'[ -d "$1" ] || exit {_MISSING_DIRECTORY_STATUS}; {script}',
+            "sh",
+            source.as_posix(),
+            *find_args,
+        ]
+
+        destination.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryFile() as stderr:
+            process = self.execute_popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+            )
+            tar_error: Optional[tarfile.TarError] = None
+            try:
+                with tarfile.open(
+                    fileobj=process.stdout, mode="r|"  # type: ignore
+                ) as archive:
+                    for member in archive:
+                        _check_tar_member(member, destination)
+                        archive.extract(member, path=destination, **_EXTRACT_KWARGS)
+                # Consume any trailing padding so tar can exit.
+                while process.stdout.read(io.DEFAULT_BUFFER_SIZE):  # type: ignore
+                    pass
+            except tarfile.TarError as error:
+                tar_error = error
+            finally:
+                process.stdout.close()  # type: ignore
+                returncode = process.wait()
+
+            if returncode == _MISSING_DIRECTORY_STATUS:
+                raise FileNotFoundError(f"Directory not found: {source.as_posix()!r}")
+
+            brief = (
+                f"Failed to pull directory {source.as_posix()!r}"
+                f" to {str(destination)!r}."
+            )
+            stderr.seek(0)
+            if tar_error is not None:
+                raise errors.ProviderError(
+                    brief=brief,
+                    details=(
+                        f"* Error: {tar_error}\n* Command output: {stderr.read()!r}"
+                    ),
+                ) from tar_error
+            if returncode != 0:
+                raise errors.ProviderError(
+                    brief=brief,
+                    details=errors.details_from_command_error(
+                        cmd=command, returncode=returncode, stderr=stderr.read()
+                    ),
+                )
+
     @abstractmethod
-    def push_file(self, *, source: pathlib.Path, destination: pathlib.PurePath) -> None:
+    def push_file(
+        self,
+        *,
+        source: pathlib.Path,
+        destination: pathlib.PurePath,
+        skip_if_unchanged: bool = False,
+    ) -> None:
         """Copy a file from the host into the environment.
 
         :param source: Host file to copy.
         :param destination: Target environment file path to copy to.  Parent
             directory (destination.parent) must exist.
+        :param skip_if_unchanged: Skip the transfer if destination already has
+            the same content, as checked by a digest computed in the
+            environment.
 
         :raises FileNotFoundError: If source file or destination's parent
             directory does not exist.
         :raises ProviderError: On error copying file.
         """
 
+    def push_tree(
+        self,
+        *,
+        source: pathlib.Path,
+        destination: pathlib.PurePath,
+        exclude: Optional[Callable[[pathlib.PurePosixPath], bool]] = None,
+    ) -> None:
+        """Copy a directory tree from the host into the environment.
+
+        The tree is streamed as a tar archive into a single tar process in the
+        environment, rather than copying each file in turn.  Files are owned
+        by root in the environment.  The destination directory is created if
+        it does not exist.
+
+        :param source: Host directory to copy the contents of.
+        :param destination: Target environment directory to copy to.
+        :param exclude: Optional filter called with the path of each file and
+            directory relative to source, which is skipped (along with its
+            contents) if it returns True.
+
+        :raises FileNotFoundError: If source directory does not exist.
+        :raises ProviderError: On error copying tree.
+        """
+        if not source.is_dir():
+            raise FileNotFoundError(f"Directory not found: {str(source)!r}")
+
+        def _filter(tarinfo: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+            if exclude is not None and exclude(pathlib.PurePosixPath(tarinfo.name)):
+                return None
+            tarinfo.uid = tarinfo.gid = 0
+            tarinfo.uname = tarinfo.gname = "root"
+            return tarinfo
+
+        def _add_members(archive: tarfile.TarFile) -> None:
+            for path in sorted(source.iterdir()):
+                archive.add(path, arcname=path.name, filter=_filter)
+
+        self._push_archive(
+            destination=destination,
+            add_members=_add_members,
+            brief=(
+                f"Failed to push directory {str(source)!r}"
+                f" to {destination.as_posix()!r}."
+            ),
+        )
+
+    def _push_archive(
+        self,
+        *,
+        destination: pathlib.PurePath,
+        add_members: Callable[[tarfile.TarFile], None],
+        brief: str,
+    ) -> None:
+        """Stream a tar archive into extraction in the environment.
+
+        :param destination: Environment directory to extract into, created if
+            it does not exist.
+        :param add_members: Called with the archive to add its members.
+        :param brief: Brief description for ProviderError, if raised.
+
+        :raises ProviderError: If extraction fails.
+        """
+        command = [
+            "sh",
+            "-c",
+            'mkdir -p -- "$1" && exec tar -x -f - -C "$1"',
+            "sh",
+            destination.as_posix(),
+        ]
+
+        with tempfile.TemporaryFile() as stderr:
+            # stderr goes to a file so that tar cannot block on it while the
+            # archive is being written.
+            process = self.execute_popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr,
+            )
+            try:
+                with tarfile.open(
+                    fileobj=process.stdin, mode="w|"  # type: ignore
+                ) as archive:
+                    add_members(archive)
+            except BrokenPipeError:
+                # tar exited early; its error is reported below.
+                pass
+            finally:
+                try:
+                    process.stdin.close()  # type: ignore
+                except BrokenPipeError:
+                    pass
+                returncode = process.wait()
+
+            if returncode != 0:
+                stderr.seek(0)
+                raise errors.ProviderError(
+                    brief=brief,
+                    details=errors.details_from_command_error(
+                        cmd=command, returncode=returncode, stderr=stderr.read()
+                    ),
+                )
+
     @abstractmethod
     def push_file_io(
         self,
@@ -153,6 +427,7 @@ class Executor(ABC):
         file_mode: str,
         group: str = "root",
         user: str = "root",
+        skip_if_unchanged: bool = False,
     ) -> None:
         """Create or replace a file with specified content and file mode.
 
@@ -161,7 +436,109 @@ class Executor(ABC):
         :param file_mode: File mode string (e.g. '0644').
         :param group: File owner group.
         :param user: File owner user.
+        :param skip_if_unchanged: Skip writing the file if destination already
+            has the same content, as checked by a digest computed in the
+            environment.  Its mode and owner are then left unchanged.
+        """
+
+    def _has_digest(self, destination: pathlib.PurePath, digest: str) -> bool:
+        """Check whether a file in the environment has the given SHA-256 digest.
+
+        :param destination: Path to file.
+        :param digest: Expected hex digest.
+
+        :returns: True if the file exists with that digest.
         """
+        proc = self.execute_run(
+            ["sha256sum", "--", destination.as_posix()],
+            capture_output=True,
+            check=False,
+        )
+        if proc.returncode != 0:
+            return False
+
+        # sha256sum escapes the line, prefixing it with a backslash, if the
+        # path contains special characters.
+        fields = proc.stdout.lstrip(b"\\").split(maxsplit=1)
+        unchanged = bool(fields) and fields[0].decode() == digest
+        if unchanged:
+            logger.debug("Skipping push of unchanged %s", destination.as_posix())
+        return unchanged
+
+    def _is_file_unchanged(
+        self, *, source: pathlib.Path, destination: pathlib.PurePath
+    ) -> bool:
+        """Check whether destination already has the content of host file source.
+
+        :param source: Host file.
+        :param destination: Path to file in environment.
+
+        :returns: True if the file would be unchanged by pushing source.
+        """
+        digest = hashlib.sha256()
+        with source.open("rb") as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return self._has_digest(destination, digest.hexdigest())
+
+    def _is_content_unchanged(
+        self, *, content: io.BytesIO, destination: pathlib.PurePath
+    ) -> bool:
+        """Check whether destination already has the remaining content.
+
+        The position of content is left unchanged.
+
+        :param content: Contents of file, from its current position.
+        :param destination: Path to file in environment.
+
+        :returns: True if the file would be unchanged by writing content.
+        """
+        position = content.tell()
+        digest = hashlib.sha256(content.read()).hexdigest()
+        content.seek(position)
+        return self._has_digest(destination, digest)
+
+    def push_files_io(self, files: Sequence[FileContent]) -> None:
+        """Create or replace several files in a single transfer.
+
+        The files are sent as one tar archive, extracted by a single tar
+        process in the environment, so writing many small files costs one
+        round trip rather than one or more per file.  Unlike push_file_io(),
+        missing parent directories are created.
+
+        :param files: Files to write, with absolute destinations.
+
+        :raises ProviderError: On error writing files.
+        """
+        if not files:
+            return
+
+        def _add_members(archive: tarfile.TarFile) -> None:
+            for file in files:
+                data = file.content.read()
+                tarinfo = tarfile.TarInfo(file.destination.as_posix().lstrip("/"))
+                tarinfo.size = len(data)
+                tarinfo.mode = int(file.file_mode, 8)
+                tarinfo.mtime = int(time.time())
+                # tar resolves names in the environment, falling back to IDs.
+                if file.user.isdigit():
+                    tarinfo.uid = int(file.user)
+                else:
+                    tarinfo.uname = file.user
+                if file.group.isdigit():
+                    tarinfo.gid = int(file.group)
+                else:
+                    tarinfo.gname = file.group
+                archive.addfile(tarinfo, io.BytesIO(data))
+
+        self._push_archive(
+            destination=pathlib.PurePosixPath("/"),
+            add_members=_add_members,
+            brief=(
+                "Failed to create files "
+                f"{[file.destination.as_posix() for file in files]!r}."
+            ),
+        )
 
     @abstractmethod
     def delete(self) -> None:
@@ -0,0 +1,466 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""Timing instrumentation for provider commands.
+
+Every command run through the lxc and multipass wrappers is reported to the
+registered hooks as a CommandTiming.  TimingCollector is a hook aggregating
+these into histograms per operation::
+
+    collector = instrumentation.TimingCollector()
+    instrumentation.add_hook(collector)
+    ...
+    print(collector.report())
+
+Phases of launching and setting up instances are reported to the registered
+span sinks as a Span, nested within the phase which was running in the same
+thread.  By default, span_recorder keeps them for a report of the time taken
+by each phase, which the caller can fetch and reset::
+
+    instrumentation.span_recorder.reset()
+    ...
+    print(instrumentation.span_recorder.report())
+
+Callers not interested in the report may remove span_recorder with
+remove_span_sink(), so that spans are not timed unless other sinks are
+registered.  SpanLogger is a sink logging a report of the phases run within
+each outermost one, e.g. launch(), once it ends.
+"""
+
+import bisect
+import contextlib
+import dataclasses
+import functools
+import logging
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, cast
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class CommandTiming:
+    """Timing of one provider command.
+
+    :param provider: Command-line tool which ran, e.g. "lxc" or "multipass".
+    :param subcommand: Operation invoked, e.g. "launch" or "image list".
+    :param project: LXD project, if any.
+    :param remote: LXD remote, if any.
+    :param duration: Wall time in seconds.
+    :param returncode: Exit code, or None if unknown because the command
+        failed to start or is still running in the background.
+    :param output_bytes: Bytes of captured stdout and stderr.
+    """
+
+    provider: str
+    subcommand: str
+    project: Optional[str]
+    remote: Optional[str]
+    duration: float
+    returncode: Optional[int]
+    output_bytes: int
+
+
+Hook = Callable[[CommandTiming], None]
+
+_hooks: List[Hook] = []
+
+
+def add_hook(hook: Hook) -> None:
+    """Register hook to be called with the timing of every provider command.
+
+    Hooks are called from the thread which ran the command, so must be
+    thread-safe.  Exceptions raised by hooks are logged and ignored.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Unregister a hook added with add_hook()."""
+    _hooks.remove(hook)
+
+
+def _output_size(output: Any) -> int:
+    if isinstance(output, (bytes, str)):
+        return len(output)
+    return 0
+
+
+def timed_run(
+    runner: Callable,
+    command: List[str],
+    *,
+    provider: str,
+    subcommand: str,
+    project: Optional[str] = None,
+    remote: Optional[str] = None,
+    **kwargs,
+) -> Any:
+    """Run command with runner, reporting its timing to the registered hooks.
+
+    :param runner: Execution function, e.g. subprocess.run or Popen.
+    :param command: Command to pass to runner.
+    :param provider: Name of tool being run.
+    :param subcommand: Operation invoked.
+    :param project: LXD project, if any.
+    :param remote: LXD remote, if any.
+    :param kwargs: Additional kwargs for runner.
+
+    :returns: Runner's result.
+    """
+    if not _hooks:
+        return runner(command, **kwargs)
+
+    returncode: Optional[int] = None
+    output_bytes = 0
+    start = time.monotonic()
+    try:
+        result = runner(command, **kwargs)
+        if isinstance(result, subprocess.CompletedProcess):
+            returncode = result.returncode
+            output_bytes = _output_size(result.stdout) + _output_size(result.stderr)
+        return result
+    except subprocess.CalledProcessError as error:
+        returncode = error.returncode
+        output_bytes = _output_size(error.stdout) + _output_size(error.stderr)
+        raise
+    finally:
+        timing = CommandTiming(
+            provider=provider,
+            subcommand=subcommand,
+            project=project,
+            remote=remote,
+            duration=time.monotonic() - start,
+            returncode=returncode,
+            output_bytes=output_bytes,
+        )
+        for hook in list(_hooks):
+            try:
+                hook(timing)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Instrumentation hook %r failed.", hook)
+
+
+# Upper bounds of histogram buckets, in seconds.
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclasses.dataclass
+class Histogram:
+    """Distribution of durations of one operation.
+
+    :param buckets: Upper bounds of buckets, in seconds.
+    :param counts: Number of durations per bucket, with a final bucket for
+        those beyond the last bound.
+    """
+
+    buckets: Tuple[float, ...]
+    counts: List[int]
+    total: float = 0.0
+    minimum: float = float("inf")
+    maximum: float = 0.0
+    failures: int = 0
+    output_bytes: int = 0
+
+    def add(self, timing: CommandTiming) -> None:
+        """Add timing to histogram."""
+        self.counts[bisect.bisect_left(self.buckets, timing.duration)] += 1
+        self.total += timing.duration
+        self.minimum = min(self.minimum, timing.duration)
+        self.maximum = max(self.maximum, timing.duration)
+        self.output_bytes += timing.output_bytes
+        if timing.returncode:
+            self.failures += 1
+
+    @property
+    def count(self) -> int:
+        """Number of durations."""
+        return sum(self.counts)
+
+    @property
+    def mean(self) -> float:
+        """Mean duration."""
+        return self.total / self.count if self.count else 0.0
+
+
+class TimingCollector:
+    """Hook aggregating command timings into histograms per operation.
+
+    Operations are keyed by provider and subcommand, e.g. ("lxc", "launch").
+
+    :param buckets: Upper bounds of histogram buckets, in seconds.
+    """
+
+    def __init__(self, *, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, timing: CommandTiming) -> None:
+        """Record timing."""
+        key = (timing.provider, timing.subcommand)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(
+                    buckets=self.buckets, counts=[0] * (len(self.buckets) + 1)
+                )
+                self._histograms[key] = histogram
+            histogram.add(timing)
+
+    @property
+    def histograms(self) -> Dict[Tuple[str, str], Histogram]:
+        """Copy of histograms collected so far, per operation."""
+        with self._lock:
+            return {
+                key: dataclasses.replace(histogram, counts=list(histogram.counts))
+                for key, histogram in self._histograms.items()
+            }
+
+    def reset(self) -> None:
+        """Discard collected timings."""
+        with self._lock:
+            self._histograms.clear()
+
+    def report(self) -> str:
+        """Summarize timings, operations taking the most total time first."""
+        histograms = sorted(
+            self.histograms.items(), key=lambda item: item[1].total, reverse=True
+        )
+        lines = [
+            f"{'operation':<30} {'count':>6} {'total':>9} {'mean':>8}"
+            f" {'min':>8} {'max':>8} {'failed':>6}"
+        ]
+        for (provider, subcommand), histogram in histograms:
+            lines.append(
+                f"{provider + ' ' + subcommand:<30} {histogram.count:>6}"
+                f" {histogram.total:>8.3f}s {histogram.mean:>7.3f}s"
+                f" {histogram.minimum:>7.3f}s {histogram.maximum:>7.3f}s"
+                f" {histogram.failures:>6}"
+            )
+        return "\n".join(lines)
+
+
+@dataclasses.dataclass(frozen=True)
+class Span:
+    """Timing of one phase, e.g. of launching or setting up an instance.
+
+    :param name: Name of phase, e.g. "buildd.setup_apt".
+    :param parents: Names of the phases within which this one ran, outermost
+        first.
+    :param start: When the phase started, in seconds since the epoch.
+    :param duration: Wall time in seconds.
+    :param error: Name of the exception raised by the phase, if any.
+    :param thread: Name of the thread which ran the phase.
+    """
+
+    name: str
+    parents: Tuple[str, ...]
+    start: float
+    duration: float
+    error: Optional[str]
+    thread: str
+
+    @property
+    def path(self) -> Tuple[str, ...]:
+        """Names of the enclosing phases and this one."""
+        return (*self.parents, self.name)
+
+
+SpanSink = Callable[[Span], None]
+
+_span_sinks: List[SpanSink] = []
+
+_span_stack = threading.local()
+
+
+def add_span_sink(sink: SpanSink) -> None:
+    """Register sink to be called with every span once it ends.
+
+    Sinks are called from the thread which ran the phase, so must be
+    thread-safe.  Exceptions raised by sinks are logged and ignored.
+    """
+    _span_sinks.append(sink)
+
+
+def remove_span_sink(sink: SpanSink) -> None:
+    """Unregister a sink added with add_span_sink()."""
+    _span_sinks.remove(sink)
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the phase run within the context, reporting it to the sinks.
+
+    :param name: Name of phase.
+    """
+    if not _span_sinks:
+        yield
+        return
+
+    start = time.time()
+    start_monotonic = time.monotonic()
+    stack: Optional[List[str]] = getattr(_span_stack, "names", None)
+    if stack is None:
+        stack = _span_stack.names = []
+    parents = tuple(stack)
+    stack.append(name)
+    error: Optional[str] = None
+    try:
+        yield
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        stack.pop()
+        timing = Span(
+            name=name,
+            parents=parents,
+            start=start,
+            duration=time.monotonic() - start_monotonic,
+            error=error,
+            thread=threading.current_thread().name,
+        )
+        for sink in list(_span_sinks):
+            try:
+                sink(timing)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Instrumentation span sink %r failed.", sink)
+
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def traced(name: str) -> Callable[[_F], _F]:
+    """Decorate function to run it within a span.
+
+    :param name: Name of phase.
+    """
+
+    def decorator(func: _F) -> _F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return cast(_F, wrapper)
+
+    return decorator
+
+
+def _report_spans(spans: List[Span]) -> str:
+    """Summarize spans per phase, nested phases indented under theirs.
+
+    Phases are listed in the order they first started.
+    """
+    first_start: Dict[Tuple[str, ...], float] = {}
+    groups: Dict[Tuple[str, ...], List[Span]] = {}
+    for timing in spans:
+        path = timing.path
+        first_start[path] = min(first_start.get(path, timing.start), timing.start)
+        groups.setdefault(path, []).append(timing)
+
+    def sort_key(path: Tuple[str, ...]) -> Tuple[float, ...]:
+        return tuple(
+            first_start.get(path[: i + 1], first_start[path]) for i in range(len(path))
+        )
+
+    lines = [
+        f"{'phase':<40} {'count':>6} {'total':>9} {'mean':>8}"
+        f" {'max':>8} {'failed':>6}"
+    ]
+    for path in sorted(groups, key=sort_key):
+        group = groups[path]
+        total = sum(timing.duration for timing in group)
+        maximum = max(timing.duration for timing in group)
+        failures = sum(1 for timing in group if timing.error is not None)
+        label = "  " * (len(path) - 1) + path[-1]
+        lines.append(
+            f"{label:<40} {len(group):>6}"
+            f" {total:>8.3f}s {total / len(group):>7.3f}s"
+            f" {maximum:>7.3f}s {failures:>6}"
+        )
+    return "\n".join(lines)
+
+
+class SpanRecorder:
+    """Sink keeping spans, for a report of the time taken by each phase."""
+
+    def __init__(self) -> None:
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, timing: Span) -> None:
+        """Record span."""
+        with self._lock:
+            self._spans.append(timing)
+
+    @property
+    def spans(self) -> List[Span]:
+        """Spans recorded so far, in the order they ended."""
+        with self._lock:
+            return list(self._spans)
+
+    def reset(self) -> None:
+        """Discard recorded spans."""
+        with self._lock:
+            self._spans.clear()
+
+    def report(self) -> str:
+        """Summarize spans per phase, nested phases indented under theirs.
+
+        Phases are listed in the order they first started.
+        """
+        return _report_spans(self.spans)
+
+
+class SpanLogger:
+    """Sink logging a report of the phases run within each outermost one.
+
+    Spans are kept per thread until the outermost phase running in it ends,
+    e.g. launch(), when the report of it and its nested phases is logged.
+
+    :param level: Level at which to log reports.
+    """
+
+    def __init__(self, *, level: int = logging.DEBUG) -> None:
+        self.level = level
+        self._pending = threading.local()
+
+    def __call__(self, timing: Span) -> None:
+        """Record span, logging the report if it is the outermost one."""
+        spans: Optional[List[Span]] = getattr(self._pending, "spans", None)
+        if spans is None:
+            spans = self._pending.spans = []
+        spans.append(timing)
+        if timing.parents:
+            return
+
+        self._pending.spans = []
+        if logger.isEnabledFor(self.level):
+            logger.log(
+                self.level,
+                "Timing of %s:\n%s",
+                timing.name,
+                _report_spans(spans),
+            )
+
+
+span_recorder = SpanRecorder()
+add_span_sink(span_recorder)
@@ -17,6 +17,8 @@
 
 """LXD environment provider."""
 
+from .async_lxc import AsyncLXC  # noqa: F401
+from .async_lxd_instance import AsyncLXDInstance  # noqa: F401
 from .errors import LXDError, LXDInstallationError  # noqa: F401
 from .installer import (  # noqa: F401
     ensure_lxd_is_ready,
@@ -25,23 +27,39 @@ from .installer import (  # noqa: F401
     is_installed,
     is_user_permitted,
 )
-from .launcher import launch  # noqa: F401
+from .launcher import launch, launch_many  # noqa: F401
 from .lxc import LXC  # noqa: F401
+from .lxc_api import LXCAPI  # noqa: F401
 from .lxd import LXD  # noqa: F401
 from .lxd_instance import LXDInstance  # noqa: F401
-from .remotes import configure_buildd_image_remote  # noqa: F401
+from .pool import InstancePool  # noqa: F401
+from .remotes import configure_buildd_image_remote, prefetch_images  # noqa: F401
+from .snapshot_images import (  # noqa: F401
+    SnapshotImage,
+    collect_snapshot_images,
+    list_snapshot_images,
+)
 
 __all__ = [
+    "AsyncLXC",
+    "AsyncLXDInstance",
+    "InstancePool",
     "LXC",
+    "LXCAPI",
     "LXD",
     "LXDInstance",
     "LXDError",
     "LXDInstallationError",
+    "SnapshotImage",
     "install",
     "is_installed",
     "is_initialized",
     "is_user_permitted",
     "ensure_lxd_is_ready",
     "configure_buildd_image_remote",
+    "prefetch_images",
     "launch",
+    "launch_many",
+    "collect_snapshot_images",
+    "list_snapshot_images",
 ]
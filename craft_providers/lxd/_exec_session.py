@@ -0,0 +1,162 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""Persistent shell channel for running commands in an instance."""
+
+import locale
+import logging
+import secrets
+import shlex
+import subprocess
+import threading
+from typing import Any, Dict, List, Optional
+
+from .errors import LXDError
+
+logger = logging.getLogger(__name__)
+
+
+# Keyword arguments of subprocess.run() which a session can honour.
+_SUPPORTED_KWARGS = {
+    "capture_output",
+    "check",
+    "encoding",
+    "errors",
+    "text",
+    "universal_newlines",
+}
+
+
+class ExecSession:
+    """Run commands through one long-lived shell in an instance.
+
+    Each command's output is captured to temporary files in the instance and
+    sent back framed by a header line holding a per-session marker, the exit
+    code and the sizes of stdout and stderr.  Commands are serialized, so a
+    session may be shared between threads.
+
+    :param process: Popen for a shell in the instance, with stdin and stdout
+        connected to pipes.
+    """
+
+    def __init__(self, process: subprocess.Popen) -> None:
+        self._process = process
+        self._lock = threading.Lock()
+        self._marker = f"craft-providers-{secrets.token_hex(8)}"
+
+        self._write(
+            'o=$(mktemp) && e=$(mktemp) || exit 1\ntrap \'rm -f "$o" "$e"\' EXIT\n'
+        )
+
+    @staticmethod
+    def supports(**kwargs) -> bool:
+        """Check if a subprocess.run() call can be served by a session.
+
+        Only captured, non-interactive commands are supported.
+        """
+        return bool(kwargs.get("capture_output")) and set(kwargs) <= _SUPPORTED_KWARGS
+
+    def _write(self, data: str) -> None:
+        try:
+            self._process.stdin.write(data.encode())  # type: ignore
+            self._process.stdin.flush()  # type: ignore
+        except (BrokenPipeError, ValueError) as error:
+            raise LXDError(brief="Exec session terminated unexpectedly.") from error
+
+    def _read(self, size: int) -> bytes:
+        data = self._process.stdout.read(size) if size else b""  # type: ignore
+        if len(data) != size:
+            raise LXDError(brief="Exec session terminated unexpectedly.")
+        return data
+
+    def run(
+        self,
+        command: List[str],
+        *,
+        cwd: Optional[str] = None,
+        check: bool = False,
+        **kwargs,
+    ) -> subprocess.CompletedProcess:
+        """Run command in session, as subprocess does.
+
+        :param command: Command to execute.
+        :param cwd: Optional working directory for command.
+        :param check: Raise CalledProcessError if command fails.
+        :param kwargs: Text decoding options as supported by subprocess.run().
+
+        :returns: Completed process.
+
+        :raises subprocess.CalledProcessError: if command fails and check is
+            True.
+        :raises LXDError: if the session terminated.
+        """
+        script = "exec " + shlex.join(command)
+        if cwd is not None:
+            script = f"cd {shlex.quote(cwd)} && {script}"
+
+        logger.debug("Executing in session: %s", shlex.join(command))
+
+        with self._lock:
+            self._write(
+                f'({script}) </dev/null >"$o" 2>"$e"; rc=$?\n'
+                f"printf '%s %s %s %s\\n' {self._marker} \"$rc\""
+                ' "$(wc -c <"$o")" "$(wc -c <"$e")"\n'
+                'cat "$o" "$e"\n'
+            )
+
+            header = self._process.stdout.readline().decode()  # type: ignore
+            fields = header.split()
+            if len(fields) != 4 or fields[0] != self._marker:
+                raise LXDError(
+                    brief="Exec session terminated unexpectedly.",
+                    details=f"* Unexpected output: {header!r}",
+                )
+
+            returncode, stdout_size, stderr_size = (int(f) for f in fields[1:])
+            stdout: Any = self._read(stdout_size)
+            stderr: Any = self._read(stderr_size)
+
+        if any(
+            kwargs.get(k) for k in ["text", "universal_newlines", "encoding", "errors"]
+        ):
+            stdout = _decode(stdout, kwargs)
+            stderr = _decode(stderr, kwargs)
+
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, command, output=stdout, stderr=stderr
+            )
+
+        return subprocess.CompletedProcess(
+            args=command, returncode=returncode, stdout=stdout, stderr=stderr
+        )
+
+    def close(self) -> None:
+        """Terminate the session's shell and wait for it to exit."""
+        try:
+            self._process.stdin.close()  # type: ignore
+        except BrokenPipeError:
+            pass
+        self._process.wait()
+        self._process.stdout.close()  # type: ignore
+
+
+def _decode(data: bytes, kwargs: Dict[str, Any]) -> str:
+    """Decode output the same way text mode in subprocess.run() does."""
+    encoding = kwargs.get("encoding") or locale.getpreferredencoding(False)
+    text = data.decode(encoding, kwargs.get("errors") or "strict")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
@@ -0,0 +1,493 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""asyncio wrapper for lxc."""
+
+import asyncio
+import logging
+import pathlib
+import shlex
+import subprocess
+from typing import Any, Dict, List, Optional
+
+from craft_providers import errors
+
+from .errors import LXDError
+from .lxc import (
+    _exec_command,
+    _file_pull_command,
+    _file_push_command,
+    _list_command,
+    _parse_info,
+    _parse_list,
+)
+
+logger = logging.getLogger(__name__)
+
+# The methods mirror those of LXC, whose commands are built by the same
+# helpers, so their signatures and calls are necessarily alike.
+# pylint: disable=duplicate-code
+
+
+class AsyncLXC:
+    """asyncio wrapper for lxc command-line interface.
+
+    Mirrors the instance lifecycle, exec, file transfer and publish methods
+    of LXC as coroutines, with each lxc command run as an asyncio subprocess,
+    so that many instances can be driven from one event loop.
+
+    :param lxc_path: Path to lxc command.
+    """
+
+    def __init__(
+        self,
+        *,
+        lxc_path: pathlib.Path = pathlib.Path("lxc"),
+    ):
+        self.lxc_path = lxc_path
+        self._server_info: Dict[str, Dict[str, Any]] = {}
+
+    async def _run_lxc(
+        self,
+        command: List[str],
+        *,
+        check: bool,
+        project: Optional[str] = None,
+        input: Optional[bytes] = None,  # pylint: disable=redefined-builtin
+    ) -> subprocess.CompletedProcess:
+        """Execute lxc command on host, capturing its output.
+
+        :param command: lxc command to execute.
+        :param check: Check if the lxc command exits with a non-zero exit code.
+        :param project: Name of LXD project.
+        :param input: Optional data to send to lxc's stdin.
+
+        :returns: Completed process.
+
+        :raises subprocess.CalledProcessError: if command fails and check is
+            True.
+        """
+        lxc_cmd = [str(self.lxc_path)]
+
+        if project is not None:
+            lxc_cmd += ["--project", project]
+
+        lxc_cmd += command
+
+        logger.debug("Executing on host: %s", shlex.join(lxc_cmd))
+
+        process = await asyncio.create_subprocess_exec(
+            *lxc_cmd,
+            stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate(input)
+        returncode: int = process.returncode  # type: ignore
+
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, lxc_cmd, output=stdout, stderr=stderr
+            )
+
+        return subprocess.CompletedProcess(
+            args=lxc_cmd, returncode=returncode, stdout=stdout, stderr=stderr
+        )
+
+    async def delete(
+        self,
+        *,
+        instance_name: str,
+        force: bool = False,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Delete instance.
+
+        :param instance_name: Name of instance.
+        :param force: Force deletion if running.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = ["delete", f"{remote}:{instance_name}"]
+
+        if force:
+            command.append("--force")
+
+        try:
+            await self._run_lxc(command, check=True, project=project)
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=f"Failed to delete instance {instance_name!r}.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    async def exec(
+        self,
+        *,
+        command: List[str],
+        instance_name: str,
+        cwd: Optional[str] = None,
+        mode: Optional[str] = None,
+        project: str = "default",
+        remote: str = "local",
+        **kwargs,
+    ) -> asyncio.subprocess.Process:  # pylint: disable=no-member
+        """Start command in instance_name as an asyncio subprocess.
+
+        :param command: Command to execute in the instance.
+        :param instance_name: Name of instance to execute in.
+        :param cwd: Optional current working directory for command.
+        :param mode: Override terminal mode Valid options include: "auto",
+            "interactive", "non-interactive". lxd default is "auto".
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+        :param kwargs: Additional kwargs for asyncio.create_subprocess_exec().
+
+        :returns: Process.
+        """
+        final_cmd = _exec_command(
+            lxc_path=self.lxc_path,
+            command=command,
+            instance_name=instance_name,
+            cwd=cwd,
+            mode=mode,
+            project=project,
+            remote=remote,
+        )
+
+        return await asyncio.create_subprocess_exec(*final_cmd, **kwargs)
+
+    async def file_pull(
+        self,
+        *,
+        instance_name: str,
+        source: pathlib.PurePath,
+        destination: pathlib.Path,
+        create_dirs: bool = False,
+        recursive: bool = False,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Retrieve file from instance_name.
+
+        :param instance_name: Name of instance.
+        :param source: Path in environment to pull.
+        :param destination: Path in host to write to.
+        :param create_dirs: Create any directories necessary.
+        :param recursive: Recursively transfer files.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = _file_pull_command(
+            instance_name=instance_name,
+            source=source,
+            destination=destination,
+            create_dirs=create_dirs,
+            recursive=recursive,
+            remote=remote,
+        )
+
+        try:
+            await self._run_lxc(command, check=True, project=project)
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=(
+                    f"Failed to pull file {source.as_posix()!r}"
+                    f" from instance {instance_name!r}."
+                ),
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    async def file_push(
+        self,
+        *,
+        instance_name: str,
+        source: pathlib.Path,
+        destination: pathlib.PurePath,
+        create_dirs: bool = False,
+        recursive: bool = False,
+        gid: Optional[int] = None,
+        uid: Optional[int] = None,
+        mode: Optional[str] = None,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Create file with content and file mode.
+
+        :param instance_name: Name of instance to push file to.
+        :param source: Path in host to push.
+        :param destination: Path in environment to write to.
+        :param create_dirs: Create any directories necessary.
+        :param recursive: Recursively transfer files.
+        :param gid: Optional gid to set on push (lxd's default is -1).
+        :param uid: Optional uid to set on push (lxd's default is -1).
+        :param mode: Optional file mode to set on file.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = _file_push_command(
+            instance_name=instance_name,
+            source=source,
+            destination=destination,
+            create_dirs=create_dirs,
+            recursive=recursive,
+            gid=gid,
+            uid=uid,
+            mode=mode,
+            remote=remote,
+        )
+
+        try:
+            await self._run_lxc(command, check=True, project=project)
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=(
+                    f"Failed to push file {source.as_posix()!r}"
+                    f" to instance {instance_name!r}."
+                ),
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    async def info(
+        self,
+        *,
+        instance_name: Optional[str] = None,
+        project: str = "default",
+        remote: str = "local",
+    ) -> Dict[str, Any]:
+        """Show instance or server information.
+
+        :param instance_name: Optional instance name.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if instance_name is None:
+            instance_name = ""
+
+        command = ["info", remote + ":" + instance_name]
+
+        try:
+            proc = await self._run_lxc(command, check=True, project=project)
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=f"Failed to get info for remote {remote!r}.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+        return _parse_info(proc)
+
+    async def server_info(
+        self, *, project: str = "default", remote: str = "local"
+    ) -> Dict[str, Any]:
+        """Show server information, memoized per remote as for LXC.
+
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :returns: Server information, as returned by info().
+
+        :raises LXDError: on unexpected error.
+        """
+        info = self._server_info.get(remote)
+        if info is None:
+            info = await self.info(project=project, remote=remote)
+            self._server_info[remote] = info
+
+        return info
+
+    async def launch(
+        self,
+        *,
+        instance_name: str,
+        image: str,
+        image_remote: str,
+        config_keys: Optional[Dict[str, Any]] = None,
+        ephemeral: bool = False,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Launch instance.
+
+        :param instance_name: Name of instance to launch.
+        :param image: Name of image to use.
+        :param image_remote: Name of image's remote.
+        :param config_keys: Configuration keys to set.
+        :param ephemeral: Use ephemeral instance.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = [
+            "launch",
+            f"{image_remote}:{image}",
+            f"{remote}:{instance_name}",
+        ]
+
+        if ephemeral:
+            command.append("--ephemeral")
+
+        if config_keys is not None:
+            for config_key in [f"{k}={v}" for k, v in config_keys.items()]:
+                command.extend(["--config", config_key])
+
+        try:
+            await self._run_lxc(command, check=True, project=project)
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=f"Failed to launch instance {instance_name!r}.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    async def list(
+        self,
+        *,
+        instance_name: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        project: str = "default",
+        remote: str = "local",
+    ) -> List[Dict[str, Any]]:
+        """List instances and their status.
+
+        :param instance_name: Only list the instance with this name.
+        :param columns: Only retrieve these columns, as for LXC.list().
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :returns: List of containers and their info.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = _list_command(
+            instance_name=instance_name, columns=columns, remote=remote
+        )
+
+        try:
+            proc = await self._run_lxc(command, check=True, project=project)
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=f"Failed to list instances for project {project!r}.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+        return _parse_list(proc, columns)
+
+    async def publish(
+        self,
+        *,
+        instance_name: str,
+        alias: Optional[str] = None,
+        force: bool = False,
+        image_remote: str = "local",
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Publish image from instance.
+
+        :param instance_name: Name of instance to publish image from.
+        :param alias: New alias to define at target.
+        :param force: Force publishing of image, even if container is running.
+        :param image_remote: Name of remote to publish image to.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote instance is found on.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = [
+            "publish",
+            f"{remote}:{instance_name}",
+            f"{image_remote}:",
+        ]
+
+        if alias is not None:
+            command.append(f"--alias={alias}")
+
+        if force:
+            command.append("--force")
+
+        try:
+            await self._run_lxc(command, check=True, project=project)
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=f"Failed to publish image from {instance_name!r}.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    async def start(
+        self, *, instance_name: str, project: str = "default", remote: str = "local"
+    ) -> None:
+        """Start container.
+
+        :param instance_name: Name of instance to start.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = ["start", f"{remote}:{instance_name}"]
+
+        try:
+            await self._run_lxc(command, check=True, project=project)
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=f"Failed to start {instance_name!r}.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    async def stop(
+        self,
+        *,
+        instance_name: str,
+        force: bool = False,
+        timeout: int = -1,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Stop container.
+
+        :param instance_name: Name of instance to stop.
+        :param force: Force instance to stop.
+        :param timeout: Timeout in seconds. -1 is no timeout.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = ["stop", f"{remote}:{instance_name}"]
+
+        if force:
+            command.append("--force")
+
+        if timeout != -1:
+            command.append(f"--timeout={timeout}")
+
+        try:
+            await self._run_lxc(command, check=True, project=project)
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=f"Failed to stop {instance_name!r}.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
@@ -0,0 +1,364 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""asyncio LXD Instance."""
+
+import io
+import logging
+import os
+import pathlib
+import subprocess
+from typing import Any, Dict, List, Optional
+
+from craft_providers import errors
+from craft_providers.util import env_cmd
+
+from . import instance_helpers
+from .async_lxc import AsyncLXC
+from .errors import LXDError
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLXDInstance:
+    """asyncio counterpart of LXDInstance.
+
+    Provides the lifecycle, command execution and file transfer methods of
+    LXDInstance as coroutines, using AsyncLXC.  Instance names are converted
+    exactly as LXDInstance does, so both refer to the same instance for a
+    given name.
+
+    :param name: Unique name of the lxd instance
+    :param default_command_environment: command environment
+    :param project: name of lxd project
+    :param remote: name of lxd remote
+    :param lxc: AsyncLXC instance object
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        default_command_environment: Optional[Dict[str, Optional[str]]] = None,
+        project: str = "default",
+        remote: str = "local",
+        lxc: Optional[AsyncLXC] = None,
+    ):
+        if default_command_environment is not None:
+            self.default_command_environment = default_command_environment
+        else:
+            self.default_command_environment = {}
+
+        self.name = name
+        self.project = project
+        self.remote = remote
+
+        # Convert the name exactly as the synchronous executor does.
+        self.instance_name = instance_helpers.formulate_instance_name(name)
+
+        if lxc is None:
+            self.lxc = AsyncLXC()
+        else:
+            self.lxc = lxc
+
+    def _finalize_lxc_command(
+        self,
+        command: List[str],
+        *,
+        env: Optional[Dict[str, Optional[str]]] = None,
+    ) -> List[str]:
+        """Wrap a command to run with the default and specified environment.
+
+        :param command: Command to execute.
+        :param env: Additional environment flags to set/unset.
+
+        :returns: List of command strings for lxc exec.
+        """
+        command_env = self.default_command_environment.copy()
+
+        if env:
+            command_env.update(env)
+
+        if command_env:
+            return env_cmd.formulate_command(command_env) + command
+
+        return command
+
+    async def delete(self, force: bool = True) -> None:
+        """Delete instance.
+
+        :param force: Delete even if running.
+
+        :raises LXDError: On unexpected error.
+        """
+        await self.lxc.delete(
+            instance_name=self.instance_name,
+            project=self.project,
+            remote=self.remote,
+            force=force,
+        )
+
+    async def execute_run(
+        self,
+        command: List[str],
+        *,
+        cwd: Optional[pathlib.Path] = None,
+        env: Optional[Dict[str, Optional[str]]] = None,
+        capture_output: bool = False,
+        check: bool = False,
+        input: Optional[bytes] = None,  # pylint: disable=redefined-builtin
+    ) -> subprocess.CompletedProcess:
+        """Execute a command, like subprocess.run().
+
+        The process' environment will inherit the execution environment's
+        default environment (PATH, etc.), but can be additionally configured via
+        env parameter.
+
+        :param command: Command to execute.
+        :param cwd: Optional working directory for command.
+        :param env: Additional environment to set for process.
+        :param capture_output: Capture stdout and stderr as bytes.
+        :param check: Raise CalledProcessError if command fails.
+        :param input: Optional data to send to the command's stdin.
+
+        :returns: Completed process.
+
+        :raises subprocess.CalledProcessError: if command fails and check is
+            True.
+        """
+        if cwd is None:
+            cwd_path = None
+        else:
+            cwd_path = cwd.as_posix()
+
+        final_cmd = self._finalize_lxc_command(command=command, env=env)
+        output = subprocess.PIPE if capture_output else None
+
+        process = await self.lxc.exec(
+            instance_name=self.instance_name,
+            command=final_cmd,
+            project=self.project,
+            remote=self.remote,
+            cwd=cwd_path,
+            stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+            stdout=output,
+            stderr=output,
+        )
+        stdout, stderr = await process.communicate(input)
+        returncode: int = process.returncode  # type: ignore
+
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, final_cmd, output=stdout, stderr=stderr
+            )
+
+        return subprocess.CompletedProcess(
+            args=final_cmd, returncode=returncode, stdout=stdout, stderr=stderr
+        )
+
+    async def exists(self) -> bool:
+        """Check if instance exists.
+
+        :returns: True if instance exists.
+
+        :raises LXDError: On unexpected error.
+        """
+        return await self._get_state() is not None
+
+    async def _get_state(self) -> Optional[Dict[str, Any]]:
+        """Get name and status of instance, or None if it does not exist."""
+        instances = await self.lxc.list(
+            instance_name=self.instance_name,
+            columns=["name", "status"],
+            project=self.project,
+            remote=self.remote,
+        )
+
+        for instance in instances:
+            if instance["name"] == self.instance_name:
+                return instance
+
+        return None
+
+    async def is_running(self) -> bool:
+        """Check if instance is running.
+
+        :returns: True if instance is running.
+
+        :raises LXDError: On unexpected error.
+        """
+        state = await self._get_state()
+        if state is None:
+            raise LXDError(brief=f"Instance {self.instance_name!r} does not exist.")
+
+        return state.get("status") == "Running"
+
+    async def launch(
+        self,
+        *,
+        image: str,
+        image_remote: str,
+        map_user_uid: bool = False,
+        ephemeral: bool = False,
+        uid: Optional[int] = None,
+    ) -> None:
+        """Launch instance.
+
+        :param image: Image name to launch.
+        :param image_remote: Image remote name.
+        :param map_user_id: Whether id mapping should be used.
+        :param uid: If ``map_user_id`` is True,
+                    the host user ID to map to instance root.
+        :param ephemeral: Flag to enable ephemeral instance.
+
+        :raises LXDError: On unexpected error.
+        """
+        config_keys = {}
+
+        if map_user_uid:
+            if not uid:
+                uid = os.getuid()
+            config_keys["raw.idmap"] = f"both {uid!s} 0"
+
+        cfg = await self.lxc.server_info(project=self.project, remote=self.remote)
+        kernel_features = cfg.get("environment", {}).get("kernel_features", {})
+        if kernel_features.get("seccomp_listener", "false") == "true":
+            config_keys["security.syscalls.intercept.mknod"] = "true"
+
+        await self.lxc.launch(
+            config_keys=config_keys,
+            ephemeral=ephemeral,
+            instance_name=self.instance_name,
+            image=image,
+            image_remote=image_remote,
+            project=self.project,
+            remote=self.remote,
+        )
+
+    async def pull_file(
+        self, *, source: pathlib.PurePath, destination: pathlib.Path
+    ) -> None:
+        """Copy a file from the environment to host.
+
+        :param source: Environment file to copy.
+        :param destination: Host file path to copy to.  Parent directory
+            (destination.parent) must exist.
+
+        :raises FileNotFoundError: If source file or destination's parent
+            directory does not exist.
+        :raises LXDError: On unexpected error copying file.
+        """
+        instance_helpers.check_pull_destination(destination)
+
+        message = f"File not found: {source.as_posix()!r}"
+        with instance_helpers.raise_file_not_found(message):
+            await self.lxc.file_pull(
+                instance_name=self.instance_name,
+                source=source,
+                destination=destination,
+                project=self.project,
+                remote=self.remote,
+            )
+
+    async def push_file(
+        self, *, source: pathlib.Path, destination: pathlib.PurePath
+    ) -> None:
+        """Copy a file from the host into the environment.
+
+        :param source: Host file to copy.
+        :param destination: Target environment file path to copy to.  Parent
+            directory (destination.parent) must exist.
+
+        :raises FileNotFoundError: If source file or destination's parent
+            directory does not exist.
+        :raises LXDError: On unexpected error copying file.
+        """
+        instance_helpers.check_push_source(source)
+
+        # Copy into target with uid/gid 0, rather than copying the IDs from the
+        # host file.
+        message = f"Directory not found: {destination.parent.as_posix()!r}"
+        with instance_helpers.raise_file_not_found(message):
+            await self.lxc.file_push(
+                instance_name=self.instance_name,
+                source=source,
+                destination=destination,
+                project=self.project,
+                remote=self.remote,
+                gid=0,
+                uid=0,
+            )
+
+    async def push_file_io(
+        self,
+        *,
+        destination: pathlib.PurePath,
+        content: io.BytesIO,
+        file_mode: str,
+        group: str = "root",
+        user: str = "root",
+    ) -> None:
+        """Create or replace file with content and file mode.
+
+        :param destination: Path to file.
+        :param content: Contents of file.
+        :param file_mode: File mode string (e.g. '0644').
+        :param group: File group owner/id.
+        :param user: File user owner/id.
+
+        :raises LXDError: On unexpected error.
+        """
+        command = instance_helpers.get_push_file_io_command(
+            destination=destination, file_mode=file_mode, group=group, user=user
+        )
+        try:
+            await self.execute_run(
+                command,
+                input=content.read(),
+                capture_output=True,
+                check=True,
+            )
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=(
+                    f"Failed to create file {destination.as_posix()!r}"
+                    f" in instance {self.instance_name!r}."
+                ),
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    async def start(self) -> None:
+        """Start instance.
+
+        :raises LXDError: on unexpected error.
+        """
+        await self.lxc.start(
+            instance_name=self.instance_name,
+            project=self.project,
+            remote=self.remote,
+        )
+
+    async def stop(self) -> None:
+        """Stop instance.
+
+        :raises LXDError: on unexpected error.
+        """
+        await self.lxc.stop(
+            instance_name=self.instance_name,
+            project=self.project,
+            remote=self.remote,
+        )
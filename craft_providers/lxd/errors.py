@@ -45,3 +45,19 @@ class LXDInstallationError(LXDError):
         )
 
         super().__init__(brief=brief, details=details, resolution=resolution)
+
+
+# Fragments of LXD's error messages for a missing path, from both the lxc
+# command and the API.
+_NOT_FOUND_MESSAGES = ("not found", "no such file or directory")
+
+
+def is_not_found_error(error: LXDError) -> bool:
+    """Check whether a file transfer failed because a path did not exist.
+
+    :param error: Error raised by LXC.file_pull() or LXC.file_push().
+
+    :returns: True if the error reports a missing file or directory.
+    """
+    details = (error.details or "").lower()
+    return any(message in details for message in _NOT_FOUND_MESSAGES)
@@ -0,0 +1,163 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""Helpers shared by LXDInstance and AsyncLXDInstance."""
+
+import contextlib
+import hashlib
+import logging
+import pathlib
+import re
+from typing import Iterator, List
+
+from .errors import LXDError, is_not_found_error
+
+logger = logging.getLogger(__name__)
+
+# Write stdin to "$1" atomically, owned by "$2" and with mode "$3".
+PUSH_FILE_IO_SCRIPT = (
+    'tmp=$(mktemp -- "$1.XXXXXX") || exit;'
+    ' cat > "$tmp" && chown -- "$2" "$tmp" && chmod -- "$3" "$tmp"'
+    ' && mv -f -- "$tmp" "$1"'
+    ' || { status=$?; rm -f -- "$tmp"; exit "$status"; }'
+)
+
+
+def formulate_instance_name(name: str) -> str:
+    """Convert a name to a LXD-compatible name.
+
+    LXD naming convention:
+    - between 1 and 63 characters long
+    - made up exclusively of letters, numbers, and hyphens from the ASCII table
+    - not begin with a digit or a hyphen
+    - not end with a hyphen
+
+    To create a LXD-compatible name, invalid characters are removed, the name is
+    truncated to 40 characters, then a hash is appended:
+    <truncated-name>-<hash-of-name>
+    └     1 - 40   ┘1└     20     ┘
+
+    :param name: name of instance
+
+    :returns: LXD-compatible name.
+
+    :raises LXDError: if name contains no alphanumeric characters
+    """
+    # remove anything that is not an alphanumeric characters or hyphen
+    name_with_valid_chars = re.sub(r"[^\w-]", "", name)
+    if name_with_valid_chars == "":
+        raise LXDError(
+            brief=f"failed to create LXD instance with name {name!r}.",
+            details="name must contain at least one alphanumeric character",
+        )
+
+    # trim digits and hyphens from the beginning and hyphens from the end
+    trimmed_name = re.compile(r"^[0-9-]*(?P<valid_name>.*?)[-]*$").search(
+        name_with_valid_chars
+    )
+    if not trimmed_name or trimmed_name.group("valid_name") == "":
+        raise LXDError(
+            brief=f"failed to create LXD instance with name {name!r}.",
+            details="name must contain at least one alphanumeric character",
+        )
+    valid_name = trimmed_name.group("valid_name")
+
+    # if the original name meets LXD's naming convention, then use the original name
+    if name == valid_name and len(name) <= 63:
+        instance_name = name
+
+    # else, continue converting the name
+    else:
+        # truncate to 40 characters
+        truncated_name = valid_name[:40]
+        # hash the entire name, not the truncated name
+        hashed_name = hashlib.sha1(name.encode()).hexdigest()[:20]
+        instance_name = f"{truncated_name}-{hashed_name}"
+
+    logger.debug("Set LXD instance name to %r", instance_name)
+    return instance_name
+
+
+def get_push_file_io_command(
+    *, destination: pathlib.PurePath, file_mode: str, group: str, user: str
+) -> List[str]:
+    """Get the command writing its stdin to a file with owner and file mode.
+
+    The content is streamed into a temporary file next to the destination,
+    which is given its owner and mode and renamed into place, all in one exec.
+    Names rather than numeric IDs are used in case the IDs are not known in
+    advance.
+
+    :param destination: Path to file.
+    :param file_mode: File mode string (e.g. '0644').
+    :param group: File group owner/id.
+    :param user: File user owner/id.
+
+    :returns: Command to execute in the instance.
+    """
+    return [
+        "sh",
+        "-c",
+        PUSH_FILE_IO_SCRIPT,
+        "sh",
+        destination.as_posix(),
+        f"{user}:{group}",
+        file_mode,
+    ]
+
+
+def check_pull_destination(destination: pathlib.Path) -> None:
+    """Check that the host directory to pull a file into exists.
+
+    :param destination: Host file path to copy to.
+
+    :raises FileNotFoundError: If destination's parent directory does not
+        exist.
+    """
+    if not destination.parent.is_dir():
+        raise FileNotFoundError(f"Directory not found: {str(destination.parent)!r}")
+
+
+def check_push_source(source: pathlib.Path) -> None:
+    """Check that the host file to push exists.
+
+    :param source: Host file to copy.
+
+    :raises FileNotFoundError: If source file does not exist.
+    """
+    if not source.is_file():
+        raise FileNotFoundError(f"File not found: {str(source)!r}")
+
+
+@contextlib.contextmanager
+def raise_file_not_found(message: str) -> Iterator[None]:
+    """Convert a file transfer error reporting a missing path.
+
+    Rather than checking that a path exists first, which would cost another
+    exec, the transfer is attempted within the context and any failure is
+    classified.
+
+    :param message: Message of the FileNotFoundError.
+
+    :raises FileNotFoundError: If the transfer failed as a path did not exist.
+    :raises LXDError: On other unexpected error copying file.
+    """
+    try:
+        yield
+    except LXDError as error:
+        if is_not_found_error(error):
+            raise FileNotFoundError(message) from error
+        raise
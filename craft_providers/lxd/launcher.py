@@ -17,18 +17,46 @@
 
 """LXD Instance Provider."""
 
+import contextlib
+import hashlib
 import logging
-from typing import Optional
-
-from craft_providers import Base, bases
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from craft_providers import (
+    Base,
+    LaunchResult,
+    LaunchSpec,
+    SetupLayer,
+    bases,
+    instrumentation,
+    parallel,
+)
 
 from .errors import LXDError
 from .lxc import LXC
 from .lxd_instance import LXDInstance
 from .project import create_with_default_profile
+from .snapshot_images import record_snapshot_image_use
 
 logger = logging.getLogger(__name__)
 
+# Seconds for which an instance being launched may reuse its queried state.
+_STATE_CACHE_TTL = 5.0
+
+# Name of the transient instance snapshot from which snapshot images and
+# golden instances are created.
+_TRANSIENT_SNAPSHOT_NAME = "craft-providers-transient"
+
+# Prefix of the names of golden instances.
+_GOLDEN_PREFIX = "golden-"
+
+# Locks serializing the creation of each snapshot image alias and golden
+# instance by concurrent launches, keyed by remote, project and name.
+_name_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+_name_locks_lock = threading.Lock()
+
 
 def _formulate_snapshot_image_name(
     *, image_name: str, image_remote: str, compatibility_tag: str
@@ -56,36 +84,222 @@ def _formulate_snapshot_image_name(
     )
 
 
+def _formulate_layer_image_name(
+    *, image_name: str, image_remote: str, layer: SetupLayer
+) -> str:
+    """Compute name of the snapshot image of a setup layer.
+
+    The name has the prefix of snapshot images, so that layers are garbage
+    collected alongside them.
+
+    :param image_name: Name of source image (e.g. 20.04).
+    :param image_remote: Name of source image's remote (e.g. ubuntu).
+    :param layer: Setup layer of base configuration applied to image.
+
+    :returns: Name of layer's snapshot image.
+    """
+    return "-".join(
+        [
+            "snapshot",
+            image_remote,
+            image_name,
+            layer.name,
+            layer.fingerprint,
+        ]
+    )
+
+
+def _find_setup_layer(
+    *,
+    lxc: LXC,
+    layers: List[SetupLayer],
+    image_name: str,
+    image_remote: str,
+    project: str,
+    remote: str,
+) -> Optional[SetupLayer]:
+    """Find the last setup layer with a snapshot image, if any.
+
+    :returns: Setup layer to resume setup after.
+    """
+    for layer in reversed(layers):
+        layer_image_name = _formulate_layer_image_name(
+            image_name=image_name, image_remote=image_remote, layer=layer
+        )
+        if lxc.has_image(image_name=layer_image_name, project=project, remote=remote):
+            return layer
+
+    return None
+
+
+def _disable_state_cache(instance: LXDInstance) -> LXDInstance:
+    """Stop caching the state of a launched instance, before returning it.
+
+    The state is only cached while launching, as the caller may then change
+    it out of band, e.g. by stopping or deleting the instance.
+
+    :param instance: Launched LXD instance.
+
+    :returns: The instance.
+    """
+    instance.state_cache_ttl = 0.0
+    instance.invalidate_state_cache()
+    return instance
+
+
+@contextlib.contextmanager
+def _name_lock(*, name: str, project: str, remote: str) -> Iterator[None]:
+    """Hold the lock for creating an image alias or instance with a name.
+
+    Concurrent launches, e.g. by launch_many(), would otherwise all publish
+    or copy to the same name, with all but the first failing.
+
+    :param name: Image alias or instance name.
+    :param project: LXD project.
+    :param remote: LXD remote.
+    """
+    with _name_locks_lock:
+        lock = _name_locks.setdefault((remote, project, name), threading.Lock())
+    with lock:
+        yield
+
+
+@contextlib.contextmanager
+def _transient_snapshot(*, lxc: LXC, instance: LXDInstance) -> Iterator[str]:
+    """Take an LXD snapshot of a running instance for the duration of the context.
+
+    :param lxc: LXC client.
+    :param instance: LXD instance to snapshot.
+
+    :returns: Name of snapshot.
+    """
+    # Flush pending writes so that the snapshot captures them.
+    instance.execute_run(["sync"], capture_output=True, check=True)
+
+    lxc.snapshot(
+        instance_name=instance.instance_name,
+        snapshot_name=_TRANSIENT_SNAPSHOT_NAME,
+        reuse=True,
+        project=instance.project,
+        remote=instance.remote,
+    )
+    try:
+        yield _TRANSIENT_SNAPSHOT_NAME
+    finally:
+        lxc.snapshot_delete(
+            instance_name=instance.instance_name,
+            snapshot_name=_TRANSIENT_SNAPSHOT_NAME,
+            project=instance.project,
+            remote=instance.remote,
+        )
+
+
+@instrumentation.traced("lxd.publish_snapshot")
 def _publish_snapshot(
     *,
     lxc: LXC,
     snapshot_name: str,
     instance: LXDInstance,
-    base_configuration: Base,
 ) -> None:
     """Publish snapshot from instance.
 
-    Stop instance and publish its contents to an image with the specified alias.
-    Once published, restart instance and ensure it is ready for use.
+    Take an LXD snapshot of the instance and publish it to an image with the
+    specified alias.  The instance keeps running throughout, rather than
+    being stopped for the publish and then booted again.  Nothing is
+    published if a concurrent launch already published the alias.
 
     :param lxc: LXC client.
     :param snapshot_name: Alias to use for snapshot.
     :param instance: LXD instance to snapshot from.
-    :param base_configuration: Base configuration for instance.
     """
-    instance.stop()
+    with _name_lock(
+        name=snapshot_name, project=instance.project, remote=instance.remote
+    ):
+        if lxc.has_image(
+            image_name=snapshot_name,
+            project=instance.project,
+            remote=instance.remote,
+        ):
+            logger.debug("Snapshot %r was already published.", snapshot_name)
+            return
+
+        with _transient_snapshot(lxc=lxc, instance=instance) as instance_snapshot:
+            lxc.publish(
+                alias=snapshot_name,
+                instance_name=instance.instance_name,
+                snapshot_name=instance_snapshot,
+                project=instance.project,
+                remote=instance.remote,
+            )
 
-    lxc.publish(
-        alias=snapshot_name,
-        instance_name=instance.instance_name,
-        force=True,
-        project=instance.project,
-        remote=instance.remote,
-    )
 
-    # Restart container and ensure it is ready.
-    instance.start()
-    base_configuration.wait_until_ready(executor=instance)
+def _formulate_golden_instance_name(
+    *,
+    image_name: str,
+    image_remote: str,
+    compatibility_tag: str,
+    uid: Optional[int],
+) -> str:
+    """Compute golden instance's name.
+
+    The name is made of a digest of the image and uid mapping, which identifies
+    the goldens superseded when the compatibility tag changes, and a digest of
+    the tag.  Digests keep it within LXD's naming constraints.
+
+    :param image_name: Name of source image (e.g. 20.04).
+    :param image_remote: Name of source image's remote (e.g. ubuntu).
+    :param compatibility_tag: Compatibility tag of base configuration applied to
+        image.
+    :param uid: Host uid mapped to the instance's root, if any.
+
+    :returns: Name of golden instance.
+    """
+    image_digest = hashlib.sha1(
+        f"{image_remote}:{image_name}:{uid}".encode()
+    ).hexdigest()
+    tag_digest = hashlib.sha1(compatibility_tag.encode()).hexdigest()
+    return f"{_GOLDEN_PREFIX}{image_digest[:12]}-{tag_digest[:12]}"
+
+
+@instrumentation.traced("lxd.create_golden_instance")
+def _create_golden_instance(
+    *, lxc: LXC, instance: LXDInstance, golden_name: str
+) -> None:
+    """Copy a set up instance to a stopped golden instance.
+
+    Golden instances superseded by this one, for an earlier compatibility tag,
+    are deleted.  Nothing is created if a concurrent launch already created
+    the golden instance.
+
+    :param lxc: LXC client.
+    :param instance: LXD instance which has been set up.
+    :param golden_name: Name of golden instance to create.
+    """
+    with _name_lock(name=golden_name, project=instance.project, remote=instance.remote):
+        names = lxc.list_names(project=instance.project, remote=instance.remote)
+        if golden_name in names:
+            logger.debug("Golden instance %r was already created.", golden_name)
+            return
+
+        image_prefix = golden_name.rsplit("-", 1)[0] + "-"
+        for name in names:
+            if name.startswith(image_prefix):
+                logger.debug("Deleting superseded golden instance %r.", name)
+                lxc.delete(
+                    instance_name=name,
+                    force=True,
+                    project=instance.project,
+                    remote=instance.remote,
+                )
+
+        with _transient_snapshot(lxc=lxc, instance=instance) as instance_snapshot:
+            lxc.copy(
+                source_instance_name=instance.instance_name,
+                source_snapshot_name=instance_snapshot,
+                destination_instance_name=golden_name,
+                project=instance.project,
+                remote=instance.remote,
+            )
 
 
 def _ensure_project_exists(
@@ -117,6 +331,295 @@ def _ensure_project_exists(
         )
 
 
+def _warmup_existing_instance(
+    *, instance: LXDInstance, base_configuration: Base, auto_clean: bool
+) -> bool:
+    """Start and warm up an existing instance.
+
+    :param instance: Existing LXD instance.
+    :param base_configuration: Base configuration applied to instance.
+    :param auto_clean: Delete instance, if incompatible.
+
+    :returns: True if the instance is ready for use, or False if it was
+        incompatible and has been deleted.
+
+    :raises BaseCompatibilityError: if instance is incompatible, without
+        auto_clean.
+    """
+    # TODO: warn (or auto clean) if ephemeral or map_user_uid is mismatched.
+    if not instance.is_running():
+        instance.start()
+
+    try:
+        base_configuration.warmup(executor=instance)
+        return True
+    except bases.BaseCompatibilityError as error:
+        if auto_clean:
+            logger.debug(
+                "Cleaning incompatible container %r (reason: %s).",
+                instance.name,
+                error.reason,
+            )
+            instance.delete()
+            return False
+        raise
+
+
+def _launch_with_setup_layers(
+    *,
+    instance: LXDInstance,
+    base_configuration: Base,
+    layers: List[SetupLayer],
+    image_name: str,
+    image_remote: str,
+    ephemeral: bool,
+    map_user_uid: bool,
+    uid: Optional[int],
+    lxc: LXC,
+) -> None:
+    """Launch instance from the last setup layer image available and set it up.
+
+    A snapshot image is published after each further layer of setup.
+
+    :param instance: LXD instance to launch.
+    :param base_configuration: Base configuration to apply to instance.
+    :param layers: Setup layers of base configuration.
+    :param image_name: LXD image the layers are set up from, e.g. "20.04".
+    :param image_remote: LXD image the layers are set up from, e.g. "ubuntu".
+    :param ephemeral: Create ephemeral instance.
+    :param map_user_uid: Map host uid/gid to instance's root uid/gid.
+    :param uid: The uid to be mapped, if ``map_user_id`` is enabled.
+    :param lxc: LXC client.
+    """
+    resume_layer = _find_setup_layer(
+        lxc=lxc,
+        layers=layers,
+        image_name=image_name,
+        image_remote=image_remote,
+        project=instance.project,
+        remote=instance.remote,
+    )
+
+    if resume_layer is not None:
+        layer_image_name = _formulate_layer_image_name(
+            image_name=image_name, image_remote=image_remote, layer=resume_layer
+        )
+        logger.debug("Using setup layer snapshot %r.", layer_image_name)
+        record_snapshot_image_use(
+            lxc=lxc,
+            image_name=layer_image_name,
+            project=instance.project,
+            remote=instance.remote,
+        )
+        instance.launch(
+            image=layer_image_name,
+            image_remote=instance.remote,
+            ephemeral=ephemeral,
+            map_user_uid=map_user_uid,
+            uid=uid,
+        )
+    else:
+        instance.launch(
+            image=image_name,
+            image_remote=image_remote,
+            ephemeral=ephemeral,
+            map_user_uid=map_user_uid,
+            uid=uid,
+        )
+
+    layers_by_name = {layer.name: layer for layer in layers}
+
+    def publish_layer(layer_name: str) -> None:
+        if ephemeral:
+            logger.debug("Refusing to publish setup layer of ephemeral instance.")
+            return
+
+        layer_image_name = _formulate_layer_image_name(
+            image_name=image_name,
+            image_remote=image_remote,
+            layer=layers_by_name[layer_name],
+        )
+        logger.debug("Publishing setup layer snapshot %r.", layer_image_name)
+        _publish_snapshot(lxc=lxc, snapshot_name=layer_image_name, instance=instance)
+
+    base_configuration.setup(
+        executor=instance,
+        resume_after=resume_layer.name if resume_layer else None,
+        layer_callback=publish_layer,
+    )
+
+
+def _launch_from_image(
+    *,
+    instance: LXDInstance,
+    base_configuration: Base,
+    image_name: str,
+    image_remote: str,
+    ephemeral: bool,
+    map_user_uid: bool,
+    uid: Optional[int],
+    use_snapshots: bool,
+    use_layered_snapshots: bool,
+    lxc: LXC,
+) -> None:
+    """Launch instance from an image and set it up.
+
+    :param instance: LXD instance to launch.
+    :param base_configuration: Base configuration to apply to instance.
+    :param image_name: LXD image to use, e.g. "20.04".
+    :param image_remote: LXD image to use, e.g. "ubuntu".
+    :param ephemeral: Create ephemeral instance.
+    :param map_user_uid: Map host uid/gid to instance's root uid/gid.
+    :param uid: The uid to be mapped, if ``map_user_id`` is enabled.
+    :param use_snapshots: Use LXD snapshots for bootstrapping images.
+    :param use_layered_snapshots: Use LXD snapshots of each setup layer.
+    :param lxc: LXC client.
+    """
+    project = instance.project
+    remote = instance.remote
+
+    # Create from snapshot, if available.
+    snapshot_name = _formulate_snapshot_image_name(
+        image_name=image_name,
+        image_remote=image_remote,
+        compatibility_tag=base_configuration.compatibility_tag,
+    )
+    if use_snapshots and lxc.has_image(
+        image_name=snapshot_name, project=project, remote=remote
+    ):
+        logger.debug("Using compatible snapshot %r.", snapshot_name)
+        record_snapshot_image_use(
+            lxc=lxc, image_name=snapshot_name, project=project, remote=remote
+        )
+        image_name = snapshot_name
+        image_remote = remote
+
+        # Don't re-publish this snapshot later.
+        use_snapshots = False
+        use_layered_snapshots = False
+
+    layers = base_configuration.get_setup_layers() if use_layered_snapshots else []
+    if layers:
+        _launch_with_setup_layers(
+            instance=instance,
+            base_configuration=base_configuration,
+            layers=layers,
+            image_name=image_name,
+            image_remote=image_remote,
+            ephemeral=ephemeral,
+            map_user_uid=map_user_uid,
+            uid=uid,
+            lxc=lxc,
+        )
+    else:
+        instance.launch(
+            image=image_name,
+            image_remote=image_remote,
+            ephemeral=ephemeral,
+            map_user_uid=map_user_uid,
+            uid=uid,
+        )
+        base_configuration.setup(executor=instance)
+
+    # Publish snapshot if enabled and instance is not ephemeral.
+    if use_snapshots:
+        if ephemeral:
+            logger.debug("Refusing to publish snapshot for ephemeral instance.")
+        else:
+            logger.debug("Publishing snapshot from instance %r.", snapshot_name)
+            _publish_snapshot(
+                lxc=lxc,
+                snapshot_name=snapshot_name,
+                instance=instance,
+            )
+
+
+def _launch_from_golden_instance(
+    *,
+    instance: LXDInstance,
+    base_configuration: Base,
+    image_name: str,
+    image_remote: str,
+    ephemeral: bool,
+    map_user_uid: bool,
+    uid: Optional[int],
+    use_snapshots: bool,
+    use_layered_snapshots: bool,
+    lxc: LXC,
+) -> None:
+    """Launch instance as a copy of the golden instance, creating it if needed.
+
+    Without a golden instance, the instance is launched from the image and set
+    up, then copied to a new golden instance unless it is ephemeral.
+
+    Copies are set up from the last setup layer of the base configuration,
+    to apply what the layers leave out, e.g. the hostname.  Copies for a base
+    configuration without setup layers are only warmed up, so keep the
+    golden instance's hostname.
+
+    :param instance: LXD instance to launch.
+    :param base_configuration: Base configuration to apply to instance.
+    :param image_name: LXD image to use, e.g. "20.04".
+    :param image_remote: LXD image to use, e.g. "ubuntu".
+    :param ephemeral: Create ephemeral instance.
+    :param map_user_uid: Map host uid/gid to instance's root uid/gid.
+    :param uid: The uid to be mapped, if ``map_user_id`` is enabled.
+    :param use_snapshots: Use LXD snapshots for bootstrapping images.
+    :param use_layered_snapshots: Use LXD snapshots of each setup layer.
+    :param lxc: LXC client.
+    """
+    golden_name = _formulate_golden_instance_name(
+        image_name=image_name,
+        image_remote=image_remote,
+        compatibility_tag=base_configuration.compatibility_tag,
+        uid=(uid or os.getuid()) if map_user_uid else None,
+    )
+    # Don't copy a golden instance still being created by a concurrent launch.
+    with _name_lock(name=golden_name, project=instance.project, remote=instance.remote):
+        golden_exists = golden_name in lxc.list_names(
+            project=instance.project, remote=instance.remote
+        )
+
+    if golden_exists:
+        logger.debug("Copying golden instance %r.", golden_name)
+        lxc.copy(
+            source_instance_name=golden_name,
+            destination_instance_name=instance.instance_name,
+            ephemeral=ephemeral,
+            project=instance.project,
+            remote=instance.remote,
+        )
+        instance.invalidate_state_cache()
+        instance.start()
+        layers = base_configuration.get_setup_layers()
+        if layers:
+            base_configuration.setup(executor=instance, resume_after=layers[-1].name)
+        else:
+            base_configuration.warmup(executor=instance)
+        return
+
+    _launch_from_image(
+        instance=instance,
+        base_configuration=base_configuration,
+        image_name=image_name,
+        image_remote=image_remote,
+        ephemeral=ephemeral,
+        map_user_uid=map_user_uid,
+        uid=uid,
+        use_snapshots=use_snapshots,
+        use_layered_snapshots=use_layered_snapshots,
+        lxc=lxc,
+    )
+
+    # Keep a golden instance if instance is not ephemeral.
+    if ephemeral:
+        logger.debug("Refusing to create golden instance from ephemeral instance.")
+    else:
+        logger.debug("Creating golden instance %r.", golden_name)
+        _create_golden_instance(lxc=lxc, instance=instance, golden_name=golden_name)
+
+
+@instrumentation.traced("lxd.launch")
 def launch(
     name: str,
     *,
@@ -129,6 +632,8 @@ def launch(
     map_user_uid: bool = False,
     uid: Optional[int] = None,
     use_snapshots: bool = False,
+    use_golden_instances: bool = False,
+    use_layered_snapshots: bool = False,
     project: str = "default",
     remote: str = "local",
     lxc: LXC = LXC(),
@@ -148,6 +653,15 @@ def launch(
     :param map_user_uid: Map host uid/gid to instance's root uid/gid.
     :param uid: The uid to be mapped, if ``map_user_id`` is enabled.
     :param use_snapshots: Use LXD snapshots for bootstrapping images.
+    :param use_golden_instances: Create instance as a copy of a stopped, set up
+        golden instance for the image and base configuration, keeping one if
+        needed.  Copies are copy-on-write on storage pools supporting it.
+        They are set up from the last setup layer of the base configuration
+        to apply e.g. their hostname, or only warmed up if it has none.
+    :param use_layered_snapshots: Publish a snapshot image after each setup
+        layer of the base configuration, and resume setup from the last layer
+        still matching it.  Unlike use_snapshots, a change to e.g. the packages
+        only repeats the setup from the layer installing them.
     :param project: LXD project to create instance in.
     :param remote: LXD remote to create instance on.
     :param lxc: LXC client.
@@ -165,63 +679,114 @@ def launch(
         project=project,
         remote=remote,
         default_command_environment=base_configuration.get_command_environment(),
+        lxc=lxc,
+        state_cache_ttl=_STATE_CACHE_TTL,
     )
 
-    if instance.exists():
-        # TODO: warn (or auto clean) if ephemeral or map_user_uid is mismatched.
-        if not instance.is_running():
-            instance.start()
+    if instance.exists() and _warmup_existing_instance(
+        instance=instance, base_configuration=base_configuration, auto_clean=auto_clean
+    ):
+        return _disable_state_cache(instance)
+
+    if use_golden_instances:
+        _launch_from_golden_instance(
+            instance=instance,
+            base_configuration=base_configuration,
+            image_name=image_name,
+            image_remote=image_remote,
+            ephemeral=ephemeral,
+            map_user_uid=map_user_uid,
+            uid=uid,
+            use_snapshots=use_snapshots,
+            use_layered_snapshots=use_layered_snapshots,
+            lxc=lxc,
+        )
+    else:
+        _launch_from_image(
+            instance=instance,
+            base_configuration=base_configuration,
+            image_name=image_name,
+            image_remote=image_remote,
+            ephemeral=ephemeral,
+            map_user_uid=map_user_uid,
+            uid=uid,
+            use_snapshots=use_snapshots,
+            use_layered_snapshots=use_layered_snapshots,
+            lxc=lxc,
+        )
 
-        try:
-            base_configuration.warmup(executor=instance)
-            return instance
-        except bases.BaseCompatibilityError as error:
-            if auto_clean:
-                logger.debug(
-                    "Cleaning incompatible container %r (reason: %s).",
-                    instance.name,
-                    error.reason,
-                )
-                instance.delete()
-            else:
-                raise
+    return _disable_state_cache(instance)
 
-    # Create from snapshot, if available.
-    snapshot_name = _formulate_snapshot_image_name(
-        image_name=image_name,
-        image_remote=image_remote,
-        compatibility_tag=base_configuration.compatibility_tag,
-    )
-    if use_snapshots and lxc.has_image(
-        image_name=snapshot_name, project=project, remote=remote
-    ):
-        logger.debug("Using compatible snapshot %r.", snapshot_name)
-        image_name = snapshot_name
-        image_remote = remote
 
-        # Don't re-publish this snapshot later.
-        use_snapshots = False
+def launch_many(
+    specs: Sequence[LaunchSpec],
+    *,
+    max_workers: int = 4,
+    fail_fast: bool = False,
+    auto_clean: bool = False,
+    auto_create_project: bool = False,
+    ephemeral: bool = False,
+    map_user_uid: bool = False,
+    uid: Optional[int] = None,
+    use_snapshots: bool = False,
+    use_golden_instances: bool = False,
+    use_layered_snapshots: bool = False,
+    project: str = "default",
+    remote: str = "local",
+    lxc: LXC = LXC(),
+) -> List[LaunchResult]:
+    """Create, start, and configure several instances concurrently.
 
-    instance.launch(
-        image=image_name,
-        image_remote=image_remote,
-        ephemeral=ephemeral,
-        map_user_uid=map_user_uid,
-        uid=uid,
+    Each instance is launched as by launch(), with the name, base
+    configuration, image name and image remote of its spec and the other
+    options given here.
+
+    :param specs: Instances to launch.
+    :param max_workers: Maximum number of instances to launch at once.
+    :param fail_fast: Cancel launches not yet started once one fails.
+    :param auto_clean: Automatically clean instances, if incompatible.
+    :param auto_create_project: Automatically create LXD project, if needed.
+    :param ephemeral: Create ephemeral instances.
+    :param map_user_uid: Map host uid/gid to instances' root uid/gid.
+    :param uid: The uid to be mapped, if ``map_user_id`` is enabled.
+    :param use_snapshots: Use LXD snapshots for bootstrapping images.
+    :param use_golden_instances: Create instances as copies of golden instances.
+    :param use_layered_snapshots: Use LXD snapshots of each setup layer.
+    :param project: LXD project to create instances in.
+    :param remote: LXD remote to create instances on.
+    :param lxc: LXC client.
+
+    :returns: Result of each launch, in the order of specs.
+
+    :raises LXDError: If a spec has no image remote, before launching any.
+    """
+    for spec in specs:
+        if spec.image_remote is None:
+            raise LXDError(brief=f"No image remote given for instance {spec.name!r}.")
+
+    # Create the project once, rather than racing to in each launch.
+    _ensure_project_exists(
+        create=auto_create_project, project=project, remote=remote, lxc=lxc
     )
-    base_configuration.setup(executor=instance)
 
-    # Publish snapshot if enabled and instance is not ephemeral.
-    if use_snapshots:
-        if ephemeral:
-            logger.debug("Refusing to publish snapshot for ephemeral instance.")
-        else:
-            logger.debug("Publishing snapshot from instance %r.", snapshot_name)
-            _publish_snapshot(
-                lxc=lxc,
-                snapshot_name=snapshot_name,
-                instance=instance,
-                base_configuration=base_configuration,
-            )
+    def launch_spec(spec: LaunchSpec) -> LXDInstance:
+        return launch(
+            spec.name,
+            base_configuration=spec.base_configuration,
+            image_name=spec.image_name,
+            image_remote=spec.image_remote,  # type: ignore
+            auto_clean=auto_clean,
+            ephemeral=ephemeral,
+            map_user_uid=map_user_uid,
+            uid=uid,
+            use_snapshots=use_snapshots,
+            use_golden_instances=use_golden_instances,
+            use_layered_snapshots=use_layered_snapshots,
+            project=project,
+            remote=remote,
+            lxc=lxc,
+        )
 
-    return instance
+    return parallel.launch_many(
+        specs, launch_spec, max_workers=max_workers, fail_fast=fail_fast
+    )
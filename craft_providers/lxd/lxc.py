@@ -16,16 +16,20 @@
 #
 
 """LXC wrapper."""
+import csv
 import enum
+import json
 import logging
+import os
 import pathlib
+import platform
 import shlex
 import subprocess
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import yaml
 
-from craft_providers import errors
+from craft_providers import errors, instrumentation
 
 from .errors import LXDError
 
@@ -34,6 +38,9 @@ logger = logging.getLogger(__name__)
 
 # pylint: disable=too-many-lines
 
+# Points at the revision of the installed LXD snap.
+_LXD_SNAP_REVISION_PATH = pathlib.Path("/snap/lxd/current")
+
 
 class StdinType(enum.Enum):
     """Mappings for input stream to pass to stdin for lxc commands."""
@@ -42,25 +49,265 @@ class StdinType(enum.Enum):
     NULL = None
 
 
+# Prefer the libyaml-based loader, which is much faster, where available.
+_YAML_LOADER = getattr(  # pylint: disable=invalid-name
+    yaml, "CBaseLoader", yaml.BaseLoader
+)
+
+
 def load_yaml(data):
     """Load yaml without additional resolvers.
 
     LXD may return YAML that has datetimes that are not valid when parsed to
     datetime.datetime().  Instead just use the base loader and avoid resolving
     this type (and others).
+
+    Only used for output which lxc cannot format as JSON.
+    """
+    return yaml.load(data, Loader=_YAML_LOADER)
+
+
+# Columns which may be selected with LXC.list(), mapped to lxc's shorthand.
+_LIST_COLUMNS = {
+    "architecture": "a",
+    "description": "d",
+    "location": "L",
+    "name": "n",
+    "project": "e",
+    "status": "s",
+    "type": "t",
+}
+
+
+def _parse_list_csv(data: bytes, columns: List[str]) -> List[Dict[str, str]]:
+    """Parse csv output of lxc list into dictionaries keyed by column.
+
+    :raises ValueError: if a row does not match the columns.
+    """
+    instances = []
+    for row in csv.reader(data.decode().splitlines()):
+        if len(row) != len(columns):
+            raise ValueError(f"Expected {len(columns)} fields, found {len(row)}.")
+
+        instance = dict(zip(columns, row))
+        if "status" in instance:
+            # The csv format shows the status in capitals, e.g. "RUNNING".
+            instance["status"] = instance["status"].capitalize()
+        instances.append(instance)
+
+    return instances
+
+
+def _exec_command(
+    *,
+    lxc_path: pathlib.Path,
+    command: List[str],
+    instance_name: str,
+    cwd: Optional[str],
+    mode: Optional[str],
+    project: str,
+    remote: str,
+) -> List[str]:
+    """Build the lxc command line executing command in an instance."""
+    final_cmd = [
+        str(lxc_path),
+        "--project",
+        project,
+        "exec",
+        f"{remote}:{instance_name}",
+    ]
+
+    if cwd is not None:
+        final_cmd.extend(["--cwd", cwd])
+
+    if mode is not None:
+        final_cmd.extend(["--mode", mode])
+
+    final_cmd += ["--", *command]
+
+    logger.debug("Executing in container: %s", shlex.join(final_cmd))
+    return final_cmd
+
+
+def _file_pull_command(
+    *,
+    instance_name: str,
+    source: pathlib.PurePath,
+    destination: pathlib.Path,
+    create_dirs: bool,
+    recursive: bool,
+    remote: str,
+) -> List[str]:
+    """Build the lxc command pulling a file from an instance."""
+    command = [
+        "file",
+        "pull",
+        f"{remote}:{instance_name}{source.as_posix()}",
+        destination.as_posix(),
+    ]
+
+    if create_dirs:
+        command.append("--create-dirs")
+
+    if recursive:
+        command.append("--recursive")
+
+    return command
+
+
+def _file_push_command(  # pylint: disable=too-many-arguments
+    *,
+    instance_name: str,
+    source: pathlib.Path,
+    destination: pathlib.PurePath,
+    create_dirs: bool,
+    recursive: bool,
+    gid: Optional[int],
+    uid: Optional[int],
+    mode: Optional[str],
+    remote: str,
+) -> List[str]:
+    """Build the lxc command pushing a file to an instance."""
+    command = [
+        "file",
+        "push",
+        source.as_posix(),
+        f"{remote}:{instance_name}{destination.as_posix()}",
+    ]
+
+    if create_dirs:
+        command.append("--create-dirs")
+
+    if recursive:
+        command.append("--recursive")
+
+    if mode is not None:
+        command.append(f"--mode={mode}")
+
+    if gid is not None:
+        command.append(f"--gid={gid}")
+
+    if uid is not None:
+        command.append(f"--uid={uid}")
+
+    return command
+
+
+def _parse_info(proc: subprocess.CompletedProcess) -> Dict[str, Any]:
+    """Parse the output of lxc info.
+
+    :raises LXDError: if the output is not valid YAML.
+    """
+    try:
+        return load_yaml(proc.stdout)
+    except yaml.YAMLError as error:
+        raise LXDError(
+            brief="Failed to parse lxc info.",
+            details=(
+                f"* Command that failed: {shlex.join(proc.args)!r}\n"
+                f"* Command output: {proc.stdout!r}"
+            ),
+        ) from error
+
+
+def _list_command(
+    *, instance_name: Optional[str], columns: Optional[List[str]], remote: str
+) -> List[str]:
+    """Build the lxc command listing instances.
+
+    :raises LXDError: if a column is not supported.
+    """
+    command = ["list", f"{remote}:"]
+
+    if columns is None:
+        command.append("--format=json")
+    else:
+        unsupported = [c for c in columns if c not in _LIST_COLUMNS]
+        if unsupported:
+            raise LXDError(brief=f"Unsupported columns for lxc list: {unsupported!r}.")
+        shorthand = "".join(_LIST_COLUMNS[c] for c in columns)
+        command.extend(["--format=csv", f"--columns={shorthand}"])
+
+    if instance_name is not None:
+        command.append(f"^{instance_name}$")
+
+    return command
+
+
+def _parse_list(
+    proc: subprocess.CompletedProcess, columns: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """Parse the output of lxc list.
+
+    :raises LXDError: if the output cannot be parsed.
+    """
+    try:
+        if columns is not None:
+            return _parse_list_csv(proc.stdout, columns)
+        return json.loads(proc.stdout)
+    except ValueError as error:
+        raise LXDError(
+            brief="Failed to parse lxc list.",
+            details=(
+                f"* Command that failed: {shlex.join(proc.args)!r}\n"
+                f"* Command output: {proc.stdout!r}"
+            ),
+        ) from error
+
+
+def _local_server_key() -> Optional[str]:
+    """Identify the build of the local LXD and the running kernel.
+
+    :returns: Key, or None if LXD is not installed as a snap.
     """
-    return yaml.load(data, Loader=yaml.BaseLoader)
+    try:
+        revision = os.readlink(_LXD_SNAP_REVISION_PATH)
+    except OSError:
+        return None
+
+    return f"lxd-{revision}-{platform.release()}"
+
+
+# Commands taking a further subcommand, e.g. "image list".
+_LXC_COMMAND_GROUPS = {"config", "config device", "file", "image", "image alias"}
+_LXC_COMMAND_GROUPS |= {"profile", "project", "remote"}
+
+
+def _subcommand(command: List[str]) -> str:
+    """Get the subcommand of an lxc command, for instrumentation."""
+    subcommand = command[0]
+    for arg in command[1:]:
+        if subcommand not in _LXC_COMMAND_GROUPS:
+            break
+        subcommand += " " + arg
+    return subcommand
 
 
 class LXC:  # pylint: disable=too-many-public-methods
-    """Wrapper for lxc command-line interface."""
+    """Wrapper for lxc command-line interface.
+
+    :param lxc_path: Path to lxc command.
+    :param image_alias_index: Keep an index of image aliases to fingerprints
+        for image lookups.  The index for a project and remote is loaded on
+        first use and reloaded after images are published, copied or deleted
+        through this client, so aliases changed by other clients in the
+        meantime will not be seen.
+    :param server_info_cache_path: Optional file in which to keep the server
+        information of the local LXD between processes, see server_info().
+    """
 
     def __init__(
         self,
         *,
         lxc_path: pathlib.Path = pathlib.Path("lxc"),
+        image_alias_index: bool = False,
+        server_info_cache_path: Optional[pathlib.Path] = None,
     ):
         self.lxc_path = lxc_path
+        self.image_alias_index = image_alias_index
+        self.server_info_cache_path = server_info_cache_path
+        self._image_aliases: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._server_info: Dict[str, Dict[str, Any]] = {}
 
     def _run_lxc(
         self,
@@ -68,6 +315,7 @@ class LXC:  # pylint: disable=too-many-public-methods
         *,
         check: bool,
         project: Optional[str] = None,
+        remote: Optional[str] = None,
         stdin: StdinType = StdinType.INTERACTIVE,
         **kwargs,
     ) -> subprocess.CompletedProcess:
@@ -77,6 +325,8 @@ class LXC:  # pylint: disable=too-many-public-methods
         :param command: lxc command to execute.
         :param check: Check if the lxc command exits with a non-zero exit code.
         :param project: Name of LXD project.
+        :param remote: Name of LXD remote the command targets, for
+            instrumentation.
         :param stdin: What input stream to pass to lxc.
         :param kwargs: Additional parameters to pass to the lxc command.
 
@@ -92,10 +342,19 @@ class LXC:  # pylint: disable=too-many-public-methods
         logger.debug("Executing on host: %s", shlex.join(lxc_cmd))
 
         # for subprocess, input takes priority over stdin
-        if "input" in kwargs:
-            return subprocess.run(lxc_cmd, check=check, **kwargs)
-
-        return subprocess.run(lxc_cmd, check=check, stdin=stdin.value, **kwargs)
+        if "input" not in kwargs:
+            kwargs["stdin"] = stdin.value
+
+        return instrumentation.timed_run(
+            subprocess.run,
+            lxc_cmd,
+            provider="lxc",
+            subcommand=_subcommand(command),
+            project=project,
+            remote=remote,
+            check=check,
+            **kwargs,
+        )
 
     def config_device_add_disk(
         self,
@@ -135,6 +394,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -173,6 +433,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -199,6 +460,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -235,6 +497,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -245,6 +508,63 @@ class LXC:  # pylint: disable=too-many-public-methods
                 details=errors.details_from_called_process_error(error),
             ) from error
 
+    def copy(
+        self,
+        *,
+        source_instance_name: str,
+        destination_instance_name: str,
+        source_snapshot_name: Optional[str] = None,
+        config_keys: Optional[Dict[str, str]] = None,
+        ephemeral: bool = False,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Copy an instance, or a snapshot of it, to a new stopped instance.
+
+        On copy-on-write storage pools such as zfs and btrfs, this is a clone
+        which is almost instant regardless of the size of the instance.
+
+        :param source_instance_name: Name of instance to copy.
+        :param destination_instance_name: Name of instance to create.
+        :param source_snapshot_name: Optional snapshot of the source instance
+            to copy instead of its current state.
+        :param config_keys: Configuration keys to set on the new instance.
+        :param ephemeral: Make the new instance ephemeral.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        source = f"{remote}:{source_instance_name}"
+        if source_snapshot_name is not None:
+            source += f"/{source_snapshot_name}"
+
+        command = ["copy", source, f"{remote}:{destination_instance_name}"]
+
+        if ephemeral:
+            command.append("--ephemeral")
+
+        if config_keys is not None:
+            for config_key in [f"{k}={v}" for k, v in config_keys.items()]:
+                command.extend(["--config", config_key])
+
+        try:
+            self._run_lxc(
+                command,
+                capture_output=True,
+                check=True,
+                project=project,
+                remote=remote,
+            )
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=(
+                    f"Failed to copy instance {source_instance_name!r}"
+                    f" to {destination_instance_name!r}."
+                ),
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
     def delete(
         self,
         *,
@@ -273,6 +593,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -308,25 +629,25 @@ class LXC:  # pylint: disable=too-many-public-methods
 
         :returns: Runner's instance.
         """
-        final_cmd = [
-            str(self.lxc_path),
-            "--project",
-            project,
-            "exec",
-            f"{remote}:{instance_name}",
-        ]
-
-        if cwd is not None:
-            final_cmd.extend(["--cwd", cwd])
-
-        if mode is not None:
-            final_cmd.extend(["--mode", mode])
-
-        final_cmd += ["--", *command]
-
-        logger.debug("Executing in container: %s", shlex.join(final_cmd))
-
-        return runner(final_cmd, **kwargs)  # pylint: disable=subprocess-run-check
+        final_cmd = _exec_command(
+            lxc_path=self.lxc_path,
+            command=command,
+            instance_name=instance_name,
+            cwd=cwd,
+            mode=mode,
+            project=project,
+            remote=remote,
+        )
+
+        return instrumentation.timed_run(
+            runner,
+            final_cmd,
+            provider="lxc",
+            subcommand="exec",
+            project=project,
+            remote=remote,
+            **kwargs,
+        )
 
     def file_pull(
         self,
@@ -351,18 +672,14 @@ class LXC:  # pylint: disable=too-many-public-methods
 
         :raises LXDError: on unexpected error.
         """
-        command = [
-            "file",
-            "pull",
-            f"{remote}:{instance_name}{source.as_posix()}",
-            destination.as_posix(),
-        ]
-
-        if create_dirs:
-            command.append("--create-dirs")
-
-        if recursive:
-            command.append("--recursive")
+        command = _file_pull_command(
+            instance_name=instance_name,
+            source=source,
+            destination=destination,
+            create_dirs=create_dirs,
+            recursive=recursive,
+            remote=remote,
+        )
 
         try:
             self._run_lxc(
@@ -370,6 +687,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -409,27 +727,17 @@ class LXC:  # pylint: disable=too-many-public-methods
 
         :raises LXDError: on unexpected error.
         """
-        command = [
-            "file",
-            "push",
-            source.as_posix(),
-            f"{remote}:{instance_name}{destination.as_posix()}",
-        ]
-
-        if create_dirs:
-            command.append("--create-dirs")
-
-        if recursive:
-            command.append("--recursive")
-
-        if mode is not None:
-            command.append(f"--mode={mode}")
-
-        if gid is not None:
-            command.append(f"--gid={gid}")
-
-        if uid is not None:
-            command.append(f"--uid={uid}")
+        command = _file_push_command(
+            instance_name=instance_name,
+            source=source,
+            destination=destination,
+            create_dirs=create_dirs,
+            recursive=recursive,
+            gid=gid,
+            uid=uid,
+            mode=mode,
+            remote=remote,
+        )
 
         try:
             self._run_lxc(
@@ -437,6 +745,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -456,14 +765,8 @@ class LXC:  # pylint: disable=too-many-public-methods
         :param project: Name of LXD project.
         :param remote: Name of LXD remote.
         """
-        image_list = self.image_list(project=project, remote=remote)
-
-        for image in image_list:
-            for alias in image["aliases"]:
-                if image_name == alias["name"]:
-                    return True
-
-        return False
+        fingerprint = self.image_fingerprint(image_name, project=project, remote=remote)
+        return fingerprint is not None
 
     def info(
         self,
@@ -491,6 +794,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -498,16 +802,74 @@ class LXC:  # pylint: disable=too-many-public-methods
                 details=errors.details_from_called_process_error(error),
             ) from error
 
+        return _parse_info(proc)
+
+    def server_info(
+        self, *, project: str = "default", remote: str = "local"
+    ) -> Dict[str, Any]:
+        """Show server information, memoized per remote.
+
+        Meant for properties which only change when LXD or the kernel is
+        upgraded, such as kernel features and API extensions.  The server is
+        queried once per remote for the life of this client.
+
+        If server_info_cache_path is set, the information of the local server
+        is also saved there, and reused by later processes for as long as the
+        revision of the LXD snap and the kernel release are unchanged.
+
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :returns: Server information, as returned by info().
+
+        :raises LXDError: on unexpected error.
+        """
+        info = self._server_info.get(remote)
+        if info is not None:
+            return info
+
+        key = None
+        if remote == "local" and self.server_info_cache_path is not None:
+            key = _local_server_key()
+
+        if key is not None:
+            info = self._load_server_info(key)
+
+        if info is None:
+            info = self.info(project=project, remote=remote)
+            if key is not None:
+                self._save_server_info(key, info)
+
+        self._server_info[remote] = info
+        return info
+
+    def _load_server_info(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load server information from the cache file if key matches."""
         try:
-            return load_yaml(proc.stdout)
-        except yaml.YAMLError as error:
-            raise LXDError(
-                brief="Failed to parse lxc info.",
-                details=(
-                    f"* Command that failed: {shlex.join(proc.args)!r}\n"
-                    f"* Command output: {proc.stdout!r}"
-                ),
-            ) from error
+            cache = json.loads(self.server_info_cache_path.read_text())  # type: ignore
+        except (OSError, ValueError) as error:
+            logger.debug("Unable to load LXD server info cache: %s", error)
+            return None
+
+        if not isinstance(cache, dict) or cache.get("key") != key:
+            return None
+
+        logger.debug("Using cached LXD server info for %s.", key)
+        return cache.get("info")
+
+    def _save_server_info(self, key: str, info: Dict[str, Any]) -> None:
+        """Save server information to the cache file, ignoring failures."""
+        path: pathlib.Path = self.server_info_cache_path  # type: ignore
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps({"key": key, "info": info}))
+            # Replace atomically, so concurrent readers never see partial data.
+            tmp_path.replace(path)
+        except OSError as error:
+            logger.debug("Unable to save LXD server info cache: %s", error)
+            tmp_path.unlink(missing_ok=True)
 
     def launch(
         self,
@@ -552,6 +914,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 check=True,
                 stdin=StdinType.INTERACTIVE,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -559,12 +922,98 @@ class LXC:  # pylint: disable=too-many-public-methods
                 details=errors.details_from_called_process_error(error),
             ) from error
 
+    def image_alias_list(
+        self,
+        *,
+        alias: Optional[str] = None,
+        project: str = "default",
+        remote: str = "local",
+    ) -> List[Dict[str, Any]]:
+        """List image aliases.
+
+        :param alias: Only list the alias with this name.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :returns: List of aliases, including the fingerprint of the image each
+            one targets.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = ["image", "alias", "list", f"{remote}:", "--format=json"]
+
+        if alias is not None:
+            command.append(alias)
+
+        try:
+            proc = self._run_lxc(
+                command,
+                capture_output=True,
+                check=True,
+                project=project,
+                remote=remote,
+            )
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=f"Failed to list image aliases for project {project!r}.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+        try:
+            aliases = json.loads(proc.stdout)
+        except ValueError as error:
+            raise LXDError(
+                brief="Failed to parse lxc image alias list.",
+                details=(
+                    f"* Command that failed: {shlex.join(proc.args)!r}\n"
+                    f"* Command output: {proc.stdout!r}"
+                ),
+            ) from error
+
+        # lxc matches any alias containing the filter.
+        if alias is not None:
+            aliases = [a for a in aliases if a["name"] == alias]
+
+        return aliases
+
+    def image_fingerprint(
+        self, image_name: str, *, project: str = "default", remote: str = "local"
+    ) -> Optional[str]:
+        """Get the fingerprint of the image with given alias name.
+
+        :param image_name: Name of image alias.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :returns: Fingerprint of image, or None if there is no such alias.
+
+        :raises LXDError: on unexpected error.
+        """
+        if not self.image_alias_index:
+            aliases = self.image_alias_list(
+                alias=image_name, project=project, remote=remote
+            )
+            return aliases[0]["target"] if aliases else None
+
+        index = self._image_aliases.get((project, remote))
+        if index is None:
+            aliases = self.image_alias_list(project=project, remote=remote)
+            index = {a["name"]: a["target"] for a in aliases}
+            self._image_aliases[(project, remote)] = index
+
+        return index.get(image_name)
+
+    def _forget_image_aliases(self, *, project: str, remote: str) -> None:
+        """Discard the alias index of a project, if any, as images changed."""
+        self._image_aliases.pop((project, remote), None)
+
     def image_copy(
         self,
         *,
         image: str,
         image_remote: str,
         alias: Optional[str] = None,
+        auto_update: bool = False,
         project: str = "default",
         remote: str = "local",
     ) -> None:
@@ -572,12 +1021,15 @@ class LXC:  # pylint: disable=too-many-public-methods
 
         :param instance_name: Optional instance name.
         :param alias: New alias to add to image.
+        :param auto_update: Keep the copy updated from the source remote.
         :param image: Image to copy.
         :param project: Name of LXD project.
         :param remote: Name of LXD remote.
 
         :raises LXDError: on unexpected error.
         """
+        self._forget_image_aliases(project=project, remote=remote)
+
         command = [
             "image",
             "copy",
@@ -588,12 +1040,16 @@ class LXC:  # pylint: disable=too-many-public-methods
         if alias is not None:
             command.append(f"--alias={alias}")
 
+        if auto_update:
+            command.append("--auto-update")
+
         try:
             self._run_lxc(
                 command,
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -612,6 +1068,8 @@ class LXC:  # pylint: disable=too-many-public-methods
 
         :raises LXDError: on unexpected error.
         """
+        self._forget_image_aliases(project=project, remote=remote)
+
         command = [
             "image",
             "delete",
@@ -624,6 +1082,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -639,7 +1098,7 @@ class LXC:  # pylint: disable=too-many-public-methods
         :param project: Name of LXD project.
         :param remote: Name of LXD remote.
         """
-        command = ["image", "list", f"{remote}:", "--format=yaml"]
+        command = ["image", "list", f"{remote}:", "--format=json"]
 
         try:
             proc = self._run_lxc(
@@ -647,6 +1106,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -655,8 +1115,8 @@ class LXC:  # pylint: disable=too-many-public-methods
             ) from error
 
         try:
-            return load_yaml(proc.stdout)
-        except yaml.YAMLError as error:
+            return json.loads(proc.stdout)
+        except ValueError as error:
             raise LXDError(
                 brief="Failed to parse lxc image list.",
                 details=(
@@ -665,14 +1125,56 @@ class LXC:  # pylint: disable=too-many-public-methods
                 ),
             ) from error
 
+    def image_set_property(
+        self,
+        *,
+        image: str,
+        key: str,
+        value: str,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Set a property of an image.
+
+        :param image: Alias or fingerprint of image.
+        :param key: Name of property.
+        :param value: Value of property.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        try:
+            self._run_lxc(
+                ["image", "set-property", f"{remote}:{image}", key, value],
+                capture_output=True,
+                check=True,
+                project=project,
+                remote=remote,
+            )
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=f"Failed to set property {key!r} of image {image!r}.",
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
     def list(
         self,
         *,
+        instance_name: Optional[str] = None,
+        columns: Optional[List[str]] = None,
         project: str = "default",
         remote: str = "local",
     ) -> List[Dict[str, Any]]:
         """List instances and their status.
 
+        By default, all information about the instances is returned.  If only
+        some of it is required, specifying the columns saves LXD from gathering
+        the rest, e.g. columns=["name", "status"].  Supported columns are
+        architecture, description, location, name, project, status and type.
+
+        :param instance_name: Only list the instance with this name.
+        :param columns: Only retrieve these columns.
         :param project: Name of LXD project.
         :param remote: Name of LXD remote.
 
@@ -680,7 +1182,9 @@ class LXC:  # pylint: disable=too-many-public-methods
 
         :raises LXDError: on unexpected error.
         """
-        command = ["list", f"{remote}:", "--format=yaml"]
+        command = _list_command(
+            instance_name=instance_name, columns=columns, remote=remote
+        )
 
         try:
             proc = self._run_lxc(
@@ -688,6 +1192,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -695,16 +1200,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 details=errors.details_from_called_process_error(error),
             ) from error
 
-        try:
-            return load_yaml(proc.stdout)
-        except yaml.YAMLError as error:
-            raise LXDError(
-                brief="Failed to parse lxc list.",
-                details=(
-                    f"* Command that failed: {shlex.join(proc.args)!r}\n"
-                    f"* Command output: {proc.stdout!r}"
-                ),
-            ) from error
+        return _parse_list(proc, columns)
 
     def list_names(
         self, *, project: str = "default", remote: str = "local"
@@ -720,7 +1216,7 @@ class LXC:  # pylint: disable=too-many-public-methods
 
         :raises LXDError: on unexpected error.
         """
-        instances = self.list(project=project, remote=remote)
+        instances = self.list(columns=["name"], project=project, remote=remote)
 
         try:
             return [i["name"] for i in instances]
@@ -755,6 +1251,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
                 input=encoded_config,
             )
         except subprocess.CalledProcessError as error:
@@ -782,6 +1279,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -807,6 +1305,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -830,6 +1329,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -846,13 +1346,14 @@ class LXC:  # pylint: disable=too-many-public-methods
 
         :raises LXDError: on unexpected error.
         """
-        command = ["project", "list", f"{remote}:", "--format=yaml"]
+        command = ["project", "list", f"{remote}:", "--format=json"]
 
         try:
             proc = self._run_lxc(
                 command,
                 capture_output=True,
                 check=True,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -861,9 +1362,9 @@ class LXC:  # pylint: disable=too-many-public-methods
             ) from error
 
         try:
-            projects = load_yaml(proc.stdout)
+            projects = json.loads(proc.stdout)
             return sorted([p["name"] for p in projects])
-        except (KeyError, yaml.YAMLError) as error:
+        except (KeyError, ValueError) as error:
             raise LXDError(
                 brief="Failed to parse lxc project list.",
                 details=(
@@ -879,6 +1380,7 @@ class LXC:  # pylint: disable=too-many-public-methods
         alias: Optional[str] = None,
         force: bool = False,
         image_remote: str = "local",
+        snapshot_name: Optional[str] = None,
         project: str = "default",
         remote: str = "local",
     ) -> None:
@@ -888,14 +1390,22 @@ class LXC:  # pylint: disable=too-many-public-methods
         :param alias: New alias to define at target.
         :param force: Force publishing of image, even if container is running.
         :param image_remote: Name of remote to publish image to.
+        :param snapshot_name: Optional snapshot of the instance to publish
+            instead of the instance itself, which may then keep running.
         :param project: Name of LXD project.
         :param remote: Name of LXD remote instance is found on.
 
         :raises LXDError: on unexpected error.
         """
+        self._forget_image_aliases(project=project, remote=image_remote)
+
+        source = f"{remote}:{instance_name}"
+        if snapshot_name is not None:
+            source += f"/{snapshot_name}"
+
         command = [
             "publish",
-            f"{remote}:{instance_name}",
+            source,
             f"{image_remote}:",
         ]
 
@@ -911,6 +1421,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -936,6 +1447,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 command,
                 capture_output=True,
                 check=True,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -948,7 +1460,7 @@ class LXC:  # pylint: disable=too-many-public-methods
 
         :returns: dictionary with remote name mapping to config.
         """
-        command = ["remote", "list", "--format=yaml"]
+        command = ["remote", "list", "--format=json"]
 
         try:
             proc = self._run_lxc(
@@ -963,8 +1475,8 @@ class LXC:  # pylint: disable=too-many-public-methods
             ) from error
 
         try:
-            return load_yaml(proc.stdout)
-        except yaml.YAMLError as error:
+            return json.loads(proc.stdout)
+        except ValueError as error:
             raise LXDError(
                 brief="Failed to parse lxc remote list.",
                 details=(
@@ -973,6 +1485,117 @@ class LXC:  # pylint: disable=too-many-public-methods
                 ),
             ) from error
 
+    def restore(
+        self,
+        *,
+        instance_name: str,
+        snapshot_name: str,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Restore an instance to a snapshot.
+
+        A running instance is restarted from the restored state.
+
+        :param instance_name: Name of instance to restore.
+        :param snapshot_name: Name of snapshot to restore.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        try:
+            self._run_lxc(
+                ["restore", f"{remote}:{instance_name}", snapshot_name],
+                capture_output=True,
+                check=True,
+                project=project,
+                remote=remote,
+            )
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=(
+                    f"Failed to restore instance {instance_name!r}"
+                    f" to snapshot {snapshot_name!r}."
+                ),
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    def snapshot(
+        self,
+        *,
+        instance_name: str,
+        snapshot_name: str,
+        reuse: bool = False,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Take a snapshot of an instance, which may be running.
+
+        :param instance_name: Name of instance to snapshot.
+        :param snapshot_name: Name of snapshot.
+        :param reuse: Replace any existing snapshot with the same name.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        command = ["snapshot", f"{remote}:{instance_name}", snapshot_name]
+
+        if reuse:
+            command.append("--reuse")
+
+        try:
+            self._run_lxc(
+                command,
+                capture_output=True,
+                check=True,
+                project=project,
+                remote=remote,
+            )
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=(
+                    f"Failed to create snapshot {snapshot_name!r}"
+                    f" of instance {instance_name!r}."
+                ),
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
+    def snapshot_delete(
+        self,
+        *,
+        instance_name: str,
+        snapshot_name: str,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Delete a snapshot of an instance.
+
+        :param instance_name: Name of instance.
+        :param snapshot_name: Name of snapshot to delete.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        try:
+            self._run_lxc(
+                ["delete", f"{remote}:{instance_name}/{snapshot_name}"],
+                capture_output=True,
+                check=True,
+                project=project,
+                remote=remote,
+            )
+        except subprocess.CalledProcessError as error:
+            raise LXDError(
+                brief=(
+                    f"Failed to delete snapshot {snapshot_name!r}"
+                    f" of instance {instance_name!r}."
+                ),
+                details=errors.details_from_called_process_error(error),
+            ) from error
+
     def start(
         self, *, instance_name: str, project: str = "default", remote: str = "local"
     ) -> None:
@@ -992,6 +1615,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
@@ -1032,6 +1656,7 @@ class LXC:  # pylint: disable=too-many-public-methods
                 capture_output=True,
                 check=True,
                 project=project,
+                remote=remote,
             )
         except subprocess.CalledProcessError as error:
             raise LXDError(
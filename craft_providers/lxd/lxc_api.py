@@ -0,0 +1,1117 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""LXC client using the LXD REST API over its unix socket."""
+
+import logging
+import pathlib
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+import requests
+import requests_unixsocket  # type: ignore
+
+from .errors import LXDError
+from .lxc import _LIST_COLUMNS, LXC
+
+logger = logging.getLogger(__name__)
+
+# pylint: disable=too-many-lines
+
+DEFAULT_SOCKET_PATH = pathlib.Path("/var/snap/lxd/common/lxd/unix.socket")
+
+
+class LXCAPI(LXC):  # pylint: disable=too-many-public-methods
+    """LXC client talking to the local LXD daemon through its unix socket.
+
+    Requests share one keep-alive HTTP session, avoiding the cost of spawning
+    the `lxc` client for every call.  Only the local daemon is reachable over
+    the socket, so calls targeting any other remote (and the few operations the
+    REST API cannot express without websockets, such as `exec`) fall back to
+    the `lxc` command-line client.
+
+    :param socket_path: Path to LXD's unix socket.
+    :param lxc_path: Path to lxc command used for fallbacks.
+    :param image_alias_index: Keep an index of image aliases, as for LXC.
+    :param server_info_cache_path: Optional file in which to keep server
+        information, as for LXC.
+    """
+
+    def __init__(
+        self,
+        *,
+        socket_path: pathlib.Path = DEFAULT_SOCKET_PATH,
+        lxc_path: pathlib.Path = pathlib.Path("lxc"),
+        image_alias_index: bool = False,
+        server_info_cache_path: Optional[pathlib.Path] = None,
+    ):
+        super().__init__(
+            lxc_path=lxc_path,
+            image_alias_index=image_alias_index,
+            server_info_cache_path=server_info_cache_path,
+        )
+        self.socket_path = socket_path
+        self._base_url = "http+unix://" + urllib.parse.quote(
+            socket_path.as_posix(), safe=""
+        )
+        self._session = requests_unixsocket.Session()
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        brief: str,
+        project: Optional[str] = None,
+        params: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Send request to LXD and check for errors.
+
+        :param method: HTTP method.
+        :param path: API path, e.g. "/1.0/instances".
+        :param brief: Brief description for LXDError, if raised.
+        :param project: Name of LXD project.
+        :param params: Additional query parameters.
+        :param kwargs: Additional parameters to pass to requests.
+
+        :returns: Response.
+
+        :raises LXDError: on connection error or error response.
+        """
+        query = dict(params or {})
+        if project is not None:
+            query["project"] = project
+
+        logger.debug("Requesting from LXD: %s %s %r", method, path, query)
+
+        try:
+            response = self._session.request(
+                method, self._base_url + path, params=query, **kwargs
+            )
+        except requests.exceptions.ConnectionError as error:
+            raise LXDError(
+                brief=brief,
+                details=f"* Unable to connect to LXD socket {str(self.socket_path)!r}",
+            ) from error
+
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("error", response.text)
+            except ValueError:
+                message = response.text
+            raise LXDError(
+                brief=brief,
+                details=(
+                    f"* Request that failed: {method} {path}\n"
+                    f"* Response code: {response.status_code}\n"
+                    f"* Error: {message}"
+                ),
+            )
+
+        return response
+
+    def _query(
+        self,
+        method: str,
+        path: str,
+        *,
+        brief: str,
+        project: Optional[str] = None,
+        params: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> Any:
+        """Send request to LXD, waiting on background operations to complete.
+
+        :returns: Metadata of response, or of the completed operation.
+
+        :raises LXDError: on error, or if operation fails.
+        """
+        data = self._request(
+            method, path, brief=brief, project=project, params=params, **kwargs
+        ).json()
+
+        if data.get("type") != "async":
+            return data.get("metadata")
+
+        operation = data["operation"]
+        result = self._request(
+            "GET", f"{operation}/wait", brief=brief, project=project
+        ).json()["metadata"]
+
+        if result.get("status") != "Success":
+            raise LXDError(
+                brief=brief,
+                details=(
+                    f"* Operation that failed: {operation}\n"
+                    f"* Error: {result.get('err')}"
+                ),
+            )
+
+        return result
+
+    def _get_instance(self, *, instance_name: str, project: str, brief: str):
+        """Get instance configuration and its ETag."""
+        response = self._request(
+            "GET",
+            f"/1.0/instances/{_quote(instance_name)}",
+            brief=brief,
+            project=project,
+        )
+        return response.json()["metadata"], response.headers.get("ETag")
+
+    def _put_instance_devices(
+        self,
+        *,
+        instance_name: str,
+        instance: Dict[str, Any],
+        etag: Optional[str],
+        project: str,
+        brief: str,
+    ) -> None:
+        """Write back instance configuration with updated devices."""
+        headers = {"If-Match": etag} if etag else {}
+        self._query(
+            "PUT",
+            f"/1.0/instances/{_quote(instance_name)}",
+            brief=brief,
+            project=project,
+            headers=headers,
+            json={
+                key: instance.get(key)
+                for key in [
+                    "architecture",
+                    "config",
+                    "devices",
+                    "ephemeral",
+                    "profiles",
+                    "description",
+                ]
+            },
+        )
+
+    def _set_state(
+        self,
+        *,
+        instance_name: str,
+        action: str,
+        brief: str,
+        project: str,
+        force: bool = False,
+        timeout: int = -1,
+    ) -> None:
+        """Change instance state, e.g. to start or stop it."""
+        self._query(
+            "PUT",
+            f"/1.0/instances/{_quote(instance_name)}/state",
+            brief=brief,
+            project=project,
+            json={"action": action, "force": force, "timeout": timeout},
+        )
+
+    def _image_source(self, *, image: str, image_remote: str) -> Optional[Dict]:
+        """Formulate image source for images served by image_remote.
+
+        :returns: Image source, or None if the remote is not reachable by the
+            daemon without client credentials.
+        """
+        if image_remote == "local":
+            return {"type": "image", "alias": image}
+
+        config = self.remote_list().get(image_remote)
+        if not config or config.get("protocol") != "simplestreams":
+            return None
+
+        return {
+            "type": "image",
+            "mode": "pull",
+            "alias": image,
+            "server": config["addr"],
+            "protocol": "simplestreams",
+        }
+
+    def config_device_add_disk(
+        self,
+        *,
+        instance_name: str,
+        source: pathlib.Path,
+        path: pathlib.PurePath,
+        device: str,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Mount host source directory to target mount point.
+
+        :param instance_name: Name of instance.
+        :param source: Host path.
+        :param path: Mount target in instance.
+        :param device: Name of device.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().config_device_add_disk(
+                instance_name=instance_name,
+                source=source,
+                path=path,
+                device=device,
+                project=project,
+                remote=remote,
+            )
+            return
+
+        brief = f"Failed to add disk to instance {instance_name!r}."
+        instance, etag = self._get_instance(
+            instance_name=instance_name, project=project, brief=brief
+        )
+        if device in instance["devices"]:
+            raise LXDError(brief=brief, details=f"* Device {device!r} already exists")
+
+        instance["devices"][device] = {
+            "type": "disk",
+            "source": source.as_posix(),
+            "path": path.as_posix(),
+        }
+        self._put_instance_devices(
+            instance_name=instance_name,
+            instance=instance,
+            etag=etag,
+            project=project,
+            brief=brief,
+        )
+
+    def config_device_remove(
+        self,
+        *,
+        instance_name: str,
+        device: str,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Mount host source directory to target mount point.
+
+        :param instance_name: Name of instance.
+        :param device: Name of device.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().config_device_remove(
+                instance_name=instance_name,
+                device=device,
+                project=project,
+                remote=remote,
+            )
+            return
+
+        brief = f"Failed to remove device from instance {instance_name!r}."
+        instance, etag = self._get_instance(
+            instance_name=instance_name, project=project, brief=brief
+        )
+        if instance["devices"].pop(device, None) is None:
+            raise LXDError(brief=brief, details=f"* Device {device!r} doesn't exist")
+
+        self._put_instance_devices(
+            instance_name=instance_name,
+            instance=instance,
+            etag=etag,
+            project=project,
+            brief=brief,
+        )
+
+    def config_device_show(
+        self, *, instance_name: str, project: str = "default", remote: str = "local"
+    ) -> Dict[str, Any]:
+        """Show full device configuration.
+
+        :param instance_name: Name of instance.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            return super().config_device_show(
+                instance_name=instance_name, project=project, remote=remote
+            )
+
+        instance, _ = self._get_instance(
+            instance_name=instance_name,
+            project=project,
+            brief=f"Failed to show devices for instance {instance_name!r}.",
+        )
+        return instance["devices"]
+
+    def config_set(
+        self,
+        *,
+        instance_name: str,
+        key: str,
+        value: str,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Set instance_name configuration key.
+
+        :param instance_name: Name of instance.
+        :param key: Config key name.
+        :param value: Config key value.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().config_set(
+                instance_name=instance_name,
+                key=key,
+                value=value,
+                project=project,
+                remote=remote,
+            )
+            return
+
+        self._query(
+            "PATCH",
+            f"/1.0/instances/{_quote(instance_name)}",
+            brief=(
+                f"Failed to set config key {key!r} to {value!r}"
+                f" for instance {instance_name!r}."
+            ),
+            project=project,
+            json={"config": {key: value}},
+        )
+
+    def delete(
+        self,
+        *,
+        instance_name: str,
+        force: bool = False,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Delete instance.
+
+        :param instance_name: Name of instance.
+        :param force: Force deletion if running.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().delete(
+                instance_name=instance_name, force=force, project=project, remote=remote
+            )
+            return
+
+        brief = f"Failed to delete instance {instance_name!r}."
+        if force:
+            instance, _ = self._get_instance(
+                instance_name=instance_name, project=project, brief=brief
+            )
+            if instance.get("status") == "Running":
+                self._set_state(
+                    instance_name=instance_name,
+                    action="stop",
+                    force=True,
+                    project=project,
+                    brief=brief,
+                )
+
+        self._query(
+            "DELETE",
+            f"/1.0/instances/{_quote(instance_name)}",
+            brief=brief,
+            project=project,
+        )
+
+    def file_pull(
+        self,
+        *,
+        instance_name: str,
+        source: pathlib.PurePath,
+        destination: pathlib.Path,
+        create_dirs: bool = False,
+        recursive: bool = False,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Retrieve file from instance_name.
+
+        :param instance_name: Name of instance.
+        :param source: Path in environment to pull.
+        :param destination: Path in host to write to.
+        :param create_dirs: Create any directories necessary.
+        :param recursive: Recursively transfer files.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local" or create_dirs or recursive:
+            super().file_pull(
+                instance_name=instance_name,
+                source=source,
+                destination=destination,
+                create_dirs=create_dirs,
+                recursive=recursive,
+                project=project,
+                remote=remote,
+            )
+            return
+
+        brief = (
+            f"Failed to pull file {source.as_posix()!r}"
+            f" from instance {instance_name!r}."
+        )
+        response = self._request(
+            "GET",
+            f"/1.0/instances/{_quote(instance_name)}/files",
+            brief=brief,
+            project=project,
+            params={"path": source.as_posix()},
+            stream=True,
+        )
+        if response.headers.get("X-LXD-type", "file") != "file":
+            raise LXDError(brief=brief, details="* Source is not a regular file")
+
+        if destination.is_dir():
+            destination = destination / source.name
+
+        try:
+            with destination.open("wb") as stream:
+                for chunk in response.iter_content(64 * 1024):
+                    stream.write(chunk)
+        except OSError as error:
+            raise LXDError(brief=brief, details=f"* Error: {error}") from error
+
+    def file_push(
+        self,
+        *,
+        instance_name: str,
+        source: pathlib.Path,
+        destination: pathlib.PurePath,
+        create_dirs: bool = False,
+        recursive: bool = False,
+        gid: Optional[int] = None,
+        uid: Optional[int] = None,
+        mode: Optional[str] = None,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Create file with content and file mode.
+
+        :param instance_name: Name of instance to push file to.
+        :param source: Path in host to push.
+        :param destination: Path in environment to write to.
+        :param create_dirs: Create any directories necessary.
+        :param recursive: Recursively transfer files.
+        :param gid: Optional gid to set on push (lxd's default is -1).
+        :param uid: Optional uid to set on push (lxd's default is -1).
+        :param mode: Optional file mode to set on file.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local" or create_dirs or recursive:
+            super().file_push(
+                instance_name=instance_name,
+                source=source,
+                destination=destination,
+                create_dirs=create_dirs,
+                recursive=recursive,
+                gid=gid,
+                uid=uid,
+                mode=mode,
+                project=project,
+                remote=remote,
+            )
+            return
+
+        brief = (
+            f"Failed to push file {source.as_posix()!r}"
+            f" to instance {instance_name!r}."
+        )
+        headers = {"X-LXD-type": "file", "X-LXD-write": "overwrite"}
+        if mode is not None:
+            headers["X-LXD-mode"] = mode
+        if gid is not None:
+            headers["X-LXD-gid"] = str(gid)
+        if uid is not None:
+            headers["X-LXD-uid"] = str(uid)
+
+        try:
+            with source.open("rb") as stream:
+                self._request(
+                    "POST",
+                    f"/1.0/instances/{_quote(instance_name)}/files",
+                    brief=brief,
+                    project=project,
+                    params={"path": destination.as_posix()},
+                    headers=headers,
+                    data=stream,
+                )
+        except OSError as error:
+            raise LXDError(brief=brief, details=f"* Error: {error}") from error
+
+    def info(
+        self,
+        *,
+        instance_name: Optional[str] = None,
+        project: str = "default",
+        remote: str = "local",
+    ) -> Dict[str, Any]:
+        """Show instance or server information.
+
+        :param instance_name: Optional instance name.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local" or instance_name:
+            return super().info(
+                instance_name=instance_name, project=project, remote=remote
+            )
+
+        return self._query(
+            "GET",
+            "/1.0",
+            brief=f"Failed to get info for remote {remote!r}.",
+            project=project,
+        )
+
+    def launch(
+        self,
+        *,
+        instance_name: str,
+        image: str,
+        image_remote: str,
+        config_keys: Optional[Dict[str, str]] = None,
+        ephemeral: bool = False,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Launch instance.
+
+        :param instance_name: Name of instance to launch.
+        :param image: Name of image to use.
+        :param image_remote: Name of image's remote.
+        :param config_keys: Configuration keys to set.
+        :param ephemeral: Use ephemeral instance.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        source = None
+        if remote == "local":
+            source = self._image_source(image=image, image_remote=image_remote)
+
+        if source is None:
+            super().launch(
+                instance_name=instance_name,
+                image=image,
+                image_remote=image_remote,
+                config_keys=config_keys,
+                ephemeral=ephemeral,
+                project=project,
+                remote=remote,
+            )
+            return
+
+        brief = f"Failed to launch instance {instance_name!r}."
+        self._query(
+            "POST",
+            "/1.0/instances",
+            brief=brief,
+            project=project,
+            json={
+                "name": instance_name,
+                "source": source,
+                "config": config_keys or {},
+                "ephemeral": ephemeral,
+            },
+        )
+        self._set_state(
+            instance_name=instance_name, action="start", project=project, brief=brief
+        )
+
+    def image_alias_list(
+        self,
+        *,
+        alias: Optional[str] = None,
+        project: str = "default",
+        remote: str = "local",
+    ) -> List[Dict[str, Any]]:
+        """List image aliases.
+
+        :param alias: Only list the alias with this name.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :returns: List of aliases, including the fingerprint of the image each
+            one targets.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            return super().image_alias_list(alias=alias, project=project, remote=remote)
+
+        aliases = self._query(
+            "GET",
+            "/1.0/images/aliases",
+            brief=f"Failed to list image aliases for project {project!r}.",
+            project=project,
+            params={"recursion": "1"},
+        )
+
+        if alias is not None:
+            aliases = [a for a in aliases if a["name"] == alias]
+
+        return aliases
+
+    def image_copy(
+        self,
+        *,
+        image: str,
+        image_remote: str,
+        alias: Optional[str] = None,
+        auto_update: bool = False,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Copy image.
+
+        :param instance_name: Optional instance name.
+        :param alias: New alias to add to image.
+        :param auto_update: Keep the copy updated from the source remote.
+        :param image: Image to copy.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        self._forget_image_aliases(project=project, remote=remote)
+
+        source = None
+        if remote == "local" and image_remote != "local":
+            source = self._image_source(image=image, image_remote=image_remote)
+
+        if source is None:
+            super().image_copy(
+                image=image,
+                image_remote=image_remote,
+                alias=alias,
+                auto_update=auto_update,
+                project=project,
+                remote=remote,
+            )
+            return
+
+        data: Dict[str, Any] = {"source": source}
+        if alias is not None:
+            data["aliases"] = [{"name": alias}]
+        if auto_update:
+            data["auto_update"] = True
+
+        self._query(
+            "POST",
+            "/1.0/images",
+            brief=f"Failed to copy image {image!r}.",
+            project=project,
+            json=data,
+        )
+
+    def image_delete(
+        self, *, image: str, project: str = "default", remote: str = "local"
+    ) -> None:
+        """Delete image.
+
+        :param image: Image to delete.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().image_delete(image=image, project=project, remote=remote)
+            return
+
+        self._forget_image_aliases(project=project, remote=remote)
+
+        brief = f"Failed to delete image {image!r}."
+
+        # Like the lxc client, accept either an alias or a fingerprint.
+        try:
+            fingerprint = self._query(
+                "GET",
+                f"/1.0/images/aliases/{_quote(image)}",
+                brief=brief,
+                project=project,
+            )["target"]
+        except LXDError:
+            fingerprint = image
+
+        self._query(
+            "DELETE",
+            f"/1.0/images/{_quote(fingerprint)}",
+            brief=brief,
+            project=project,
+        )
+
+    def image_list(
+        self, *, project: str = "default", remote: str = "local"
+    ) -> List[Dict[str, Any]]:
+        """List images.
+
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+        """
+        if remote != "local":
+            return super().image_list(project=project, remote=remote)
+
+        return self._query(
+            "GET",
+            "/1.0/images",
+            brief=f"Failed to list images for project {project!r}.",
+            project=project,
+            params={"recursion": "1"},
+        )
+
+    def list(
+        self,
+        *,
+        instance_name: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        project: str = "default",
+        remote: str = "local",
+    ) -> List[Dict[str, Any]]:
+        """List instances and their status.
+
+        :param instance_name: Only list the instance with this name.
+        :param columns: Only retrieve these columns.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :returns: List of containers and their info.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            return super().list(
+                instance_name=instance_name,
+                columns=columns,
+                project=project,
+                remote=remote,
+            )
+
+        if columns is not None:
+            unsupported = [c for c in columns if c not in _LIST_COLUMNS]
+            if unsupported:
+                raise LXDError(
+                    brief=f"Unsupported columns for lxc list: {unsupported!r}."
+                )
+
+        # Full recursion includes the state of each instance, which is costly
+        # for LXD to gather and only needed when returning everything.
+        params = {"recursion": "2" if columns is None else "1"}
+        if instance_name is not None:
+            params["filter"] = f"name eq {instance_name}"
+
+        instances = self._query(
+            "GET",
+            "/1.0/instances",
+            brief=f"Failed to list instances for project {project!r}.",
+            project=project,
+            params=params,
+        )
+
+        # Daemons without server-side filtering ignore the filter.
+        if instance_name is not None:
+            instances = [i for i in instances if i["name"] == instance_name]
+
+        if columns is not None:
+            instances = [{c: i.get(c, "") for c in columns} for i in instances]
+
+        return instances
+
+    def profile_edit(
+        self,
+        *,
+        profile: str,
+        config: Dict[str, Any],
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Set profile configuration.
+
+        :param profile: Name of profile.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().profile_edit(
+                profile=profile, config=config, project=project, remote=remote
+            )
+            return
+
+        self._query(
+            "PUT",
+            f"/1.0/profiles/{_quote(profile)}",
+            brief=f"Failed to set profile {profile!r}.",
+            project=project,
+            json={
+                key: config[key]
+                for key in ["config", "description", "devices"]
+                if key in config
+            },
+        )
+
+    def profile_show(
+        self, *, profile: str, project: str = "default", remote: str = "local"
+    ) -> Dict[str, Any]:
+        """Get profile configuration.
+
+        :param profile: Name of profile.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            return super().profile_show(profile=profile, project=project, remote=remote)
+
+        return self._query(
+            "GET",
+            f"/1.0/profiles/{_quote(profile)}",
+            brief=f"Failed to show profile {profile!r}.",
+            project=project,
+        )
+
+    def project_create(self, *, project: str, remote: str = "local") -> None:
+        """Create project.
+
+        :param project: Name of LXD project to create.
+        :param remote: Name of LXD remote to create project on.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().project_create(project=project, remote=remote)
+            return
+
+        self._query(
+            "POST",
+            "/1.0/projects",
+            brief=f"Failed to create project {project!r}.",
+            json={"name": project, "config": {}},
+        )
+
+    def project_delete(self, *, project: str, remote: str = "local") -> None:
+        """Delete project, if it exists.
+
+        :param project: Name of LXD project to delete.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().project_delete(project=project, remote=remote)
+            return
+
+        self._query(
+            "DELETE",
+            f"/1.0/projects/{_quote(project)}",
+            brief=f"Failed to delete project {project!r}.",
+        )
+
+    def project_list(self, remote: str = "local") -> List[str]:
+        """Get list of projects.
+
+        :param remote: Name of LXD remote to query.
+
+        :returns: List of project names.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            return super().project_list(remote)
+
+        urls = self._query(
+            "GET",
+            "/1.0/projects",
+            brief=f"Failed to list projects on remote {remote!r}.",
+        )
+        return sorted(urllib.parse.unquote(url.rsplit("/", 1)[-1]) for url in urls)
+
+    def publish(
+        self,
+        *,
+        instance_name: str,
+        alias: Optional[str] = None,
+        force: bool = False,
+        image_remote: str = "local",
+        snapshot_name: Optional[str] = None,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Publish image from instance.
+
+        :param instance_name: Name of instance to publish image from.
+        :param alias: New alias to define at target.
+        :param force: Force publishing of image, even if container is running.
+        :param image_remote: Name of remote to publish image to.
+        :param snapshot_name: Optional snapshot of the instance to publish
+            instead of the instance itself, which may then keep running.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote instance is found on.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local" or image_remote != "local":
+            super().publish(
+                instance_name=instance_name,
+                alias=alias,
+                force=force,
+                image_remote=image_remote,
+                snapshot_name=snapshot_name,
+                project=project,
+                remote=remote,
+            )
+            return
+
+        self._forget_image_aliases(project=project, remote=image_remote)
+
+        brief = f"Failed to publish image from {instance_name!r}."
+
+        if snapshot_name is not None:
+            data: Dict[str, Any] = {
+                "source": {
+                    "type": "snapshot",
+                    "name": f"{instance_name}/{snapshot_name}",
+                }
+            }
+            if alias is not None:
+                data["aliases"] = [{"name": alias}]
+            self._query("POST", "/1.0/images", brief=brief, project=project, json=data)
+            return
+
+        instance, _ = self._get_instance(
+            instance_name=instance_name, project=project, brief=brief
+        )
+
+        # Match the lxc client: a running instance is only published if forced,
+        # in which case it is stopped for the duration of the publish.
+        running = instance.get("status") == "Running"
+        if running:
+            if not force:
+                raise LXDError(
+                    brief=brief,
+                    details="* The instance is currently running",
+                )
+            self._set_state(
+                instance_name=instance_name, action="stop", project=project, brief=brief
+            )
+
+        data = {"source": {"type": "instance", "name": instance_name}}
+        if alias is not None:
+            data["aliases"] = [{"name": alias}]
+
+        try:
+            self._query("POST", "/1.0/images", brief=brief, project=project, json=data)
+        finally:
+            if running:
+                self._set_state(
+                    instance_name=instance_name,
+                    action="start",
+                    project=project,
+                    brief=brief,
+                )
+
+    def start(
+        self, *, instance_name: str, project: str = "default", remote: str = "local"
+    ) -> None:
+        """Start container.
+
+        :param instance_name: Name of instance to start.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().start(instance_name=instance_name, project=project, remote=remote)
+            return
+
+        self._set_state(
+            instance_name=instance_name,
+            action="start",
+            project=project,
+            brief=f"Failed to start {instance_name!r}.",
+        )
+
+    def stop(
+        self,
+        *,
+        instance_name: str,
+        force: bool = False,
+        timeout: int = -1,
+        project: str = "default",
+        remote: str = "local",
+    ) -> None:
+        """Stop container.
+
+        :param instance_name: Name of instance to stop.
+        :param force: Force instance to stop.
+        :param timeout: Timeout in seconds. -1 is no timeout.
+        :param project: Name of LXD project.
+        :param remote: Name of LXD remote.
+
+        :raises LXDError: on unexpected error.
+        """
+        if remote != "local":
+            super().stop(
+                instance_name=instance_name,
+                force=force,
+                timeout=timeout,
+                project=project,
+                remote=remote,
+            )
+            return
+
+        self._set_state(
+            instance_name=instance_name,
+            action="stop",
+            force=force,
+            timeout=timeout,
+            project=project,
+            brief=f"Failed to stop {instance_name!r}.",
+        )
+
+
+def _quote(name: str) -> str:
+    """Quote name for use as a single path component."""
+    return urllib.parse.quote(name, safe="")
@@ -17,28 +17,33 @@
 
 """LXD Instance Executor."""
 
-import hashlib
+import contextlib
 import io
 import logging
 import os
 import pathlib
-import re
-import shutil
 import subprocess
-import tempfile
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from craft_providers import errors
+from craft_providers import errors, instrumentation
 from craft_providers.util import env_cmd
 
-from .. import Executor
+from .. import Base, Executor
+from . import instance_helpers
+from ._exec_session import ExecSession
 from .errors import LXDError
 from .lxc import LXC
 
 logger = logging.getLogger(__name__)
 
+# Name of the snapshot taken by checkpoint() if none is given.
+_DEFAULT_CHECKPOINT_NAME = "craft-providers-checkpoint"
 
-class LXDInstance(Executor):
+
+class LXDInstance(  # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    Executor
+):
     """LXD Instance Lifecycle."""
 
     def __init__(
@@ -49,17 +54,24 @@ class LXDInstance(Executor):
         project: str = "default",
         remote: str = "local",
         lxc: Optional[LXC] = None,
+        state_cache_ttl: float = 0.0,
     ):
         """Create an LXD executor.
 
         To comply with LXD naming conventions, the supplied name is converted to a
         LXD-compatible name before creating the instance.
 
+        The instance's state may be cached for state_cache_ttl seconds, saving
+        queries when exists() and is_running() are called in close succession.
+        The cache is invalidated by the lifecycle methods of this executor, or
+        explicitly with invalidate_state_cache().
+
         :param name: Unique name of the lxd instance
         :param default_command_environment: command environment
         :param project: name of lxd project
         :param remote: name of lxd remote
         :param lxc: LXC instance object
+        :param state_cache_ttl: seconds to cache instance state for (0 disables)
         """
         super().__init__()
 
@@ -69,7 +81,7 @@ class LXDInstance(Executor):
             self.default_command_environment = {}
 
         self.name = name
-        self._set_instance_name()
+        self.instance_name = instance_helpers.formulate_instance_name(name)
         self.project = project
         self.remote = remote
 
@@ -78,56 +90,10 @@ class LXDInstance(Executor):
         else:
             self.lxc = lxc
 
-    def _set_instance_name(self) -> None:
-        """Convert a name to a LXD-compatible name.
-
-        LXD naming convention:
-        - between 1 and 63 characters long
-        - made up exclusively of letters, numbers, and hyphens from the ASCII table
-        - not begin with a digit or a hyphen
-        - not end with a hyphen
-
-        To create a LXD-compatible name, invalid characters are removed, the name is
-        truncated to 40 characters, then a hash is appended:
-        <truncated-name>-<hash-of-name>
-        └     1 - 40   ┘1└     20     ┘
-
-        :param name: name of instance
-        :raises LXDError: if name contains no alphanumeric characters
-        """
-        # remove anything that is not an alphanumeric characters or hyphen
-        name_with_valid_chars = re.sub(r"[^\w-]", "", self.name)
-        if name_with_valid_chars == "":
-            raise LXDError(
-                brief=f"failed to create LXD instance with name {self.name!r}.",
-                details="name must contain at least one alphanumeric character",
-            )
-
-        # trim digits and hyphens from the beginning and hyphens from the end
-        trimmed_name = re.compile(r"^[0-9-]*(?P<valid_name>.*?)[-]*$").search(
-            name_with_valid_chars
-        )
-        if not trimmed_name or trimmed_name.group("valid_name") == "":
-            raise LXDError(
-                brief=f"failed to create LXD instance with name {self.name!r}.",
-                details="name must contain at least one alphanumeric character",
-            )
-        valid_name = trimmed_name.group("valid_name")
-
-        # if the original name meets LXD's naming convention, then use the original name
-        if self.name == valid_name and len(self.name) <= 63:
-            instance_name = self.name
-
-        # else, continue converting the name
-        else:
-            # truncate to 40 characters
-            truncated_name = valid_name[:40]
-            # hash the entire name, not the truncated name
-            hashed_name = hashlib.sha1(self.name.encode()).hexdigest()[:20]
-            instance_name = f"{truncated_name}-{hashed_name}"
+        self._exec_session: Optional[ExecSession] = None
 
-        self.instance_name = instance_name
-        logger.debug("Set LXD instance name to %r", instance_name)
+        self.state_cache_ttl = state_cache_ttl
+        self._cached_state: Optional[Tuple[float, Optional[Dict[str, Any]]]] = None
 
     def _finalize_lxc_command(
         self,
@@ -166,6 +132,7 @@ class LXDInstance(Executor):
         file_mode: str,
         group: str = "root",
         user: str = "root",
+        skip_if_unchanged: bool = False,
     ) -> None:
         """Create or replace file with content and file mode.
 
@@ -174,27 +141,23 @@ class LXDInstance(Executor):
         :param file_mode: File mode string (e.g. '0644').
         :param group: File group owner/id.
         :param user: File user owner/id.
+        :param skip_if_unchanged: Skip writing the file if destination already
+            has the same content.
 
         :raises LXDError: On unexpected error.
         """
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            shutil.copyfileobj(content, temp_file)
+        if skip_if_unchanged and self._is_content_unchanged(
+            content=content, destination=destination
+        ):
+            return
 
-        temp_path = pathlib.Path(temp_file.name)
-        self.lxc.file_push(
-            instance_name=self.instance_name,
-            source=temp_path,
-            destination=destination,
-            mode=file_mode,
-            project=self.project,
-            remote=self.remote,
+        command = instance_helpers.get_push_file_io_command(
+            destination=destination, file_mode=file_mode, group=group, user=user
         )
-
-        # We don't use gid/uid for file_push() in case we don't know the
-        # user/group IDs in advance.  Just chown it.
         try:
             self.execute_run(
-                ["chown", f"{user}:{group}", destination.as_posix()],
+                command,
+                input=content.read(),
                 capture_output=True,
                 check=True,
             )
@@ -207,7 +170,34 @@ class LXDInstance(Executor):
                 details=errors.details_from_called_process_error(error),
             ) from error
 
-        os.unlink(temp_file.name)
+    def checkpoint(self, name: str = _DEFAULT_CHECKPOINT_NAME) -> None:
+        """Snapshot instance, so that it may be reset to its current state.
+
+        Pending writes of a running instance are flushed first.  An existing
+        checkpoint of the same name is replaced.
+
+        :param name: Name of checkpoint.
+
+        :raises LXDError: On unexpected error.
+        """
+        if self.is_running():
+            try:
+                self.execute_run(["sync"], capture_output=True, check=True)
+            except subprocess.CalledProcessError as error:
+                raise LXDError(
+                    brief=(
+                        f"Failed to flush writes in instance {self.instance_name!r}."
+                    ),
+                    details=errors.details_from_called_process_error(error),
+                ) from error
+
+        self.lxc.snapshot(
+            instance_name=self.instance_name,
+            snapshot_name=name,
+            reuse=True,
+            project=self.project,
+            remote=self.remote,
+        )
 
     def delete(self, force: bool = True) -> None:
         """Delete instance.
@@ -216,11 +206,28 @@ class LXDInstance(Executor):
 
         :raises LXDError: On unexpected error.
         """
-        return self.lxc.delete(
+        try:
+            self.lxc.delete(
+                instance_name=self.instance_name,
+                project=self.project,
+                remote=self.remote,
+                force=force,
+            )
+        finally:
+            self.invalidate_state_cache()
+
+    def delete_checkpoint(self, name: str = _DEFAULT_CHECKPOINT_NAME) -> None:
+        """Delete checkpoint of instance.
+
+        :param name: Name of checkpoint.
+
+        :raises LXDError: On unexpected error.
+        """
+        self.lxc.snapshot_delete(
             instance_name=self.instance_name,
+            snapshot_name=name,
             project=self.project,
             remote=self.remote,
-            force=force,
         )
 
     def execute_popen(
@@ -286,9 +293,14 @@ class LXDInstance(Executor):
         else:
             cwd_path = cwd.as_posix()
 
+        final_cmd = self._finalize_lxc_command(command=command, env=env)
+
+        if self._exec_session is not None and ExecSession.supports(**kwargs):
+            return self._exec_session.run(final_cmd, cwd=cwd_path, **kwargs)
+
         return self.lxc.exec(
             instance_name=self.instance_name,
-            command=self._finalize_lxc_command(command=command, env=env),
+            command=final_cmd,
             project=self.project,
             remote=self.remote,
             runner=subprocess.run,
@@ -296,6 +308,41 @@ class LXDInstance(Executor):
             **kwargs,
         )
 
+    @contextlib.contextmanager
+    def exec_session(self) -> Iterator[None]:
+        """Run commands through one persistent channel into the instance.
+
+        While the context is active, execute_run() sends captured commands
+        (capture_output=True, without input or timeout) to a single long-lived
+        shell in the instance rather than starting a new `lxc exec` for each of
+        them.  Every command still gets its own CompletedProcess with its exit
+        code, stdout and stderr.  Other commands are executed as usual.
+
+        Nested use of the context reuses the active session.
+
+        :raises LXDError: On unexpected error.
+        """
+        if self._exec_session is not None:
+            yield
+            return
+
+        process = self.lxc.exec(
+            instance_name=self.instance_name,
+            command=["sh"],
+            project=self.project,
+            remote=self.remote,
+            runner=subprocess.Popen,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._exec_session = ExecSession(process)
+        try:
+            yield
+        finally:
+            session, self._exec_session = self._exec_session, None
+            session.close()
+
     def exists(self) -> bool:
         """Check if instance exists.
 
@@ -333,13 +380,32 @@ class LXDInstance(Executor):
 
         :raises LXDError: On unexpected error.
         """
-        instances = self.lxc.list(project=self.project, remote=self.remote)
+        if self._cached_state is not None:
+            timestamp, state = self._cached_state
+            if time.monotonic() - timestamp < self.state_cache_ttl:
+                return state
 
+        instances = self.lxc.list(
+            instance_name=self.instance_name,
+            columns=["name", "status"],
+            project=self.project,
+            remote=self.remote,
+        )
+
+        state = None
         for instance in instances:
             if instance["name"] == self.instance_name:
-                return instance
+                state = instance
+                break
+
+        if self.state_cache_ttl > 0:
+            self._cached_state = (time.monotonic(), state)
+
+        return state
 
-        return None
+    def invalidate_state_cache(self) -> None:
+        """Discard cached instance state, forcing the next query to LXD."""
+        self._cached_state = None
 
     def is_mounted(
         self, *, host_source: pathlib.Path, target: pathlib.PurePath
@@ -374,6 +440,7 @@ class LXDInstance(Executor):
 
         return state.get("status") == "Running"
 
+    @instrumentation.traced("lxd.instance_launch")
     def launch(
         self,
         *,
@@ -404,15 +471,18 @@ class LXDInstance(Executor):
         if self._host_supports_mknod():
             config_keys["security.syscalls.intercept.mknod"] = "true"
 
-        self.lxc.launch(
-            config_keys=config_keys,
-            ephemeral=ephemeral,
-            instance_name=self.instance_name,
-            image=image,
-            image_remote=image_remote,
-            project=self.project,
-            remote=self.remote,
-        )
+        try:
+            self.lxc.launch(
+                config_keys=config_keys,
+                ephemeral=ephemeral,
+                instance_name=self.instance_name,
+                image=image,
+                image_remote=image_remote,
+                project=self.project,
+                remote=self.remote,
+            )
+        finally:
+            self.invalidate_state_cache()
 
     def mount(
         self,
@@ -456,7 +526,7 @@ class LXDInstance(Executor):
 
         :raises LXDError: On unexpected error.
         """
-        cfg = self.lxc.info(project=self.project, remote=self.remote)
+        cfg = self.lxc.server_info(project=self.project, remote=self.remote)
         env = cfg.get("environment", {})
         kernel_features = env.get("kernel_features", {})
         seccomp_listener = kernel_features.get("seccomp_listener", "false")
@@ -474,72 +544,125 @@ class LXDInstance(Executor):
             directory does not exist.
         :raises LXDError: On unexpected error copying file.
         """
-        proc = self.execute_run(["test", "-f", source.as_posix()], check=False)
-        if proc.returncode != 0:
-            raise FileNotFoundError(f"File not found: {source.as_posix()!r}")
-
-        if not destination.parent.is_dir():
-            raise FileNotFoundError(f"Directory not found: {str(destination.parent)!r}")
+        instance_helpers.check_pull_destination(destination)
 
-        self.lxc.file_pull(
-            instance_name=self.instance_name,
-            source=source,
-            destination=destination,
-            project=self.project,
-            remote=self.remote,
-        )
+        message = f"File not found: {source.as_posix()!r}"
+        with instance_helpers.raise_file_not_found(message):
+            self.lxc.file_pull(
+                instance_name=self.instance_name,
+                source=source,
+                destination=destination,
+                project=self.project,
+                remote=self.remote,
+            )
 
-    def push_file(self, *, source: pathlib.Path, destination: pathlib.PurePath) -> None:
+    def push_file(
+        self,
+        *,
+        source: pathlib.Path,
+        destination: pathlib.PurePath,
+        skip_if_unchanged: bool = False,
+    ) -> None:
         """Copy a file from the host into the environment.
 
         :param source: Host file to copy.
         :param destination: Target environment file path to copy to.  Parent
             directory (destination.parent) must exist.
+        :param skip_if_unchanged: Skip the transfer if destination already has
+            the same content.
 
         :raises FileNotFoundError: If source file or destination's parent
             directory does not exist.
         :raises LXDError: On unexpected error copying file.
         """
-        if not source.is_file():
-            raise FileNotFoundError(f"File not found: {str(source)!r}")
+        instance_helpers.check_push_source(source)
 
-        proc = self.execute_run(
-            ["test", "-d", destination.parent.as_posix()], check=False
-        )
-        if proc.returncode != 0:
-            raise FileNotFoundError(
-                f"Directory not found: {str(destination.parent.as_posix())!r}"
-            )
+        if skip_if_unchanged and self._is_file_unchanged(
+            source=source, destination=destination
+        ):
+            return
 
         # Copy into target with uid/gid 0, rather than copying the IDs from the
         # host file.
-        self.lxc.file_push(
-            instance_name=self.instance_name,
-            source=source,
-            destination=destination,
-            project=self.project,
-            remote=self.remote,
-            gid=0,
-            uid=0,
-        )
+        message = f"Directory not found: {destination.parent.as_posix()!r}"
+        with instance_helpers.raise_file_not_found(message):
+            self.lxc.file_push(
+                instance_name=self.instance_name,
+                source=source,
+                destination=destination,
+                project=self.project,
+                remote=self.remote,
+                gid=0,
+                uid=0,
+            )
+
+    def reset(
+        self,
+        name: str = _DEFAULT_CHECKPOINT_NAME,
+        *,
+        base_configuration: Optional[Base] = None,
+    ) -> None:
+        """Reset instance to a checkpoint, and ensure it is running.
+
+        This is much faster than deleting, launching and setting up the
+        instance again.  The checkpoint is kept, for further resets.
+
+        Restoring a checkpoint reboots the instance, so it may still be booting
+        when this returns.  Given the base configuration the instance was set
+        up with, its warmup is run to wait until the instance is ready for use
+        again.
+
+        :param name: Name of checkpoint.
+        :param base_configuration: Base configuration to warm up instance with.
+
+        :raises LXDError: On unexpected error, e.g. if there is no such
+            checkpoint.
+        :raises BaseConfigurationError: On unexpected error warming up instance.
+        """
+        try:
+            self.lxc.restore(
+                instance_name=self.instance_name,
+                snapshot_name=name,
+                project=self.project,
+                remote=self.remote,
+            )
+        finally:
+            self.invalidate_state_cache()
+
+        if not self.is_running():
+            self.start()
 
+        if base_configuration is not None:
+            base_configuration.warmup(executor=self)
+
+    @instrumentation.traced("lxd.instance_start")
     def start(self) -> None:
         """Start instance.
 
         :raises LXDError: on unexpected error.
         """
-        self.lxc.start(
-            instance_name=self.instance_name, project=self.project, remote=self.remote
-        )
+        try:
+            self.lxc.start(
+                instance_name=self.instance_name,
+                project=self.project,
+                remote=self.remote,
+            )
+        finally:
+            self.invalidate_state_cache()
 
     def stop(self) -> None:
         """Stop instance.
 
         :raises LXDError: on unexpected error.
         """
-        self.lxc.stop(
-            instance_name=self.instance_name, project=self.project, remote=self.remote
-        )
+        try:
+            self.lxc.stop(
+                instance_name=self.instance_name,
+                project=self.project,
+                remote=self.remote,
+            )
+        finally:
+            self.invalidate_state_cache()
 
     def supports_mount(self) -> bool:
         """Check if instance supports mounting from host.
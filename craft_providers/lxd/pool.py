@@ -0,0 +1,258 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""Pool of warm LXD instances."""
+
+import concurrent.futures
+import logging
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+from craft_providers import Base, ProviderError
+
+from . import launcher
+from .errors import LXDError
+from .lxc import LXC
+from .lxd_instance import LXDInstance
+
+logger = logging.getLogger(__name__)
+
+# Name of the snapshot of a set up pool instance, to which it is reset on
+# release.
+_POOL_SNAPSHOT_NAME = "craft-providers-pool"
+
+
+class InstancePool:  # pylint: disable=too-many-instance-attributes
+    """Pool of launched and set up LXD instances for one base configuration.
+
+    Instances are launched with launcher.launch() in the background, so that
+    acquire() can hand one out without waiting for it to boot and be set up.
+    Each acquired instance is replaced by launching another.  Released
+    instances are reset to their state once set up and warmed up again, then
+    returned to the pool, or deleted if the pool already has enough idle
+    instances.
+
+    The pool may be used as a context manager, closing it on exit.
+
+    :param base_configuration: Base configuration to apply to instances.
+    :param image_name: LXD image to use, e.g. "20.04".
+    :param image_remote: LXD image to use, e.g. "ubuntu".
+    :param size: Number of idle instances to keep.
+    :param name_prefix: Prefix of names of pool instances.
+    :param map_user_uid: Map host uid/gid to instances' root uid/gid.
+    :param uid: The uid to be mapped, if ``map_user_id`` is enabled.
+    :param use_snapshots: Use LXD snapshots for bootstrapping images.
+    :param use_golden_instances: Create instances as copies of golden instances.
+    :param project: LXD project to create instances in.
+    :param remote: LXD remote to create instances on.
+    :param lxc: LXC client.
+    :param max_workers: Maximum number of instances launched at once, by
+        default the pool size.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        base_configuration: Base,
+        image_name: str,
+        image_remote: str,
+        size: int = 1,
+        name_prefix: str = "craft-pool",
+        map_user_uid: bool = False,
+        uid: Optional[int] = None,
+        use_snapshots: bool = False,
+        use_golden_instances: bool = False,
+        project: str = "default",
+        remote: str = "local",
+        lxc: Optional[LXC] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.size = size
+        self.name_prefix = name_prefix
+
+        if lxc is None:
+            lxc = LXC()
+
+        # Arguments of launcher.launch() for each instance, besides its name.
+        self._launch_kwargs: Dict[str, Any] = {
+            "base_configuration": base_configuration,
+            "image_name": image_name,
+            "image_remote": image_remote,
+            "map_user_uid": map_user_uid,
+            "uid": uid,
+            "use_snapshots": use_snapshots,
+            "use_golden_instances": use_golden_instances,
+            "project": project,
+            "remote": remote,
+            "lxc": lxc,
+        }
+
+        self._idle: List[LXDInstance] = []
+        self._leased: Dict[str, LXDInstance] = {}
+        self._pending = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers or max(size, 1),
+            thread_name_prefix="craft-providers-pool",
+        )
+
+    def __enter__(self) -> "InstancePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _launch(self) -> LXDInstance:
+        """Launch and set up an instance, and snapshot it to reset to later."""
+        instance = launcher.launch(
+            f"{self.name_prefix}-{uuid.uuid4().hex[:12]}", **self._launch_kwargs
+        )
+        instance.checkpoint(_POOL_SNAPSHOT_NAME)
+        return instance
+
+    def _launch_idle(self) -> None:
+        """Launch an instance into the pool, from a worker thread."""
+        instance: Optional[LXDInstance] = None
+        try:
+            instance = self._launch()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning("Failed to launch pool instance: %s", error)
+
+        with self._condition:
+            self._pending -= 1
+            closed = self._closed
+            if instance is not None and not closed:
+                self._idle.append(instance)
+            self._condition.notify_all()
+
+        if instance is not None and closed:
+            instance.delete()
+
+    def _replenish(self) -> None:
+        """Start launching instances until the pool is full.
+
+        Must be called with the condition held.
+        """
+        while not self._closed and len(self._idle) + self._pending < self.size:
+            self._pending += 1
+            self._executor.submit(self._launch_idle)
+
+    @property
+    def idle_count(self) -> int:
+        """Number of instances ready to be acquired."""
+        with self._condition:
+            return len(self._idle)
+
+    def fill(self, *, wait: bool = False, timeout: Optional[float] = None) -> None:
+        """Start launching instances until the pool is full.
+
+        :param wait: Wait for the launches to finish.
+        :param timeout: Maximum seconds to wait.
+        """
+        with self._condition:
+            self._replenish()
+            if wait:
+                self._condition.wait_for(lambda: not self._pending, timeout=timeout)
+
+    def acquire(self) -> LXDInstance:
+        """Take an instance from the pool.
+
+        An idle instance is handed out immediately, and another is launched in
+        the background to replace it.  If there is none, an instance being
+        launched is waited for, or one is launched if none is.
+
+        :returns: Running, set up LXD instance.
+
+        :raises LXDError: If the pool is closed or on unexpected LXD error.
+        :raises BaseConfigurationError: on unexpected error configuring base.
+        """
+        with self._condition:
+            if self._closed:
+                raise LXDError(brief="Instance pool is closed.")
+
+            self._condition.wait_for(lambda: self._idle or not self._pending)
+            instance = self._idle.pop(0) if self._idle else None
+            self._replenish()
+
+        if instance is None:
+            logger.debug("No idle pool instance, launching one.")
+            instance = self._launch()
+
+        with self._condition:
+            self._leased[instance.instance_name] = instance
+
+        return instance
+
+    def release(self, instance: LXDInstance, *, reset: bool = True) -> None:
+        """Return an acquired instance to the pool.
+
+        :param instance: Instance returned by acquire().
+        :param reset: Reset the instance and keep it in the pool, if the pool
+            has fewer than ``size`` idle instances.  Otherwise, the instance is
+            deleted.
+
+        :raises LXDError: If the instance was not acquired from the pool.
+        """
+        with self._condition:
+            if self._leased.pop(instance.instance_name, None) is None:
+                raise LXDError(
+                    brief=(
+                        f"Instance {instance.instance_name!r} was not acquired"
+                        " from pool."
+                    )
+                )
+            keep = reset and not self._closed and len(self._idle) < self.size
+
+        if keep:
+            try:
+                # Wait for the rebooted instance, as a fresh launch does.
+                instance.reset(
+                    _POOL_SNAPSHOT_NAME,
+                    base_configuration=self._launch_kwargs["base_configuration"],
+                )
+            except ProviderError as error:
+                logger.warning(
+                    "Failed to reset pool instance %r: %s",
+                    instance.instance_name,
+                    error,
+                )
+                keep = False
+
+        if keep:
+            with self._condition:
+                self._idle.append(instance)
+                self._condition.notify_all()
+        else:
+            instance.delete()
+
+    def close(self) -> None:
+        """Stop launching instances and delete idle ones.
+
+        Instances still acquired are deleted when released.
+        """
+        with self._condition:
+            self._closed = True
+
+        self._executor.shutdown(wait=True)
+
+        with self._condition:
+            idle, self._idle = self._idle, []
+
+        for instance in idle:
+            instance.delete()
@@ -16,7 +16,9 @@
 #
 
 """Project helper utilities."""
+import concurrent.futures
 import logging
+from typing import Callable, Dict, List, Optional
 
 from .lxc import LXC
 
@@ -52,14 +54,63 @@ def create_with_default_profile(
     lxc.profile_edit(profile="default", project=project, config=config, remote=remote)
 
 
-def purge(*, lxc: LXC, project: str, remote: str = "local") -> None:
+# Function reporting purge progress, called with the kind of object deleted
+# ("instance" or "image"), its name, and the numbers of objects of this kind
+# processed so far and in total.
+PurgeProgress = Callable[[str, str, int, int], None]
+
+
+def _delete_all(
+    *,
+    kind: str,
+    names: List[str],
+    delete: Callable[[str], None],
+    max_workers: int,
+    progress: Optional[PurgeProgress],
+) -> None:
+    """Delete objects concurrently, carrying on if some cannot be deleted.
+
+    :raises LXDError: The error deleting the first object which could not be
+        deleted, once all the others are.
+    """
+    errors: Dict[str, BaseException] = {}
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="craft-providers-purge"
+    ) as executor:
+        futures = {executor.submit(delete, name): name for name in names}
+        for processed, future in enumerate(
+            concurrent.futures.as_completed(futures), start=1
+        ):
+            name = futures[future]
+            error = future.exception()
+            if error is not None:
+                errors[name] = error
+            if progress is not None:
+                progress(kind, name, processed, len(names))
+
+    for name in names:
+        if name in errors:
+            raise errors[name]
+
+
+def purge(
+    *,
+    lxc: LXC,
+    project: str,
+    remote: str = "local",
+    max_workers: int = 8,
+    progress: Optional[PurgeProgress] = None,
+) -> None:
     """Purge a project including its instances and images.
 
     The lxc command does not provide a straight-forward option to purge a
     project.  This helper will purge anything related to a specified one.
+    Instances, and then images, are deleted concurrently.
 
     :param project: Name of project to delete.
     :param remote: Name of remote.
+    :param max_workers: Maximum number of objects to delete at once.
+    :param progress: Function to call as each instance or image is processed.
 
     :raises LXDError: on unexpected error.
     """
@@ -71,8 +122,7 @@ def purge(*, lxc: LXC, project: str, remote: str = "local") -> None:
         )
         return
 
-    # Cleanup any outstanding instance_names.
-    for instance_name in lxc.list_names(project=project, remote=remote):
+    def delete_instance(instance_name: str) -> None:
         logger.debug(
             "Deleting instance %r from project %r on remote %r.",
             instance_name,
@@ -86,12 +136,35 @@ def purge(*, lxc: LXC, project: str, remote: str = "local") -> None:
             force=True,
         )
 
-    # Cleanup any outstanding images.
-    for image in lxc.image_list(project=project):
+    def delete_image(fingerprint: str) -> None:
         logger.debug(
-            "Deleting image %r from project %r on remote %r.", image, project, remote
+            "Deleting image %r from project %r on remote %r.",
+            fingerprint,
+            project,
+            remote,
         )
-        lxc.image_delete(image=image["fingerprint"], project=project, remote=remote)
+        lxc.image_delete(image=fingerprint, project=project, remote=remote)
+
+    # Cleanup any outstanding instance_names.
+    _delete_all(
+        kind="instance",
+        names=lxc.list_names(project=project, remote=remote),
+        delete=delete_instance,
+        max_workers=max_workers,
+        progress=progress,
+    )
+
+    # Cleanup any outstanding images.
+    _delete_all(
+        kind="image",
+        names=[
+            image["fingerprint"]
+            for image in lxc.image_list(project=project, remote=remote)
+        ],
+        delete=delete_image,
+        max_workers=max_workers,
+        progress=progress,
+    )
 
     # Cleanup project.
     logger.debug("Deleting project %r on remote %r.", project, remote)
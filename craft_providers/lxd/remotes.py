@@ -16,7 +16,9 @@
 #
 
 """Remote helper utilities."""
+import concurrent.futures
 import logging
+from typing import Dict, Iterable, Optional, Tuple
 
 from .lxc import LXC
 
@@ -47,3 +49,96 @@ def configure_buildd_image_remote(
         logger.debug("Remote %r was successfully added.", BUILDD_REMOTE_NAME)
 
     return BUILDD_REMOTE_NAME
+
+
+def get_prefetch_alias(*, image: str, image_remote: str) -> str:
+    """Get the local alias of a prefetched image.
+
+    :param image: Name of image on its remote, e.g. "20.04".
+    :param image_remote: Name of image's remote.
+
+    :returns: Alias of image in the local image store.
+    """
+    return f"prefetch-{image_remote}-{image}"
+
+
+def _prefetch_image(
+    *,
+    image: str,
+    image_remote: str,
+    auto_update: bool,
+    project: str,
+    remote: str,
+    lxc: LXC,
+) -> None:
+    """Copy image into the image store, unless already prefetched."""
+    alias = get_prefetch_alias(image=image, image_remote=image_remote)
+    if lxc.has_image(image_name=alias, project=project, remote=remote):
+        logger.debug("Image %r was already prefetched.", alias)
+        return
+
+    lxc.image_copy(
+        image=image,
+        image_remote=image_remote,
+        alias=alias,
+        auto_update=auto_update,
+        project=project,
+        remote=remote,
+    )
+    logger.debug("Image %r was successfully prefetched.", alias)
+
+
+def prefetch_images(
+    images: Iterable[Tuple[str, str]],
+    *,
+    auto_update: bool = True,
+    max_workers: int = 4,
+    project: str = "default",
+    remote: str = "local",
+    lxc: Optional[LXC] = None,
+) -> Dict[Tuple[str, str], concurrent.futures.Future]:
+    """Copy remote images into the image store in the background.
+
+    Images are copied concurrently, each with an alias from
+    get_prefetch_alias().  Images which already have this alias are skipped,
+    so prefetching can be repeated cheaply, e.g. on every run of a tool.
+
+    Launching an instance from a remote image uses a copy in the image store
+    with the same fingerprint rather than downloading it again, so the launch
+    of a prefetched image only has to resolve its fingerprint.  With
+    auto_update, LXD keeps the copies up to date with their remotes.
+
+    :param images: Pairs of image remote and image name to copy, e.g.
+        (BUILDD_REMOTE_NAME, "core22").
+    :param auto_update: Keep the copies updated from their remotes.
+    :param max_workers: Maximum number of images to copy at once.
+    :param project: LXD project whose image store to copy into.
+    :param remote: LXD remote whose image store to copy into.
+    :param lxc: LXC client.
+
+    :returns: Future of each image's copy, by image remote and name.  Its
+        result is None, or it raises LXDError if the copy failed.
+    """
+    if lxc is None:
+        lxc = LXC()
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="craft-providers-prefetch"
+    )
+    futures = {}
+    try:
+        for image_remote, image in images:
+            futures[(image_remote, image)] = executor.submit(
+                _prefetch_image,
+                image=image,
+                image_remote=image_remote,
+                auto_update=auto_update,
+                project=project,
+                remote=remote,
+                lxc=lxc,
+            )
+    finally:
+        # Let the workers finish in the background.
+        executor.shutdown(wait=False)
+
+    return futures
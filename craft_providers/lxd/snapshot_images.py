@@ -0,0 +1,225 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""Garbage collection of snapshot images published by the launcher."""
+
+import dataclasses
+import datetime
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from .errors import LXDError
+from .lxc import LXC
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the aliases of snapshot images published by the launcher.
+SNAPSHOT_IMAGE_PREFIX = "snapshot-"
+
+# Image property recording when a snapshot image was last used.
+LAST_USED_PROPERTY = "craft_providers.last_used"
+
+
+@dataclasses.dataclass(frozen=True)
+class SnapshotImage:
+    """Snapshot image published by the launcher.
+
+    :param alias: Alias of image, e.g. "snapshot-ubuntu-20.04-base-v1".
+    :param fingerprint: Fingerprint of image.
+    :param size: Size of image in bytes.
+    :param created_at: When the image was created.
+    :param last_used_at: When the image was last used, or None if never.
+    """
+
+    alias: str
+    fingerprint: str
+    size: int
+    created_at: Optional[datetime.datetime]
+    last_used_at: Optional[datetime.datetime]
+
+    @property
+    def last_activity(self) -> datetime.datetime:
+        """When the image was last used, or else created."""
+        return (
+            self.last_used_at
+            or self.created_at
+            or datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+        )
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime.datetime]:
+    """Parse a timestamp from LXD, which has a zero year if unset.
+
+    LXD gives fractions of seconds of any length up to nanoseconds, which are
+    rounded down to microseconds.
+    """
+    if not value:
+        return None
+
+    value = re.sub(r"\.(\d+)", lambda m: "." + m.group(1).ljust(6, "0")[:6], value)
+    value = re.sub(r"Z$", "+00:00", value)
+    try:
+        timestamp = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        logger.debug("Failed to parse timestamp %r.", value)
+        return None
+
+    if timestamp.year <= 1:
+        return None
+
+    return timestamp
+
+
+def _get_snapshot_image(image: Dict[str, Any]) -> Optional[SnapshotImage]:
+    """Get snapshot image from an image listed by LXD, if it is one."""
+    aliases = [
+        alias["name"]
+        for alias in image.get("aliases") or []
+        if alias["name"].startswith(SNAPSHOT_IMAGE_PREFIX)
+    ]
+    if not aliases:
+        return None
+
+    last_used_at = [
+        timestamp
+        for timestamp in (
+            _parse_timestamp(image.get("last_used_at")),
+            _parse_timestamp((image.get("properties") or {}).get(LAST_USED_PROPERTY)),
+        )
+        if timestamp is not None
+    ]
+
+    return SnapshotImage(
+        alias=aliases[0],
+        fingerprint=image["fingerprint"],
+        size=image.get("size", 0),
+        created_at=_parse_timestamp(image.get("created_at")),
+        last_used_at=max(last_used_at) if last_used_at else None,
+    )
+
+
+def list_snapshot_images(
+    *, lxc: LXC, project: str = "default", remote: str = "local"
+) -> List[SnapshotImage]:
+    """List snapshot images, most recently used first.
+
+    :param lxc: LXC client.
+    :param project: LXD project.
+    :param remote: LXD remote.
+
+    :returns: Snapshot images.
+
+    :raises LXDError: on unexpected error.
+    """
+    images = []
+    for image in lxc.image_list(project=project, remote=remote):
+        snapshot_image = _get_snapshot_image(image)
+        if snapshot_image is not None:
+            images.append(snapshot_image)
+
+    return sorted(images, key=lambda i: i.last_activity, reverse=True)
+
+
+def record_snapshot_image_use(
+    *, lxc: LXC, image_name: str, project: str = "default", remote: str = "local"
+) -> None:
+    """Record that a snapshot image has just been used.
+
+    LXD records when instances are created from an image, but not other uses
+    of it.  Failure to record use is logged and ignored, as older LXD
+    releases cannot set image properties.
+
+    :param lxc: LXC client.
+    :param image_name: Alias of snapshot image.
+    :param project: LXD project.
+    :param remote: LXD remote.
+    """
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    try:
+        lxc.image_set_property(
+            image=image_name,
+            key=LAST_USED_PROPERTY,
+            value=now.isoformat(),
+            project=project,
+            remote=remote,
+        )
+    except LXDError as error:
+        logger.debug("Failed to record use of image %r: %s", image_name, error)
+
+
+def _get_running_instance_images(*, lxc: LXC, project: str, remote: str) -> List[str]:
+    """Get fingerprints of the images from which running instances were created."""
+    return [
+        instance["config"]["volatile.base_image"]
+        for instance in lxc.list(project=project, remote=remote)
+        if instance.get("status") == "Running"
+        and "volatile.base_image" in instance.get("config", {})
+    ]
+
+
+def collect_snapshot_images(
+    *,
+    lxc: LXC,
+    max_count: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    dry_run: bool = False,
+    project: str = "default",
+    remote: str = "local",
+) -> List[SnapshotImage]:
+    """Delete least recently used snapshot images beyond the given limits.
+
+    Images are kept in order of most recent use until a limit would be
+    exceeded, and all less recently used ones are deleted.  Images from
+    which a running instance was created are never deleted, but count
+    towards the limits.
+
+    :param lxc: LXC client.
+    :param max_count: Maximum number of snapshot images to keep.
+    :param max_bytes: Maximum total size of snapshot images to keep.
+    :param dry_run: Only determine which images would be deleted.
+    :param project: LXD project.
+    :param remote: LXD remote.
+
+    :returns: Images deleted, or to be deleted if dry_run is set.
+
+    :raises LXDError: on unexpected error.
+    """
+    in_use = set(_get_running_instance_images(lxc=lxc, project=project, remote=remote))
+    kept_count = 0
+    kept_bytes = 0
+    full = False
+    evicted = []
+
+    for image in list_snapshot_images(lxc=lxc, project=project, remote=remote):
+        full = (
+            full
+            or (max_count is not None and kept_count >= max_count)
+            or (max_bytes is not None and kept_bytes + image.size > max_bytes)
+        )
+        if full and image.fingerprint not in in_use:
+            evicted.append(image)
+        else:
+            kept_count += 1
+            kept_bytes += image.size
+
+    for image in evicted:
+        logger.debug("Deleting snapshot image %r.", image.alias)
+        if not dry_run:
+            lxc.image_delete(image=image.fingerprint, project=project, remote=remote)
+
+    return evicted
@@ -17,7 +17,7 @@
 
 """Multipass provider support package."""
 
-from ._launch import launch  # noqa: F401
+from ._launch import launch, launch_many  # noqa: F401
 from ._ready import ensure_multipass_is_ready  # noqa: F401
 from .errors import MultipassError, MultipassInstallationError  # noqa: F401
 from .installer import install, is_installed  # noqa: F401
@@ -33,4 +33,5 @@ __all__ = [
     "is_installed",
     "ensure_multipass_is_ready",
     "launch",
+    "launch_many",
 ]
@@ -18,8 +18,9 @@
 """Multipass Provider."""
 
 import logging
+from typing import List, Sequence
 
-from craft_providers import Base, bases
+from craft_providers import Base, LaunchResult, LaunchSpec, bases, parallel
 
 from .multipass_instance import MultipassInstance
 
@@ -81,3 +82,46 @@ def launch(
     )
     base_configuration.setup(executor=instance)
     return instance
+
+
+def launch_many(
+    specs: Sequence[LaunchSpec],
+    *,
+    max_workers: int = 4,
+    fail_fast: bool = False,
+    cpus: int = 2,
+    disk_gb: int = 64,
+    mem_gb: int = 2,
+    auto_clean: bool = False,
+) -> List[LaunchResult]:
+    """Create, start, and configure several instances concurrently.
+
+    Each instance is launched as by launch(), with the name, base
+    configuration and image name of its spec and the other options given
+    here.
+
+    :param specs: Instances to launch.
+    :param max_workers: Maximum number of instances to launch at once.
+    :param fail_fast: Cancel launches not yet started once one fails.
+    :param cpus: Number of CPUs of each instance.
+    :param disk_gb: Disk allocation of each instance in gigabytes.
+    :param mem_gb: Memory allocation of each instance in gigabytes.
+    :param auto_clean: Automatically clean instances, if incompatible.
+
+    :returns: Result of each launch, in the order of specs.
+    """
+
+    def launch_spec(spec: LaunchSpec) -> MultipassInstance:
+        return launch(
+            spec.name,
+            base_configuration=spec.base_configuration,
+            image_name=spec.image_name,
+            cpus=cpus,
+            disk_gb=disk_gb,
+            mem_gb=mem_gb,
+            auto_clean=auto_clean,
+        )
+
+    return parallel.launch_many(
+        specs, launch_spec, max_workers=max_workers, fail_fast=fail_fast
+    )
@@ -33,7 +33,7 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pkg_resources
 
-from craft_providers import errors
+from craft_providers import errors, instrumentation
 
 from .errors import MultipassError
 
@@ -60,10 +60,18 @@ class Multipass:
         It always checks the result (as no errors should pass silently) and captures the
         output (so `multipass` does not pollute the terminal).
         """
-        command = [str(self.multipass_path), *command]
-
-        logger.debug("Executing on host: %s", shlex.join(command))
-        return subprocess.run(command, check=True, capture_output=True, **kwargs)
+        final_cmd = [str(self.multipass_path), *command]
+
+        logger.debug("Executing on host: %s", shlex.join(final_cmd))
+        return instrumentation.timed_run(
+            subprocess.run,
+            final_cmd,
+            provider="multipass",
+            subcommand=command[0],
+            check=True,
+            capture_output=True,
+            **kwargs,
+        )
 
     def delete(self, *, instance_name: str, purge=True) -> None:
         """Passthrough for running multipass delete.
@@ -110,7 +118,9 @@ class Multipass:
         quoted_final_cmd = shlex.join(final_cmd)
         logger.debug("Executing on host: %s", quoted_final_cmd)
 
-        return runner(final_cmd, **kwargs)  # pylint: disable=subprocess-run-check
+        return instrumentation.timed_run(
+            runner, final_cmd, provider="multipass", subcommand="exec", **kwargs
+        )
 
     def info(self, *, instance_name: str) -> Dict[str, Any]:
         """Get information/state for instance.
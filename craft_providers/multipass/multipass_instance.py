@@ -86,6 +86,7 @@ class MultipassInstance(Executor):
         file_mode: str,
         group: str = "root",
         user: str = "root",
+        skip_if_unchanged: bool = False,
     ) -> None:
         """Create or replace file with content and file mode.
 
@@ -98,7 +99,14 @@ class MultipassInstance(Executor):
         :param file_mode: File mode string (e.g. '0644').
         :param group: File group owner/id.
         :param user: File user owner/id.
+        :param skip_if_unchanged: Skip writing the file if destination already
+            has the same content.
         """
+        if skip_if_unchanged and self._is_content_unchanged(
+            content=content, destination=destination
+        ):
+            return
+
         try:
             tmp_file_path = self._multipass.exec(
                 instance_name=self.name,
@@ -342,12 +350,20 @@ class MultipassInstance(Executor):
             source=f"{self.name}:{source.as_posix()}", destination=str(destination)
         )
 
-    def push_file(self, *, source: pathlib.Path, destination: pathlib.PurePath) -> None:
+    def push_file(
+        self,
+        *,
+        source: pathlib.Path,
+        destination: pathlib.PurePath,
+        skip_if_unchanged: bool = False,
+    ) -> None:
         """Copy a file from the host into the environment.
 
         :param source: Host file to copy.
         :param destination: Target environment file path to copy to.  Parent
             directory (destination.parent) must exist.
+        :param skip_if_unchanged: Skip the transfer if destination already has
+            the same content.
 
         :raises FileNotFoundError: If source file or destination's parent
             directory does not exist.
@@ -356,6 +372,11 @@ class MultipassInstance(Executor):
         if not source.is_file():
             raise FileNotFoundError(f"File not found: {str(source)!r}")
 
+        if skip_if_unchanged and self._is_file_unchanged(
+            source=source, destination=destination
+        ):
+            return
+
         proc = self.execute_run(
             ["test", "-d", destination.parent.as_posix()], check=False
         )
@@ -0,0 +1,120 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""Concurrent launching of several instances.
+
+The providers' launch_many() functions use launch_many() to run their
+launch() for each LaunchSpec.
+"""
+
+import concurrent.futures
+import dataclasses
+import logging
+import threading
+from typing import Callable, List, Optional, Sequence
+
+from .base import Base
+from .executor import Executor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class LaunchSpec:
+    """Instance to launch.
+
+    :param name: Name of instance.
+    :param base_configuration: Base configuration to apply to instance.
+    :param image_name: Image to use, e.g. "20.04".
+    :param image_remote: Remote of image, for providers having remotes.
+    """
+
+    name: str
+    base_configuration: Base
+    image_name: str
+    image_remote: Optional[str] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class LaunchResult:
+    """Outcome of launching an instance.
+
+    :param spec: Instance which was to be launched.
+    :param instance: Launched instance, if successful.
+    :param error: Error raised by the launch, if it failed.
+    :param cancelled: Whether the launch was cancelled before it started.
+    """
+
+    spec: LaunchSpec
+    instance: Optional[Executor] = None
+    error: Optional[BaseException] = None
+    cancelled: bool = False
+
+
+class _LaunchCancelled(Exception):
+    """Launch cancelled as another failed."""
+
+
+def launch_many(
+    specs: Sequence[LaunchSpec],
+    launcher: Callable[[LaunchSpec], Executor],
+    *,
+    max_workers: int = 4,
+    fail_fast: bool = False,
+) -> List[LaunchResult]:
+    """Launch instances concurrently.
+
+    :param specs: Instances to launch.
+    :param launcher: Function launching the instance of a spec.
+    :param max_workers: Maximum number of instances to launch at once.
+    :param fail_fast: Cancel launches not yet started once one fails.  Those
+        already started are left to finish.
+
+    :returns: Result of each launch, in the order of specs.
+    """
+    failed = threading.Event()
+
+    def launch(spec: LaunchSpec) -> Executor:
+        # Checked by the workers themselves, as they may start the next launch
+        # before a failure could be noticed by the caller.
+        if failed.is_set():
+            raise _LaunchCancelled()
+
+        try:
+            return launcher(spec)
+        except BaseException:
+            if fail_fast:
+                failed.set()
+            raise
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="craft-providers-launch"
+    ) as executor:
+        futures = [executor.submit(launch, spec) for spec in specs]
+
+    results = []
+    for spec, future in zip(specs, futures):
+        error = future.exception()
+        if error is None:
+            results.append(LaunchResult(spec=spec, instance=future.result()))
+        elif isinstance(error, _LaunchCancelled):
+            results.append(LaunchResult(spec=spec, cancelled=True))
+        else:
+            logger.debug("Failed to launch instance %r: %s", spec.name, error)
+            results.append(LaunchResult(spec=spec, error=error))
+
+    return results
@@ -121,9 +121,6 @@ def test_inject_from_host_classic(
     tmp_path,
 ):
 
-    fake_process.register_subprocess(
-        ["fake-executor", "rm", "-f", "/tmp/test-name.snap"]
-    )
     fake_process.register_subprocess(
         [
             "fake-executor",
@@ -146,7 +143,7 @@ def test_inject_from_host_classic(
         mock.call.get().iter_content().__iter__(),
     ]
 
-    assert len(fake_process.calls) == 2
+    assert len(fake_process.calls) == 1
     assert Exact("Installing snap 'test-name' from host (classic=True)") in logs.debug
     assert "Revisions found: host='2', target='1'" in logs.debug
 
@@ -173,9 +170,6 @@ def test_inject_from_host_strict(
     logs,
     tmp_path,
 ):
-    fake_process.register_subprocess(
-        ["fake-executor", "rm", "-f", "/tmp/test-name.snap"]
-    )
     fake_process.register_subprocess(
         [
             "fake-executor",
@@ -197,7 +191,7 @@ def test_inject_from_host_strict(
         mock.call.get().iter_content().__iter__(),
     ]
 
-    assert len(fake_process.calls) == 2
+    assert len(fake_process.calls) == 1
     assert Exact("Installing snap 'test-name' from host (classic=False)") in logs.debug
     assert "Revisions found: host='2', target='1'" in logs.debug
 
@@ -257,10 +251,6 @@ def test_inject_from_host_push_error(
     mock_executor = mock.Mock(spec=fake_executor, wraps=fake_executor)
     mock_executor.push_file.side_effect = ProviderError(brief="foo")
 
-    fake_process.register_subprocess(
-        ["fake-executor", "rm", "-f", "/tmp/test-name.snap"]
-    )
-
     with pytest.raises(snap_installer.SnapInstallationError) as exc_info:
         snap_installer.inject_from_host(
             executor=mock_executor, snap_name="test-name", classic=False
@@ -271,6 +261,11 @@ def test_inject_from_host_push_error(
         details="Error copying snap into target environment.",
     )
     assert exc_info.value.__cause__ is not None
+    mock_executor.push_file.assert_called_once_with(
+        source=mock.ANY,
+        destination=pathlib.Path("/tmp/test-name.snap"),
+        skip_if_unchanged=True,
+    )
 
 
 def test_inject_from_host_snapd_connection_error_using_pack_fallback(
@@ -283,9 +278,6 @@ def test_inject_from_host_snapd_connection_error_using_pack_fallback(
 ):
     mock_requests.get.side_effect = requests.exceptions.ConnectionError()
 
-    fake_process.register_subprocess(
-        ["fake-executor", "rm", "-f", "/tmp/test-name.snap"]
-    )
     fake_process.register_subprocess(
         [
             "snap",
@@ -311,7 +303,7 @@ def test_inject_from_host_snapd_connection_error_using_pack_fallback(
     assert mock_requests.mock_calls == [
         mock.call.get("http+unix://%2Frun%2Fsnapd.socket/v2/snaps/test-name/file"),
     ]
-    assert len(fake_process.calls) == 3
+    assert len(fake_process.calls) == 2
 
 
 def test_inject_from_host_snapd_http_error_using_pack_fallback(
@@ -325,9 +317,6 @@ def test_inject_from_host_snapd_http_error_using_pack_fallback(
     mock_requests.get.return_value.raise_for_status.side_effect = (
         requests.exceptions.HTTPError()
     )
-    fake_process.register_subprocess(
-        ["fake-executor", "rm", "-f", "/tmp/test-name.snap"]
-    )
     fake_process.register_subprocess(
         [
             "snap",
@@ -355,15 +344,12 @@ def test_inject_from_host_snapd_http_error_using_pack_fallback(
         mock.call.get().raise_for_status(),
     ]
 
-    assert len(fake_process.calls) == 3
+    assert len(fake_process.calls) == 2
 
 
 def test_inject_from_host_install_failure(
     mock_requests, config_fixture, fake_executor, fake_process
 ):
-    fake_process.register_subprocess(
-        ["fake-executor", "rm", "-f", "/tmp/test-name.snap"]
-    )
     fake_process.register_subprocess(
         [
             "fake-executor",
@@ -387,7 +373,7 @@ def test_inject_from_host_install_failure(
         ),
     )
 
-    assert len(fake_process.calls) == 2
+    assert len(fake_process.calls) == 1
 
 
 @pytest.mark.parametrize(
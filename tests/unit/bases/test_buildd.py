@@ -18,12 +18,13 @@
 import subprocess
 from pathlib import Path
 from textwrap import dedent
-from unittest.mock import ANY, call, patch
+from unittest.mock import ANY, DEFAULT, Mock, call, patch
 
 import pytest
 from logassert import Exact  # type: ignore
 from pydantic import ValidationError
 
+from craft_providers import instrumentation
 from craft_providers.actions.snap_installer import SnapInstallationError
 from craft_providers.bases import (
     BaseCompatibilityError,
@@ -111,8 +112,8 @@ def mock_inject_from_host(mocker):
 @pytest.mark.parametrize(
     "packages, expected_packages",
     [
-        (None, ["apt-utils", "curl"]),
-        (["grep", "git"], ["apt-utils", "curl", "grep", "git"]),
+        (None, None),
+        (["grep", "git"], ["grep", "git"]),
     ],
 )
 @pytest.mark.parametrize(
@@ -215,8 +216,12 @@ def test_setup(  # pylint: disable=too-many-arguments, too-many-locals
     )
     fake_process.register_subprocess([*DEFAULT_FAKE_CMD, "apt-get", "update"])
     fake_process.register_subprocess(
-        [*DEFAULT_FAKE_CMD, "apt-get", "install", "-y"] + expected_packages
+        [*DEFAULT_FAKE_CMD, "apt-get", "install", "-y", "apt-utils", "curl"]
     )
+    if expected_packages:
+        fake_process.register_subprocess(
+            [*DEFAULT_FAKE_CMD, "apt-get", "install", "-y"] + expected_packages
+        )
     fake_process.register_subprocess(
         [*DEFAULT_FAKE_CMD, "apt-get", "install", "-y", "fuse", "udev"]
     )
@@ -258,25 +263,6 @@ def test_setup(  # pylint: disable=too-many-arguments, too-many-locals
     base_config.setup(executor=fake_executor)
 
     expected_push_file_io = [
-        dict(
-            destination="/etc/apt/apt.conf.d/20auto-upgrades",
-            content=dedent(
-                """\
-                APT::Periodic::Update-Package-Lists "10000";
-                APT::Periodic::Unattended-Upgrade "0";
-                """
-            ).encode(),
-            file_mode="0644",
-            group="root",
-            user="root",
-        ),
-        dict(
-            destination="/etc/environment",
-            content=etc_environment_content,
-            file_mode="0644",
-            group="root",
-            user="root",
-        ),
         dict(
             destination="/etc/craft-instance.conf",
             content=(f"compatibility_tag: {expected_tag}\n").encode(),
@@ -291,40 +277,63 @@ def test_setup(  # pylint: disable=too-many-arguments, too-many-locals
             group="root",
             user="root",
         ),
-        dict(
-            destination="/etc/systemd/network/10-eth0.network",
-            content=dedent(
-                """\
-                [Match]
-                Name=eth0
-
-                [Network]
-                DHCP=ipv4
-                LinkLocalAddressing=ipv6
-
-                [DHCP]
-                RouteMetric=100
-                UseMTU=true
-                """
-            ).encode(),
-            file_mode="0644",
-            group="root",
-            user="root",
-        ),
-        dict(
-            destination="/etc/apt/apt.conf.d/00no-recommends",
-            content=b'APT::Install-Recommends "false";\n',
-            file_mode="0644",
-            group="root",
-            user="root",
-        ),
-        dict(
-            destination="/etc/apt/apt.conf.d/00update-errors",
-            content=b'APT::Update::Error-Mode "any";\n',
-            file_mode="0644",
-            group="root",
-            user="root",
-        ),
+    ]
+    expected_push_files_io = [
+        [
+            dict(
+                destination="/etc/apt/apt.conf.d/20auto-upgrades",
+                content=dedent(
+                    """\
+                    APT::Periodic::Update-Package-Lists "10000";
+                    APT::Periodic::Unattended-Upgrade "0";
+                    """
+                ).encode(),
+                file_mode="0644",
+                group="root",
+                user="root",
+            ),
+            dict(
+                destination="/etc/environment",
+                content=etc_environment_content,
+                file_mode="0644",
+                group="root",
+                user="root",
+            ),
+            dict(
+                destination="/etc/systemd/network/10-eth0.network",
+                content=dedent(
+                    """\
+                    [Match]
+                    Name=eth0
+
+                    [Network]
+                    DHCP=ipv4
+                    LinkLocalAddressing=ipv6
+
+                    [DHCP]
+                    RouteMetric=100
+                    UseMTU=true
+                    """
+                ).encode(),
+                file_mode="0644",
+                group="root",
+                user="root",
+            ),
+            dict(
+                destination="/etc/apt/apt.conf.d/00no-recommends",
+                content=b'APT::Install-Recommends "false";\n',
+                file_mode="0644",
+                group="root",
+                user="root",
+            ),
+            dict(
+                destination="/etc/apt/apt.conf.d/00update-errors",
+                content=b'APT::Update::Error-Mode "any";\n',
+                file_mode="0644",
+                group="root",
+                user="root",
+            ),
+        ]
     ]
     expected_push_file = []
     if no_cdn:
@@ -336,6 +345,7 @@ def test_setup(  # pylint: disable=too-many-arguments, too-many-locals
         )
 
     assert fake_executor.records_of_push_file_io == expected_push_file_io
+    assert fake_executor.records_of_push_files_io == expected_push_files_io
     assert fake_executor.records_of_pull_file == []
     assert fake_executor.records_of_push_file == expected_push_file
     assert mock_install_from_store.mock_calls == expected_snap_call
@@ -450,24 +460,216 @@ def test_install_snaps_inject_from_host_error(fake_executor, mocker):
 
 
 def test_setup_apt(fake_executor, fake_process):
+    """Verify packages needed by setup are installed, not user-defined ones."""
+    base = buildd.BuilddBase(
+        alias=buildd.BuilddBaseAlias.JAMMY, packages=["grep", "git"]
+    )
+    fake_process.register_subprocess([*DEFAULT_FAKE_CMD, "apt-get", "update"])
+    fake_process.register_subprocess(
+        [*DEFAULT_FAKE_CMD, "apt-get", "install", "-y", "apt-utils", "curl"]
+    )
+
+    base._setup_apt(executor=fake_executor, deadline=None)
+
+
+def test_setup_packages(fake_executor, fake_process):
     """Verify packages are installed as expected."""
     packages = ["grep", "git"]
     base = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY, packages=packages)
-    fake_process.register_subprocess([*DEFAULT_FAKE_CMD, "apt-get", "update"])
     fake_process.register_subprocess(
-        [
-            *DEFAULT_FAKE_CMD,
-            "apt-get",
-            "install",
-            "-y",
-            "apt-utils",
-            "curl",
-            "grep",
-            "git",
-        ]
+        [*DEFAULT_FAKE_CMD, "apt-get", "install", "-y", "grep", "git"]
     )
 
-    base._setup_apt(executor=fake_executor, deadline=None)
+    base._setup_packages(executor=fake_executor, deadline=None)
+
+    assert len(fake_process.calls) == 1
+
+
+def test_setup_packages_none(fake_executor, fake_process):
+    base = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY)
+
+    base._setup_packages(executor=fake_executor, deadline=None)
+
+    assert len(fake_process.calls) == 0
+
+
+def test_setup_packages_span(fake_executor):
+    base = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY)
+    recorder = instrumentation.SpanRecorder()
+    instrumentation.add_span_sink(recorder)
+
+    try:
+        base._setup_packages(executor=fake_executor, deadline=None)
+    finally:
+        instrumentation.remove_span_sink(recorder)
+
+    assert [span.name for span in recorder.spans] == ["buildd.setup_packages"]
+
+
+def test_setup_packages_error(mocker, fake_executor):
+    error = subprocess.CalledProcessError(100, ["error"])
+    base = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY, packages=["grep"])
+
+    mocker.patch.object(fake_executor, "execute_run", side_effect=error)
+
+    with pytest.raises(errors.BaseConfigurationError) as exc_info:
+        base._setup_packages(executor=fake_executor, deadline=None)
+
+    assert exc_info.value == errors.BaseConfigurationError(
+        brief="Failed to install packages.",
+        details="* Command that failed: 'error'\n* Command exit code: 100",
+    )
+
+
+def test_get_setup_layers():
+    base = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY)
+    layers = base.get_setup_layers()
+
+    assert [layer.name for layer in layers] == ["system", "snapd", "packages"]
+    assert len({layer.fingerprint for layer in layers}) == 3
+    assert buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY).get_setup_layers() == (
+        layers
+    )
+
+
+def test_get_setup_layers_packages_changed():
+    layers = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY).get_setup_layers()
+
+    changed = buildd.BuilddBase(
+        alias=buildd.BuilddBaseAlias.JAMMY, packages=["grep"]
+    ).get_setup_layers()
+
+    assert changed[:2] == layers[:2]
+    assert changed[2] != layers[2]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"alias": buildd.BuilddBaseAlias.FOCAL},
+        {"compatibility_tag": "test-tag"},
+        {"environment": {"PATH": "/snap"}},
+    ],
+)
+def test_get_setup_layers_system_changed(kwargs):
+    layers = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY).get_setup_layers()
+
+    changed = buildd.BuilddBase(
+        **{"alias": buildd.BuilddBaseAlias.JAMMY, **kwargs}
+    ).get_setup_layers()
+
+    assert all(a.fingerprint != b.fingerprint for a, b in zip(layers, changed))
+
+
+def test_get_setup_layers_hostname_changed():
+    """Instances with other hostnames can share setup layers."""
+    layers = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY).get_setup_layers()
+
+    changed = buildd.BuilddBase(
+        alias=buildd.BuilddBaseAlias.JAMMY, hostname="test-hostname"
+    ).get_setup_layers()
+
+    assert changed == layers
+
+
+def test_get_setup_layers_no_cdn_changed(fake_filesystem):
+    layers = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY).get_setup_layers()
+    fake_filesystem.create_file(
+        "/etc/systemd/system/snapd.service.d/no-cdn.conf", contents="[Service]\n"
+    )
+
+    changed = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY).get_setup_layers()
+
+    assert changed[0] == layers[0]
+    assert changed[1] != layers[1]
+
+
+@pytest.mark.parametrize(
+    "resume_after,stages",
+    [
+        (None, ["system", "snapd", "packages"]),
+        ("system", ["snapd", "packages"]),
+        ("snapd", ["packages"]),
+        ("packages", []),
+    ],
+)
+def test_setup_layers(fake_executor, mocker, resume_after, stages):
+    base = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY)
+    mock_base = mocker.patch.multiple(
+        base,
+        _ensure_os_compatible=DEFAULT,
+        _ensure_instance_config_compatible=DEFAULT,
+        _setup_wait_for_system_ready=DEFAULT,
+        _setup_hostname=DEFAULT,
+        _setup_wait_for_network=DEFAULT,
+        _setup_system=DEFAULT,
+        _setup_snapd=DEFAULT,
+        _setup_packages=DEFAULT,
+        _setup_snapd_proxy=DEFAULT,
+        _install_snaps=DEFAULT,
+    )
+    layer_callback = Mock()
+
+    base.setup(
+        executor=fake_executor,
+        resume_after=resume_after,
+        layer_callback=layer_callback,
+    )
+
+    assert layer_callback.mock_calls == [call(stage) for stage in stages]
+    for stage in ["system", "snapd", "packages"]:
+        assert mock_base[f"_setup_{stage}"].called == (stage in stages)
+    assert mock_base["_setup_wait_for_system_ready"].called == (
+        resume_after is not None
+    )
+    assert mock_base["_setup_wait_for_network"].called == (resume_after is not None)
+    # The hostname is not part of the layers, so is set when resuming from one.
+    assert mock_base["_setup_hostname"].called == (resume_after is not None)
+    mock_base["_ensure_instance_config_compatible"].assert_called_once()
+    mock_base["_install_snaps"].assert_called_once()
+
+
+def test_setup_system_hostname_after_system_ready(mocker):
+    """/etc/hostname is written once cloud-init can no longer rewrite it."""
+    base = buildd.BuilddBase(
+        alias=buildd.BuilddBaseAlias.JAMMY, hostname="test-hostname"
+    )
+    manager = Mock()
+    mocker.patch.multiple(
+        base,
+        _setup_wait_for_system_ready=manager.wait_for_system_ready,
+        _setup_instance_config=DEFAULT,
+        _setup_resolved=DEFAULT,
+        _setup_networkd=DEFAULT,
+        _setup_wait_for_network=DEFAULT,
+        _setup_apt=DEFAULT,
+    )
+
+    base._setup_system(executor=manager.executor, deadline=None, retry_wait=0.0)
+
+    assert [
+        (name, call_kwargs.get("destination"))
+        for name, _, call_kwargs in manager.mock_calls
+    ] == [
+        ("executor.push_files_io", None),
+        ("wait_for_system_ready", None),
+        ("executor.push_file_io", Path("/etc/hostname")),
+        ("executor.execute_run", None),
+    ]
+    files = manager.executor.push_files_io.call_args.args[0]
+    assert Path("/etc/hostname") not in [file.destination for file in files]
+
+
+def test_setup_layers_unknown(fake_executor):
+    base = buildd.BuilddBase(alias=buildd.BuilddBaseAlias.JAMMY)
+
+    with pytest.raises(errors.BaseConfigurationError) as exc_info:
+        base.setup(executor=fake_executor, resume_after="other")
+
+    assert exc_info.value == errors.BaseConfigurationError(
+        brief="Unknown setup layer 'other'.",
+        details="Setup layers: ['system', 'snapd', 'packages']",
+    )
 
 
 def test_install_default(fake_executor, fake_process):
@@ -537,7 +739,7 @@ def test_ensure_image_version_compatible_failure(
     )
 
 
-@patch("time.time", side_effect=[0.0, 1.0])
+@patch("craft_providers.bases.buildd.time", **{"time.side_effect": [0.0, 1.0]})
 def test_setup_timeout(  # pylint: disable=unused-argument
     mock_time, fake_executor, fake_process, monkeypatch
 ):
@@ -951,7 +1153,7 @@ def test_wait_for_system_ready(
     ]
 
 
-@patch("time.time", side_effect=[0.0, 0.0, 1.0])
+@patch("craft_providers.bases.buildd.time", **{"time.side_effect": [0.0, 0.0, 1.0]})
 @pytest.mark.parametrize(
     "alias",
     [
@@ -985,7 +1187,7 @@ def test_wait_for_system_ready_timeout(  # pylint: disable=unused-argument
     )
 
 
-@patch("time.time", side_effect=[0.0, 0.0, 1.0])
+@patch("craft_providers.bases.buildd.time", **{"time.side_effect": [0.0, 0.0, 1.0]})
 @pytest.mark.parametrize(
     "alias",
     [
@@ -0,0 +1,90 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+from unittest import mock
+
+import pytest
+
+from craft_providers.bases import errors, setup_layers
+
+
+def test_fingerprint_layers():
+    layers = setup_layers.fingerprint_layers([("a", 1), ("b", 2)])
+
+    assert [layer.name for layer in layers] == ["a", "b"]
+    assert layers[0].fingerprint != layers[1].fingerprint
+    assert setup_layers.fingerprint_layers([("a", 1), ("b", 2)]) == layers
+
+
+def test_fingerprint_layers_cumulative():
+    """Changing the inputs of a stage changes all later layers."""
+    layers = setup_layers.fingerprint_layers([("a", 1), ("b", 2), ("c", 3)])
+
+    changed = setup_layers.fingerprint_layers([("a", 1), ("b", 0), ("c", 3)])
+
+    assert changed[0] == layers[0]
+    assert changed[1] != layers[1]
+    assert changed[2] != layers[2]
+
+
+@pytest.mark.parametrize(
+    "resume_after,expected",
+    [(None, ["a", "b", "c"]), ("a", ["b", "c"]), ("c", [])],
+)
+def test_get_stages_after(resume_after, expected):
+    stages = [(name, mock.Mock()) for name in ["a", "b", "c"]]
+
+    remaining = setup_layers.get_stages_after(stages, resume_after)
+
+    assert [name for name, _ in remaining] == expected
+
+
+def test_get_stages_after_unknown():
+    stages = [(name, mock.Mock()) for name in ["a", "b"]]
+
+    with pytest.raises(errors.BaseConfigurationError) as exc_info:
+        setup_layers.get_stages_after(stages, "c")
+
+    assert exc_info.value == errors.BaseConfigurationError(
+        brief="Unknown setup layer 'c'.", details="Setup layers: ['a', 'b']"
+    )
+
+
+def test_run_stages(fake_executor):
+    calls = mock.Mock()
+    stages = [("a", calls.a), ("b", calls.b)]
+
+    setup_layers.run_stages(
+        stages, executor=fake_executor, deadline=1.0, layer_callback=calls.callback
+    )
+
+    assert calls.mock_calls == [
+        mock.call.a(executor=fake_executor, deadline=1.0),
+        mock.call.callback("a"),
+        mock.call.b(executor=fake_executor, deadline=1.0),
+        mock.call.callback("b"),
+    ]
+
+
+def test_run_stages_no_callback(fake_executor):
+    calls = mock.Mock()
+
+    setup_layers.run_stages(
+        [("a", calls.a)], executor=fake_executor, deadline=None, layer_callback=None
+    )
+
+    assert calls.mock_calls == [mock.call.a(executor=fake_executor, deadline=None)]
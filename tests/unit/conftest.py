@@ -18,12 +18,12 @@
 import io
 import pathlib
 import subprocess
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import pytest
 import responses as responses_module
 
-from craft_providers import Executor
+from craft_providers import Executor, FileContent
 from craft_providers.util import env_cmd
 
 
@@ -33,12 +33,13 @@ class FakeExecutor(Executor):
     Provides a fake execution environment meant to be paired with the
     fake_subprocess fixture for complete control over execution behaviors.
 
-    This records push_file_io(), pull_file(), and push_file() in
-    records_of_<name> for introspection, similar to mock_calls.
+    This records push_file_io(), push_files_io(), pull_file(), and push_file()
+    in records_of_<name> for introspection, similar to mock_calls.
     """
 
     def __init__(self) -> None:
         self.records_of_push_file_io: List[Dict[str, Any]] = []
+        self.records_of_push_files_io: List[List[Dict[str, Any]]] = []
         self.records_of_pull_file: List[Dict[str, Any]] = []
         self.records_of_push_file: List[Dict[str, Any]] = []
 
@@ -50,6 +51,7 @@ class FakeExecutor(Executor):
         file_mode: str,
         group: str = "root",
         user: str = "root",
+        skip_if_unchanged: bool = False,
     ) -> None:
         self.records_of_push_file_io.append(
             dict(
@@ -61,6 +63,20 @@ class FakeExecutor(Executor):
             )
         )
 
+    def push_files_io(self, files: Sequence[FileContent]) -> None:
+        self.records_of_push_files_io.append(
+            [
+                dict(
+                    destination=file.destination.as_posix(),
+                    content=file.content.read(),
+                    file_mode=file.file_mode,
+                    group=file.group,
+                    user=file.user,
+                )
+                for file in files
+            ]
+        )
+
     def execute_popen(
         self,
         command: List[str],
@@ -105,7 +121,13 @@ class FakeExecutor(Executor):
             )
         )
 
-    def push_file(self, *, source: pathlib.Path, destination: pathlib.PurePath) -> None:
+    def push_file(
+        self,
+        *,
+        source: pathlib.Path,
+        destination: pathlib.PurePath,
+        skip_if_unchanged: bool = False,
+    ) -> None:
         self.records_of_push_file.append(
             dict(
                 source=source,
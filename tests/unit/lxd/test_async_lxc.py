@@ -0,0 +1,351 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+import asyncio
+import pathlib
+import subprocess
+
+import pytest
+
+from craft_providers import errors
+from craft_providers.lxd import AsyncLXC, LXDError
+
+
+def test_delete(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "delete",
+            "test-remote:test-instance",
+            "--force",
+        ]
+    )
+
+    asyncio.run(
+        AsyncLXC().delete(
+            instance_name="test-instance",
+            force=True,
+            project="test-project",
+            remote="test-remote",
+        )
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_delete_error(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "delete",
+            "test-remote:test-instance",
+        ],
+        returncode=1,
+        stderr="Error: not found",
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        asyncio.run(
+            AsyncLXC().delete(
+                instance_name="test-instance",
+                project="test-project",
+                remote="test-remote",
+            )
+        )
+
+    assert exc_info.value == LXDError(
+        brief="Failed to delete instance 'test-instance'.",
+        details=errors.details_from_called_process_error(
+            exc_info.value.__cause__  # type: ignore
+        ),
+    )
+    assert "Error: not found" in str(exc_info.value.details)
+
+
+def test_exec(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "exec",
+            "test-remote:test-instance",
+            "--cwd",
+            "/root",
+            "--",
+            "echo",
+            "hi",
+        ],
+        stdout="hi\n",
+    )
+
+    async def run():
+        process = await AsyncLXC().exec(
+            command=["echo", "hi"],
+            instance_name="test-instance",
+            cwd="/root",
+            project="test-project",
+            remote="test-remote",
+            stdout=subprocess.PIPE,
+        )
+        stdout, _ = await process.communicate()
+        return process.returncode, stdout
+
+    assert asyncio.run(run()) == (0, b"hi\n")
+
+
+def test_file_pull(fake_process, tmp_path):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "file",
+            "pull",
+            "test-remote:test-instance/root/foo",
+            f"{tmp_path}/foo",
+            "--create-dirs",
+        ]
+    )
+
+    asyncio.run(
+        AsyncLXC().file_pull(
+            instance_name="test-instance",
+            source=pathlib.PurePosixPath("/root/foo"),
+            destination=tmp_path / "foo",
+            create_dirs=True,
+            project="test-project",
+            remote="test-remote",
+        )
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_file_push(fake_process, tmp_path):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "file",
+            "push",
+            f"{tmp_path}/foo",
+            "test-remote:test-instance/root/foo",
+            "--mode=0644",
+            "--gid=0",
+            "--uid=0",
+        ]
+    )
+
+    asyncio.run(
+        AsyncLXC().file_push(
+            instance_name="test-instance",
+            source=tmp_path / "foo",
+            destination=pathlib.PurePosixPath("/root/foo"),
+            mode="0644",
+            gid=0,
+            uid=0,
+            project="test-project",
+            remote="test-remote",
+        )
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_launch(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "launch",
+            "test-image-remote:test-image",
+            "test-remote:test-instance",
+            "--ephemeral",
+            "--config",
+            "test-key=test-value",
+        ]
+    )
+
+    asyncio.run(
+        AsyncLXC().launch(
+            instance_name="test-instance",
+            image="test-image",
+            image_remote="test-image-remote",
+            config_keys={"test-key": "test-value"},
+            ephemeral=True,
+            project="test-project",
+            remote="test-remote",
+        )
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_list(fake_process):
+    fake_process.register_subprocess(
+        ["lxc", "--project", "test-project", "list", "test-remote:", "--format=json"],
+        stdout='[{"name": "test1"}, {"name": "test2"}]',
+    )
+
+    instances = asyncio.run(
+        AsyncLXC().list(project="test-project", remote="test-remote")
+    )
+
+    assert instances == [{"name": "test1"}, {"name": "test2"}]
+
+
+def test_list_columns(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "default",
+            "list",
+            "local:",
+            "--format=csv",
+            "--columns=ns",
+            "^test1$",
+        ],
+        stdout="test1,STOPPED\n",
+    )
+
+    instances = asyncio.run(
+        AsyncLXC().list(instance_name="test1", columns=["name", "status"])
+    )
+
+    assert instances == [{"name": "test1", "status": "Stopped"}]
+
+
+def test_list_parse_error(fake_process):
+    fake_process.register_subprocess(
+        ["lxc", "--project", "default", "list", "local:", "--format=json"],
+        stdout="fail",
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        asyncio.run(AsyncLXC().list())
+
+    assert exc_info.value == LXDError(
+        brief="Failed to parse lxc list.",
+        details=(
+            "* Command that failed: 'lxc --project default list local: --format=json'\n"
+            "* Command output: b'fail'"
+        ),
+    )
+
+
+def test_publish(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "publish",
+            "test-remote:test-instance",
+            "test-image-remote:",
+            "--alias=test-alias",
+            "--force",
+        ]
+    )
+
+    asyncio.run(
+        AsyncLXC().publish(
+            instance_name="test-instance",
+            alias="test-alias",
+            force=True,
+            image_remote="test-image-remote",
+            project="test-project",
+            remote="test-remote",
+        )
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_server_info(fake_process):
+    fake_process.register_subprocess(
+        ["lxc", "--project", "default", "info", "local:"],
+        stdout="environment:\n  kernel_features:\n    seccomp_listener: 'true'\n",
+    )
+    lxc = AsyncLXC()
+
+    async def run():
+        return [await lxc.server_info() for _ in range(3)]
+
+    infos = asyncio.run(run())
+
+    assert infos == 3 * [
+        {"environment": {"kernel_features": {"seccomp_listener": "true"}}}
+    ]
+    assert len(fake_process.calls) == 1
+
+
+def test_start_stop(fake_process):
+    fake_process.register_subprocess(
+        ["lxc", "--project", "default", "start", "local:test-instance"]
+    )
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "default",
+            "stop",
+            "local:test-instance",
+            "--force",
+            "--timeout=10",
+        ]
+    )
+
+    async def run():
+        lxc = AsyncLXC()
+        await lxc.start(instance_name="test-instance")
+        await lxc.stop(instance_name="test-instance", force=True, timeout=10)
+
+    asyncio.run(run())
+
+    assert len(fake_process.calls) == 2
+
+
+def test_concurrent_commands(fake_process):
+    """Commands for many instances run concurrently on one event loop."""
+    for i in range(10):
+        fake_process.register_subprocess(
+            ["lxc", "--project", "default", "start", f"local:test-{i}"],
+            wait=0.2,
+        )
+
+    async def run():
+        lxc = AsyncLXC()
+        await asyncio.gather(*(lxc.start(instance_name=f"test-{i}") for i in range(10)))
+
+    loop = asyncio.new_event_loop()
+    try:
+        start = loop.time()
+        loop.run_until_complete(run())
+        elapsed = loop.time() - start
+    finally:
+        loop.close()
+
+    assert len(fake_process.calls) == 10
+    assert elapsed < 1.0
@@ -0,0 +1,395 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+import asyncio
+import io
+import pathlib
+import subprocess
+from unittest import mock
+
+import pytest
+
+from craft_providers.lxd import (
+    AsyncLXC,
+    AsyncLXDInstance,
+    LXDError,
+    LXDInstance,
+    instance_helpers,
+)
+
+
+@pytest.fixture
+def mock_lxc():
+    lxc = mock.Mock(spec=AsyncLXC)
+    lxc.list.return_value = [
+        {"name": "test-instance", "status": "Running"},
+        {"name": "test-instance-2", "status": "Stopped"},
+    ]
+    lxc.server_info.return_value = {"environment": {"kernel_features": {}}}
+    yield lxc
+
+
+@pytest.fixture
+def instance(mock_lxc):
+    yield AsyncLXDInstance(
+        name="test-instance",
+        default_command_environment={"PATH": "/usr/bin"},
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+
+
+def _mock_process(returncode=0, stdout=None, stderr=None):
+    process = mock.Mock(spec=asyncio.subprocess.Process)  # pylint: disable=no-member
+    process.returncode = returncode
+    process.communicate.return_value = (stdout, stderr)
+    return process
+
+
+@pytest.mark.parametrize("name", ["test-instance", "invalid_name!", "a" * 70])
+def test_instance_name_matches_lxd_instance(name):
+    assert (
+        AsyncLXDInstance(name=name).instance_name
+        == LXDInstance(name=name).instance_name
+    )
+
+
+def test_execute_run(mock_lxc, instance):
+    mock_lxc.exec.return_value = _mock_process(stdout=b"out", stderr=b"err")
+
+    proc = asyncio.run(
+        instance.execute_run(
+            ["echo", "hi"],
+            cwd=pathlib.PurePosixPath("/root"),
+            env={"FOO": "bar"},
+            capture_output=True,
+        )
+    )
+
+    command = ["env", "PATH=/usr/bin", "FOO=bar", "echo", "hi"]
+    assert proc.args == command
+    assert proc.returncode == 0
+    assert proc.stdout == b"out"
+    assert proc.stderr == b"err"
+    mock_lxc.exec.assert_called_once_with(
+        instance_name="test-instance",
+        command=command,
+        project="test-project",
+        remote="test-remote",
+        cwd="/root",
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    mock_lxc.exec.return_value.communicate.assert_called_once_with(None)
+
+
+def test_execute_run_input(mock_lxc, instance):
+    mock_lxc.exec.return_value = _mock_process()
+
+    asyncio.run(instance.execute_run(["cat"], input=b"data"))
+
+    assert mock_lxc.exec.mock_calls[0].kwargs["stdin"] == subprocess.PIPE
+    assert mock_lxc.exec.mock_calls[0].kwargs["stdout"] is None
+    mock_lxc.exec.return_value.communicate.assert_called_once_with(b"data")
+
+
+def test_execute_run_check(mock_lxc, instance):
+    mock_lxc.exec.return_value = _mock_process(returncode=2, stderr=b"fail")
+
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        asyncio.run(instance.execute_run(["false"], capture_output=True, check=True))
+
+    assert exc_info.value.returncode == 2
+    assert exc_info.value.stderr == b"fail"
+
+
+def test_exists(mock_lxc, instance):
+    assert asyncio.run(instance.exists()) is True
+    assert mock_lxc.mock_calls == [
+        mock.call.list(
+            instance_name="test-instance",
+            columns=["name", "status"],
+            project="test-project",
+            remote="test-remote",
+        )
+    ]
+
+
+def test_exists_false(mock_lxc):
+    instance = AsyncLXDInstance(name="does-not-exist", lxc=mock_lxc)
+
+    assert asyncio.run(instance.exists()) is False
+
+
+def test_is_running(mock_lxc):
+    running = AsyncLXDInstance(name="test-instance", lxc=mock_lxc)
+    stopped = AsyncLXDInstance(name="test-instance-2", lxc=mock_lxc)
+
+    assert asyncio.run(running.is_running()) is True
+    assert asyncio.run(stopped.is_running()) is False
+
+
+def test_is_running_error(mock_lxc):
+    instance = AsyncLXDInstance(name="does-not-exist", lxc=mock_lxc)
+
+    with pytest.raises(LXDError) as exc_info:
+        asyncio.run(instance.is_running())
+
+    assert exc_info.value == LXDError(brief="Instance 'does-not-exist' does not exist.")
+
+
+@pytest.mark.parametrize("seccomp_listener", ["true", "false"])
+def test_launch(mock_lxc, instance, seccomp_listener):
+    mock_lxc.server_info.return_value = {
+        "environment": {"kernel_features": {"seccomp_listener": seccomp_listener}}
+    }
+
+    asyncio.run(
+        instance.launch(
+            image="test-image",
+            image_remote="test-image-remote",
+            map_user_uid=True,
+            uid=1234,
+            ephemeral=True,
+        )
+    )
+
+    config_keys = {"raw.idmap": "both 1234 0"}
+    if seccomp_listener == "true":
+        config_keys["security.syscalls.intercept.mknod"] = "true"
+    assert mock_lxc.mock_calls == [
+        mock.call.server_info(project="test-project", remote="test-remote"),
+        mock.call.launch(
+            config_keys=config_keys,
+            ephemeral=True,
+            instance_name="test-instance",
+            image="test-image",
+            image_remote="test-image-remote",
+            project="test-project",
+            remote="test-remote",
+        ),
+    ]
+
+
+def test_lifecycle(mock_lxc, instance):
+    async def run():
+        await instance.start()
+        await instance.stop()
+        await instance.delete()
+
+    asyncio.run(run())
+
+    assert mock_lxc.mock_calls == [
+        mock.call.start(
+            instance_name="test-instance", project="test-project", remote="test-remote"
+        ),
+        mock.call.stop(
+            instance_name="test-instance", project="test-project", remote="test-remote"
+        ),
+        mock.call.delete(
+            instance_name="test-instance",
+            project="test-project",
+            remote="test-remote",
+            force=True,
+        ),
+    ]
+
+
+def test_pull_file(mock_lxc, instance, tmp_path):
+    source = pathlib.PurePosixPath("/root/foo")
+
+    asyncio.run(instance.pull_file(source=source, destination=tmp_path / "foo"))
+
+    assert mock_lxc.mock_calls == [
+        mock.call.file_pull(
+            instance_name="test-instance",
+            source=source,
+            destination=tmp_path / "foo",
+            project="test-project",
+            remote="test-remote",
+        )
+    ]
+
+
+def test_pull_file_no_parent_directory(mock_lxc, instance, tmp_path):
+    destination = tmp_path / "missing" / "foo"
+
+    with pytest.raises(FileNotFoundError) as exc_info:
+        asyncio.run(
+            instance.pull_file(
+                source=pathlib.PurePosixPath("/root/foo"), destination=destination
+            )
+        )
+
+    assert str(exc_info.value) == f"Directory not found: {str(destination.parent)!r}"
+    assert mock_lxc.mock_calls == []
+
+
+def test_pull_file_no_source(mock_lxc, instance, tmp_path):
+    error = LXDError(
+        brief="Failed to pull file.",
+        details=(
+            "* Command standard error output: b'Error: open /root/foo:"
+            " no such file or directory\\n'"
+        ),
+    )
+    mock_lxc.file_pull.side_effect = error
+
+    with pytest.raises(FileNotFoundError) as exc_info:
+        asyncio.run(
+            instance.pull_file(
+                source=pathlib.PurePosixPath("/root/foo"),
+                destination=tmp_path / "foo",
+            )
+        )
+
+    assert str(exc_info.value) == "File not found: '/root/foo'"
+    assert exc_info.value.__cause__ is error
+
+
+def test_pull_file_error(mock_lxc, instance, tmp_path):
+    error = LXDError(brief="Failed to pull file.", details="* Error: disk full")
+    mock_lxc.file_pull.side_effect = error
+
+    with pytest.raises(LXDError) as exc_info:
+        asyncio.run(
+            instance.pull_file(
+                source=pathlib.PurePosixPath("/root/foo"),
+                destination=tmp_path / "foo",
+            )
+        )
+
+    assert exc_info.value is error
+
+
+def test_push_file(mock_lxc, instance, tmp_path):
+    source = tmp_path / "foo"
+    source.write_text("foo")
+    destination = pathlib.PurePosixPath("/root/foo")
+
+    asyncio.run(instance.push_file(source=source, destination=destination))
+
+    assert mock_lxc.mock_calls == [
+        mock.call.file_push(
+            instance_name="test-instance",
+            source=source,
+            destination=destination,
+            project="test-project",
+            remote="test-remote",
+            gid=0,
+            uid=0,
+        )
+    ]
+
+
+def test_push_file_no_source(mock_lxc, instance, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(
+            instance.push_file(
+                source=tmp_path / "missing",
+                destination=pathlib.PurePosixPath("/root/foo"),
+            )
+        )
+
+    assert mock_lxc.mock_calls == []
+
+
+def test_push_file_no_parent_directory(mock_lxc, instance, tmp_path):
+    error = LXDError(
+        brief="Failed to push file.",
+        details=(
+            "* Command standard error output: b'Error: open /root/foo:"
+            " no such file or directory\\n'"
+        ),
+    )
+    mock_lxc.file_push.side_effect = error
+    source = tmp_path / "foo"
+    source.write_text("foo")
+
+    with pytest.raises(FileNotFoundError) as exc_info:
+        asyncio.run(
+            instance.push_file(
+                source=source, destination=pathlib.PurePosixPath("/root/foo")
+            )
+        )
+
+    assert str(exc_info.value) == "Directory not found: '/root'"
+    assert exc_info.value.__cause__ is error
+
+
+def test_push_file_error(mock_lxc, instance, tmp_path):
+    error = LXDError(brief="Failed to push file.", details="* Error: disk full")
+    mock_lxc.file_push.side_effect = error
+    source = tmp_path / "foo"
+    source.write_text("foo")
+
+    with pytest.raises(LXDError) as exc_info:
+        asyncio.run(
+            instance.push_file(
+                source=source, destination=pathlib.PurePosixPath("/root/foo")
+            )
+        )
+
+    assert exc_info.value is error
+
+
+def test_push_file_io(mock_lxc, instance):
+    mock_lxc.exec.return_value = _mock_process()
+    destination = pathlib.PurePosixPath("/etc/foo")
+
+    asyncio.run(
+        instance.push_file_io(
+            destination=destination,
+            content=io.BytesIO(b"content"),
+            file_mode="0644",
+            user="user",
+            group="group",
+        )
+    )
+
+    assert mock_lxc.exec.mock_calls[0].kwargs["command"] == [
+        "env",
+        "PATH=/usr/bin",
+        "sh",
+        "-c",
+        instance_helpers.PUSH_FILE_IO_SCRIPT,
+        "sh",
+        "/etc/foo",
+        "user:group",
+        "0644",
+    ]
+    mock_lxc.exec.return_value.communicate.assert_called_once_with(b"content")
+    assert mock_lxc.file_push.mock_calls == []
+
+
+def test_push_file_io_error(mock_lxc, instance):
+    mock_lxc.exec.return_value = _mock_process(returncode=1, stderr=b"failed")
+
+    with pytest.raises(LXDError) as exc_info:
+        asyncio.run(
+            instance.push_file_io(
+                destination=pathlib.PurePosixPath("/etc/foo"),
+                content=io.BytesIO(b"content"),
+                file_mode="0644",
+            )
+        )
+
+    assert exc_info.value.brief == (
+        "Failed to create file '/etc/foo' in instance 'test-instance'."
+    )
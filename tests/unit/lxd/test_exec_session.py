@@ -0,0 +1,121 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+import subprocess
+
+import pytest
+
+from craft_providers.lxd import LXDError
+from craft_providers.lxd._exec_session import ExecSession
+
+
+@pytest.fixture
+def session():
+    """Session backed by a shell on the host standing in for the instance."""
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        ["sh"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+    session = ExecSession(process)
+
+    yield session
+
+    session.close()
+
+
+def test_run(session):
+    proc = session.run(["sh", "-c", "echo out; echo err >&2; exit 3"])
+
+    assert proc.args == ["sh", "-c", "echo out; echo err >&2; exit 3"]
+    assert proc.returncode == 3
+    assert proc.stdout == b"out\n"
+    assert proc.stderr == b"err\n"
+
+
+def test_run_many(session):
+    for i in range(20):
+        proc = session.run(["echo", str(i)])
+
+        assert proc.returncode == 0
+        assert proc.stdout == f"{i}\n".encode()
+        assert proc.stderr == b""
+
+
+def test_run_binary_output(session):
+    proc = session.run(["printf", "a\\000b\\nno-newline"])
+
+    assert proc.stdout == b"a\x00b\nno-newline"
+
+
+def test_run_text(session):
+    proc = session.run(["printf", "a\\r\\nb"], text=True)
+
+    assert proc.stdout == "a\nb"
+    assert proc.stderr == ""
+
+
+def test_run_cwd(session, tmp_path):
+    proc = session.run(["pwd"], cwd=tmp_path.as_posix())
+
+    assert proc.stdout == f"{tmp_path.as_posix()}\n".encode()
+
+
+def test_run_cwd_does_not_persist(session, tmp_path):
+    before = session.run(["pwd"])
+    session.run(["true"], cwd=tmp_path.as_posix())
+
+    after = session.run(["pwd"])
+
+    assert after.stdout == before.stdout
+
+
+def test_run_check(session):
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        session.run(["sh", "-c", "echo fail >&2; exit 2"], check=True)
+
+    assert exc_info.value.returncode == 2
+    assert exc_info.value.cmd == ["sh", "-c", "echo fail >&2; exit 2"]
+    assert exc_info.value.stderr == b"fail\n"
+
+
+def test_run_no_stdin(session):
+    proc = session.run(["cat"])
+
+    assert proc.returncode == 0
+    assert proc.stdout == b""
+
+
+def test_run_terminated(session):
+    with pytest.raises(LXDError) as exc_info:
+        session.run(["sh", "-c", "kill -9 $PPID"])
+
+    assert exc_info.value.brief == "Exec session terminated unexpectedly."
+
+
+@pytest.mark.parametrize(
+    "kwargs,expected",
+    [
+        ({"capture_output": True}, True),
+        ({"capture_output": True, "check": True, "text": True}, True),
+        ({"capture_output": True, "encoding": "utf-8", "errors": "replace"}, True),
+        ({}, False),
+        ({"check": True}, False),
+        ({"capture_output": True, "input": b"data"}, False),
+        ({"capture_output": True, "timeout": 10}, False),
+    ],
+)
+def test_supports(kwargs, expected):
+    assert ExecSession.supports(**kwargs) is expected
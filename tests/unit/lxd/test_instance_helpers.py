@@ -0,0 +1,94 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+import pathlib
+
+import pytest
+
+from craft_providers.lxd import LXDError, instance_helpers
+
+
+def test_get_push_file_io_command():
+    command = instance_helpers.get_push_file_io_command(
+        destination=pathlib.PurePosixPath("/etc/test.conf"),
+        file_mode="0644",
+        group="adm",
+        user="root",
+    )
+
+    assert command == [
+        "sh",
+        "-c",
+        instance_helpers.PUSH_FILE_IO_SCRIPT,
+        "sh",
+        "/etc/test.conf",
+        "root:adm",
+        "0644",
+    ]
+
+
+def test_check_pull_destination(tmp_path):
+    instance_helpers.check_pull_destination(tmp_path / "file")
+
+
+def test_check_pull_destination_missing_directory(tmp_path):
+    destination = tmp_path / "missing" / "file"
+
+    with pytest.raises(FileNotFoundError) as exc_info:
+        instance_helpers.check_pull_destination(destination)
+
+    assert str(exc_info.value) == f"Directory not found: {str(destination.parent)!r}"
+
+
+def test_check_push_source(tmp_path):
+    source = tmp_path / "file"
+    source.write_text("content")
+
+    instance_helpers.check_push_source(source)
+
+
+def test_check_push_source_missing(tmp_path):
+    source = tmp_path / "file"
+
+    with pytest.raises(FileNotFoundError) as exc_info:
+        instance_helpers.check_push_source(source)
+
+    assert str(exc_info.value) == f"File not found: {str(source)!r}"
+
+
+@pytest.mark.parametrize(
+    "details", ["Error: not found", "open foo: no such file or directory"]
+)
+def test_raise_file_not_found(details):
+    error = LXDError(brief="Failed to pull file.", details=details)
+
+    with pytest.raises(FileNotFoundError) as exc_info:
+        with instance_helpers.raise_file_not_found("File not found: 'foo'"):
+            raise error
+
+    assert str(exc_info.value) == "File not found: 'foo'"
+    assert exc_info.value.__cause__ is error
+
+
+def test_raise_file_not_found_other_error():
+    error = LXDError(brief="Failed to pull file.", details="Error: forbidden")
+
+    with pytest.raises(LXDError) as exc_info:
+        with instance_helpers.raise_file_not_found("File not found: 'foo'"):
+            raise error
+
+    assert exc_info.value is error
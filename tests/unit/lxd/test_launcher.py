@@ -15,11 +15,13 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 #
 
+import time
 from unittest import mock
 
 import pytest
 
-from craft_providers import Base, bases, lxd
+from craft_providers import Base, LaunchSpec, SetupLayer, bases, instrumentation, lxd
+from craft_providers.lxd import launcher
 
 
 @pytest.fixture
@@ -27,6 +29,7 @@ def mock_base_configuration():
     mock_base = mock.Mock(spec=Base)
     mock_base.compatibility_tag = "mock-compat-tag-v100"
     mock_base.get_command_environment.return_value = {"foo": "bar"}
+    mock_base.get_setup_layers.return_value = []
     yield mock_base
 
 
@@ -57,7 +60,7 @@ def mock_lxd_instance():
 def test_launch(mock_base_configuration, mock_lxc, mock_lxd_instance):
     mock_lxd_instance.return_value.exists.return_value = False
 
-    lxd.launch(
+    instance = lxd.launch(
         "test-instance",
         base_configuration=mock_base_configuration,
         image_name="image-name",
@@ -72,6 +75,8 @@ def test_launch(mock_base_configuration, mock_lxc, mock_lxd_instance):
             project="default",
             remote="local",
             default_command_environment={"foo": "bar"},
+            lxc=mock_lxc,
+            state_cache_ttl=5.0,
         ),
         mock.call().exists(),
         mock.call().launch(
@@ -81,11 +86,38 @@ def test_launch(mock_base_configuration, mock_lxc, mock_lxd_instance):
             map_user_uid=False,
             uid=None,
         ),
+        mock.call().invalidate_state_cache(),
     ]
     assert mock_base_configuration.mock_calls == [
         mock.call.get_command_environment(),
         mock.call.setup(executor=mock_lxd_instance.return_value),
     ]
+    # The state is only cached while launching.
+    assert instance.state_cache_ttl == 0.0
+
+
+def test_launch_spans(mock_base_configuration, mock_lxc, mock_lxd_instance):
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.has_image.return_value = False
+    recorder = instrumentation.SpanRecorder()
+    instrumentation.add_span_sink(recorder)
+
+    try:
+        lxd.launch(
+            "test-instance",
+            base_configuration=mock_base_configuration,
+            image_name="image-name",
+            image_remote="image-remote",
+            use_snapshots=True,
+            lxc=mock_lxc,
+        )
+    finally:
+        instrumentation.remove_span_sink(recorder)
+
+    assert [span.path for span in recorder.spans] == [
+        ("lxd.launch", "lxd.publish_snapshot"),
+        ("lxd.launch",),
+    ]
 
 
 def test_launch_making_initial_snapshot(
@@ -112,10 +144,28 @@ def test_launch_making_initial_snapshot(
             project="test-project",
             remote="test-remote",
         ),
+        mock.call.has_image(
+            image_name="snapshot-image-remote-image-name-mock-compat-tag-v100",
+            project="test-project",
+            remote="test-remote",
+        ),
+        mock.call.snapshot(
+            instance_name="test-instance-fa2d407652a1c51f6019",
+            snapshot_name="craft-providers-transient",
+            reuse=True,
+            project="test-project",
+            remote="test-remote",
+        ),
         mock.call.publish(
             alias="snapshot-image-remote-image-name-mock-compat-tag-v100",
             instance_name="test-instance-fa2d407652a1c51f6019",
-            force=True,
+            snapshot_name="craft-providers-transient",
+            project="test-project",
+            remote="test-remote",
+        ),
+        mock.call.snapshot_delete(
+            instance_name="test-instance-fa2d407652a1c51f6019",
+            snapshot_name="craft-providers-transient",
             project="test-project",
             remote="test-remote",
         ),
@@ -126,6 +176,8 @@ def test_launch_making_initial_snapshot(
             project="test-project",
             remote="test-remote",
             default_command_environment={"foo": "bar"},
+            lxc=mock_lxc,
+            state_cache_ttl=5.0,
         ),
         mock.call().exists(),
         mock.call().launch(
@@ -135,16 +187,64 @@ def test_launch_making_initial_snapshot(
             map_user_uid=False,
             uid=None,
         ),
-        mock.call().stop(),
-        mock.call().start(),
+        mock.call().execute_run(["sync"], capture_output=True, check=True),
+        mock.call().invalidate_state_cache(),
     ]
     assert mock_base_configuration.mock_calls == [
         mock.call.get_command_environment(),
         mock.call.setup(executor=mock_lxd_instance.return_value),
-        mock.call.wait_until_ready(executor=mock_lxd_instance.return_value),
     ]
 
 
+def test_launch_making_initial_snapshot_publish_error(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    """The transient instance snapshot is deleted even if publishing fails."""
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.has_image.return_value = False
+    mock_lxc.publish.side_effect = lxd.LXDError(brief="Failed to publish.")
+
+    with pytest.raises(lxd.LXDError):
+        lxd.launch(
+            "test-instance",
+            base_configuration=mock_base_configuration,
+            image_name="image-name",
+            image_remote="image-remote",
+            use_snapshots=True,
+            lxc=mock_lxc,
+        )
+
+    assert mock_lxc.snapshot_delete.mock_calls == [
+        mock.call(
+            instance_name="test-instance-fa2d407652a1c51f6019",
+            snapshot_name="craft-providers-transient",
+            project="test-project",
+            remote="test-remote",
+        )
+    ]
+    assert mock.call().stop() not in mock_lxd_instance.mock_calls
+
+
+def test_launch_snapshot_already_published(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    """A snapshot published by a concurrent launch is not published again."""
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.has_image.side_effect = [False, True]
+
+    lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        use_snapshots=True,
+        lxc=mock_lxc,
+    )
+
+    assert mock_lxc.snapshot.mock_calls == []
+    assert mock_lxc.publish.mock_calls == []
+
+
 def test_launch_using_existing_snapshot(
     mock_base_configuration, mock_lxc, mock_lxd_instance
 ):
@@ -169,6 +269,13 @@ def test_launch_using_existing_snapshot(
             project="test-project",
             remote="test-remote",
         ),
+        mock.call.image_set_property(
+            image="snapshot-image-remote-image-name-mock-compat-tag-v100",
+            key="craft_providers.last_used",
+            value=mock.ANY,
+            project="test-project",
+            remote="test-remote",
+        ),
     ]
     assert mock_lxd_instance.mock_calls == [
         mock.call(
@@ -176,6 +283,8 @@ def test_launch_using_existing_snapshot(
             project="test-project",
             remote="test-remote",
             default_command_environment={"foo": "bar"},
+            lxc=mock_lxc,
+            state_cache_ttl=5.0,
         ),
         mock.call().exists(),
         mock.call().launch(
@@ -185,6 +294,7 @@ def test_launch_using_existing_snapshot(
             map_user_uid=False,
             uid=None,
         ),
+        mock.call().invalidate_state_cache(),
     ]
     assert mock_base_configuration.mock_calls == [
         mock.call.get_command_environment(),
@@ -192,6 +302,410 @@ def test_launch_using_existing_snapshot(
     ]
 
 
+LAYERS = [
+    SetupLayer(name="system", fingerprint="aaaa"),
+    SetupLayer(name="snapd", fingerprint="bbbb"),
+    SetupLayer(name="packages", fingerprint="cccc"),
+]
+
+
+def fake_layered_setup(*, executor, resume_after, layer_callback):
+    """Set up the layers after resume_after, as BuilddBase.setup() does."""
+    assert isinstance(executor, lxd.LXDInstance)
+    names = [layer.name for layer in LAYERS]
+    start = 0 if resume_after is None else names.index(resume_after) + 1
+    for name in names[start:]:
+        layer_callback(name)
+
+
+def test_launch_making_layered_snapshots(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.has_image.return_value = False
+    mock_base_configuration.get_setup_layers.return_value = LAYERS
+
+    mock_base_configuration.setup.side_effect = fake_layered_setup
+
+    lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        use_layered_snapshots=True,
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+
+    assert mock_lxc.has_image.mock_calls == [
+        mock.call(
+            image_name=f"snapshot-image-remote-image-name-{layer.name}-"
+            f"{layer.fingerprint}",
+            project="test-project",
+            remote="test-remote",
+        )
+        for layer in [*reversed(LAYERS), *LAYERS]
+    ]
+    assert mock_lxc.publish.mock_calls == [
+        mock.call(
+            alias=f"snapshot-image-remote-image-name-{layer.name}-"
+            f"{layer.fingerprint}",
+            instance_name="test-instance-fa2d407652a1c51f6019",
+            snapshot_name="craft-providers-transient",
+            project="test-project",
+            remote="test-remote",
+        )
+        for layer in LAYERS
+    ]
+    assert (
+        mock.call().launch(
+            image="image-name",
+            image_remote="image-remote",
+            ephemeral=False,
+            map_user_uid=False,
+            uid=None,
+        )
+        in mock_lxd_instance.mock_calls
+    )
+    assert mock_base_configuration.setup.mock_calls == [
+        mock.call(
+            executor=mock_lxd_instance.return_value,
+            resume_after=None,
+            layer_callback=mock.ANY,
+        )
+    ]
+
+
+def test_launch_using_layered_snapshot(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    """Setup resumes after the last layer with a snapshot image."""
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.has_image.side_effect = lambda image_name, **kwargs: image_name in (
+        "snapshot-image-remote-image-name-system-aaaa",
+        "snapshot-image-remote-image-name-snapd-bbbb",
+    )
+    mock_base_configuration.get_setup_layers.return_value = LAYERS
+
+    mock_base_configuration.setup.side_effect = fake_layered_setup
+
+    lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        use_layered_snapshots=True,
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+
+    assert mock_lxc.image_set_property.mock_calls == [
+        mock.call(
+            image="snapshot-image-remote-image-name-snapd-bbbb",
+            key="craft_providers.last_used",
+            value=mock.ANY,
+            project="test-project",
+            remote="test-remote",
+        )
+    ]
+    assert (
+        mock.call().launch(
+            image="snapshot-image-remote-image-name-snapd-bbbb",
+            image_remote="test-remote",
+            ephemeral=False,
+            map_user_uid=False,
+            uid=None,
+        )
+        in mock_lxd_instance.mock_calls
+    )
+    assert mock_base_configuration.setup.mock_calls == [
+        mock.call(
+            executor=mock_lxd_instance.return_value,
+            resume_after="snapd",
+            layer_callback=mock.ANY,
+        )
+    ]
+    assert [c.kwargs["alias"] for c in mock_lxc.publish.mock_calls] == [
+        "snapshot-image-remote-image-name-packages-cccc"
+    ]
+
+
+def test_launch_layered_snapshots_ephemeral(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.has_image.return_value = False
+    mock_base_configuration.get_setup_layers.return_value = LAYERS
+
+    mock_base_configuration.setup.side_effect = fake_layered_setup
+
+    lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        ephemeral=True,
+        use_layered_snapshots=True,
+        lxc=mock_lxc,
+    )
+
+    assert mock_lxc.publish.mock_calls == []
+
+
+def test_launch_layered_snapshots_without_layers(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    """Bases without setup layers are set up as usual."""
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_base_configuration.get_setup_layers.return_value = []
+
+    lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        use_layered_snapshots=True,
+        lxc=mock_lxc,
+    )
+
+    assert mock_lxc.has_image.mock_calls == []
+    assert mock_base_configuration.setup.mock_calls == [
+        mock.call(executor=mock_lxd_instance.return_value)
+    ]
+
+
+GOLDEN_NAME = "golden-006b2a612391-3127e45baffa"
+
+
+def test_formulate_golden_instance_name():
+    name = launcher._formulate_golden_instance_name(
+        image_name="image-name",
+        image_remote="image-remote",
+        compatibility_tag="mock-compat-tag-v100",
+        uid=None,
+    )
+
+    assert name == GOLDEN_NAME
+    assert launcher._formulate_golden_instance_name(
+        image_name="image-name",
+        image_remote="image-remote",
+        compatibility_tag="mock-compat-tag-v101",
+        uid=None,
+    ).startswith("golden-006b2a612391-")
+    assert not launcher._formulate_golden_instance_name(
+        image_name="image-name",
+        image_remote="image-remote",
+        compatibility_tag="mock-compat-tag-v100",
+        uid=1234,
+    ).startswith("golden-006b2a612391-")
+
+
+def test_launch_making_golden_instance(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.list_names.return_value = [
+        "golden-006b2a612391-000000000000",
+        "golden-000000000000-3127e45baffa",
+        "other-instance",
+    ]
+
+    lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        use_golden_instances=True,
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+
+    assert mock_lxc.mock_calls == [
+        mock.call.project_list("test-remote"),
+        mock.call.list_names(project="test-project", remote="test-remote"),
+        mock.call.list_names(project="test-project", remote="test-remote"),
+        mock.call.delete(
+            instance_name="golden-006b2a612391-000000000000",
+            force=True,
+            project="test-project",
+            remote="test-remote",
+        ),
+        mock.call.snapshot(
+            instance_name="test-instance-fa2d407652a1c51f6019",
+            snapshot_name="craft-providers-transient",
+            reuse=True,
+            project="test-project",
+            remote="test-remote",
+        ),
+        mock.call.copy(
+            source_instance_name="test-instance-fa2d407652a1c51f6019",
+            source_snapshot_name="craft-providers-transient",
+            destination_instance_name=GOLDEN_NAME,
+            project="test-project",
+            remote="test-remote",
+        ),
+        mock.call.snapshot_delete(
+            instance_name="test-instance-fa2d407652a1c51f6019",
+            snapshot_name="craft-providers-transient",
+            project="test-project",
+            remote="test-remote",
+        ),
+    ]
+    assert mock_lxd_instance.mock_calls[1:] == [
+        mock.call().exists(),
+        mock.call().launch(
+            image="image-name",
+            image_remote="image-remote",
+            ephemeral=False,
+            map_user_uid=False,
+            uid=None,
+        ),
+        mock.call().execute_run(["sync"], capture_output=True, check=True),
+        mock.call().invalidate_state_cache(),
+    ]
+    assert mock_base_configuration.mock_calls == [
+        mock.call.get_command_environment(),
+        mock.call.setup(executor=mock_lxd_instance.return_value),
+    ]
+
+
+def test_launch_golden_instance_already_created(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    """A golden instance created by a concurrent launch is not created again."""
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.list_names.side_effect = [[], [GOLDEN_NAME]]
+
+    lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        use_golden_instances=True,
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+
+    assert mock_lxc.mock_calls == [
+        mock.call.project_list("test-remote"),
+        mock.call.list_names(project="test-project", remote="test-remote"),
+        mock.call.list_names(project="test-project", remote="test-remote"),
+    ]
+
+
+def test_launch_making_golden_instance_ephemeral(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.list_names.return_value = []
+
+    lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        ephemeral=True,
+        use_golden_instances=True,
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+
+    assert mock_lxc.mock_calls == [
+        mock.call.project_list("test-remote"),
+        mock.call.list_names(project="test-project", remote="test-remote"),
+    ]
+    assert mock_base_configuration.mock_calls == [
+        mock.call.get_command_environment(),
+        mock.call.setup(executor=mock_lxd_instance.return_value),
+    ]
+
+
+def test_launch_using_golden_instance(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.list_names.return_value = [GOLDEN_NAME]
+
+    instance = lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        ephemeral=True,
+        use_golden_instances=True,
+        use_snapshots=True,
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+
+    assert instance is mock_lxd_instance.return_value
+    assert mock_lxc.mock_calls == [
+        mock.call.project_list("test-remote"),
+        mock.call.list_names(project="test-project", remote="test-remote"),
+        mock.call.copy(
+            source_instance_name=GOLDEN_NAME,
+            destination_instance_name="test-instance-fa2d407652a1c51f6019",
+            ephemeral=True,
+            project="test-project",
+            remote="test-remote",
+        ),
+    ]
+    assert mock_lxd_instance.mock_calls[1:] == [
+        mock.call().exists(),
+        mock.call().invalidate_state_cache(),
+        mock.call().start(),
+        mock.call().invalidate_state_cache(),
+    ]
+    assert mock_base_configuration.mock_calls == [
+        mock.call.get_command_environment(),
+        mock.call.get_setup_layers(),
+        mock.call.warmup(executor=mock_lxd_instance.return_value),
+    ]
+
+
+def test_launch_using_golden_instance_with_layers(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    """Copies are set up after the last layer, e.g. to apply their hostname."""
+    mock_lxd_instance.return_value.exists.return_value = False
+    mock_lxc.list_names.return_value = [GOLDEN_NAME]
+    mock_base_configuration.get_setup_layers.return_value = LAYERS
+
+    lxd.launch(
+        "test-instance",
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        use_golden_instances=True,
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+
+    assert [c.kwargs for c in mock_lxc.copy.mock_calls] == [
+        dict(
+            source_instance_name=GOLDEN_NAME,
+            destination_instance_name="test-instance-fa2d407652a1c51f6019",
+            ephemeral=False,
+            project="test-project",
+            remote="test-remote",
+        )
+    ]
+    assert mock_base_configuration.mock_calls == [
+        mock.call.get_command_environment(),
+        mock.call.get_setup_layers(),
+        mock.call.setup(
+            executor=mock_lxd_instance.return_value, resume_after="packages"
+        ),
+    ]
+
+
 def test_launch_all_opts(mock_base_configuration, mock_lxc, mock_lxd_instance):
     mock_lxd_instance.return_value.exists.return_value = False
 
@@ -217,6 +731,8 @@ def test_launch_all_opts(mock_base_configuration, mock_lxc, mock_lxd_instance):
             project="test-project",
             remote="test-remote",
             default_command_environment={"foo": "bar"},
+            lxc=mock_lxc,
+            state_cache_ttl=5.0,
         ),
         mock.call().exists(),
         mock.call().launch(
@@ -226,6 +742,7 @@ def test_launch_all_opts(mock_base_configuration, mock_lxc, mock_lxd_instance):
             map_user_uid=True,
             uid=1234,
         ),
+        mock.call().invalidate_state_cache(),
     ]
     assert mock_base_configuration.mock_calls == [
         mock.call.get_command_environment(),
@@ -288,6 +805,8 @@ def test_launch_create_project(mock_base_configuration, mock_lxc, mock_lxd_insta
             project="project-to-create",
             remote="test-remote",
             default_command_environment={"foo": "bar"},
+            lxc=mock_lxc,
+            state_cache_ttl=5.0,
         ),
         mock.call().exists(),
         mock.call().launch(
@@ -297,6 +816,7 @@ def test_launch_create_project(mock_base_configuration, mock_lxc, mock_lxd_insta
             map_user_uid=False,
             uid=None,
         ),
+        mock.call().invalidate_state_cache(),
     ]
     assert mock_base_configuration.mock_calls == [
         mock.call.get_command_environment(),
@@ -325,10 +845,13 @@ def test_launch_with_existing_instance_not_running(
             project="default",
             remote="local",
             default_command_environment={"foo": "bar"},
+            lxc=mock_lxc,
+            state_cache_ttl=5.0,
         ),
         mock.call().exists(),
         mock.call().is_running(),
         mock.call().start(),
+        mock.call().invalidate_state_cache(),
     ]
     assert mock_base_configuration.mock_calls == [
         mock.call.get_command_environment(),
@@ -357,9 +880,12 @@ def test_launch_with_existing_instance_running(
             project="default",
             remote="local",
             default_command_environment={"foo": "bar"},
+            lxc=mock_lxc,
+            state_cache_ttl=5.0,
         ),
         mock.call().exists(),
         mock.call().is_running(),
+        mock.call().invalidate_state_cache(),
     ]
     assert mock_base_configuration.mock_calls == [
         mock.call.get_command_environment(),
@@ -393,6 +919,8 @@ def test_launch_with_existing_instance_incompatible_with_auto_clean(
             project="default",
             remote="local",
             default_command_environment={"foo": "bar"},
+            lxc=mock_lxc,
+            state_cache_ttl=5.0,
         ),
         mock.call().exists(),
         mock.call().is_running(),
@@ -405,6 +933,7 @@ def test_launch_with_existing_instance_incompatible_with_auto_clean(
             map_user_uid=False,
             uid=None,
         ),
+        mock.call().invalidate_state_cache(),
     ]
     assert mock_base_configuration.mock_calls == [
         mock.call.get_command_environment(),
@@ -439,6 +968,8 @@ def test_launch_with_existing_instance_incompatible_without_auto_clean(
             project="default",
             remote="local",
             default_command_environment={"foo": "bar"},
+            lxc=mock_lxc,
+            state_cache_ttl=5.0,
         ),
         mock.call().exists(),
         mock.call().is_running(),
@@ -448,3 +979,102 @@ def test_launch_with_existing_instance_incompatible_without_auto_clean(
         mock.call.get_command_environment(),
         mock.call.warmup(executor=mock_lxd_instance.return_value),
     ]
+
+
+def test_launch_many(mock_base_configuration, mock_lxc):
+    specs = [
+        LaunchSpec(
+            name=f"test-instance-{i}",
+            base_configuration=mock_base_configuration,
+            image_name="image-name",
+            image_remote="image-remote",
+        )
+        for i in range(2)
+    ]
+
+    with mock.patch("craft_providers.lxd.launcher.launch") as mock_launch:
+        results = lxd.launch_many(
+            specs,
+            max_workers=1,
+            auto_create_project=True,
+            ephemeral=True,
+            project="test-project",
+            remote="test-remote",
+            lxc=mock_lxc,
+        )
+
+    assert [result.instance for result in results] == [mock_launch.return_value] * 2
+    assert mock_lxc.mock_calls == [mock.call.project_list("test-remote")]
+    assert mock_launch.mock_calls == [
+        mock.call(
+            f"test-instance-{i}",
+            base_configuration=mock_base_configuration,
+            image_name="image-name",
+            image_remote="image-remote",
+            auto_clean=False,
+            ephemeral=True,
+            map_user_uid=False,
+            uid=None,
+            use_snapshots=False,
+            use_golden_instances=False,
+            use_layered_snapshots=False,
+            project="test-project",
+            remote="test-remote",
+            lxc=mock_lxc,
+        )
+        for i in range(2)
+    ]
+
+
+def test_launch_many_missing_image_remote(mock_base_configuration, mock_lxc):
+    specs = [
+        LaunchSpec(
+            name="test-instance",
+            base_configuration=mock_base_configuration,
+            image_name="image-name",
+        )
+    ]
+
+    with pytest.raises(lxd.LXDError) as exc_info:
+        lxd.launch_many(specs, lxc=mock_lxc)
+
+    assert exc_info.value == lxd.LXDError(
+        brief="No image remote given for instance 'test-instance'."
+    )
+    assert mock_lxc.mock_calls == []
+
+
+def test_launch_many_publishes_snapshot_once(
+    mock_base_configuration, mock_lxc, mock_lxd_instance
+):
+    """Concurrent launches don't race to publish the same snapshot."""
+    mock_lxd_instance.return_value.exists.return_value = False
+
+    def has_image(**_kwargs):
+        published = mock_lxc.publish.called
+        # Give the other launches time to check for the image too.
+        time.sleep(0.05)
+        return published
+
+    mock_lxc.has_image.side_effect = has_image
+    specs = [
+        LaunchSpec(
+            name=f"test-instance-{i}",
+            base_configuration=mock_base_configuration,
+            image_name="image-name",
+            image_remote="image-remote",
+        )
+        for i in range(4)
+    ]
+
+    results = lxd.launch_many(
+        specs,
+        max_workers=4,
+        use_snapshots=True,
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+
+    assert [result.error for result in results] == [None] * 4
+    assert len(mock_lxc.publish.mock_calls) == 1
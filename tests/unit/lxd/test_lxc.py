@@ -14,18 +14,113 @@
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 #
+import json
 import pathlib
 import subprocess
+from unittest import mock
 from unittest.mock import call
 
 import pytest
+import yaml
 
-from craft_providers import errors
+from craft_providers import errors, instrumentation
 from craft_providers.lxd import LXC, LXDError, lxc
 
 # pylint: disable=too-many-lines
 
 
+def test_load_yaml():
+    """Scalars, including invalid datetimes, are left as strings."""
+    data = yaml.safe_dump(
+        {"created_at": "2022-06-01T12:00:00.123456789Z", "pid": 1, "public": True}
+    ).replace("'", "")
+
+    assert lxc.load_yaml(data) == {
+        "created_at": "2022-06-01T12:00:00.123456789Z",
+        "pid": "1",
+        "public": "true",
+    }
+
+
+def test_list_large(fake_process):
+    instances = [{"name": f"test{i}", "status": "Running"} for i in range(5000)]
+    fake_process.register_subprocess(
+        ["lxc", "--project", "default", "list", "local:", "--format=json"],
+        stdout=json.dumps(instances),
+    )
+
+    assert LXC().list() == instances
+
+
+@pytest.fixture
+def timings():
+    recorded = []
+    instrumentation.add_hook(recorded.append)
+
+    yield recorded
+
+    instrumentation.remove_hook(recorded.append)
+
+
+@pytest.mark.parametrize(
+    "command,subcommand",
+    [
+        (["info", "local:"], "info"),
+        (["image", "alias", "list", "local:"], "image alias list"),
+        (["config", "device", "show", "local:test"], "config device show"),
+        (["config", "set", "local:test", "key=value"], "config set"),
+        (["remote", "add", "name", "addr"], "remote add"),
+    ],
+)
+def test_lxc_run_instrumentation(fake_process, timings, command, subcommand):
+    fake_process.register_subprocess(["lxc", "--project", "test-project", *command])
+
+    LXC()._run_lxc(command, check=True, project="test-project", remote="test-remote")
+
+    assert [(t.subcommand, t.project, t.remote) for t in timings] == [
+        (subcommand, "test-project", "test-remote")
+    ]
+
+
+def test_instrumentation(fake_process, timings):
+    fake_process.register_subprocess(
+        ["lxc", "--project", "test-project", "start", "test-remote:test-instance"]
+    )
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "exec",
+            "test-remote:test-instance",
+            "--",
+            "true",
+        ],
+        stdout="output",
+        returncode=1,
+    )
+
+    lxc_client = LXC()
+    lxc_client.start(
+        instance_name="test-instance", project="test-project", remote="test-remote"
+    )
+    lxc_client.exec(
+        command=["true"],
+        instance_name="test-instance",
+        project="test-project",
+        remote="test-remote",
+        capture_output=True,
+    )
+
+    assert [
+        (t.provider, t.subcommand, t.project, t.remote, t.returncode, t.output_bytes)
+        for t in timings
+    ] == [
+        ("lxc", "start", "test-project", "test-remote", 0, 0),
+        ("lxc", "exec", "test-project", "test-remote", 1, 6),
+    ]
+
+
 def test_lxc_run_default(mocker, tmp_path):
     """Test _lxc_run with default arguments."""
     mock_run = mocker.patch("subprocess.run")
@@ -358,6 +453,87 @@ def test_config_set_error(fake_process):
     )
 
 
+def test_copy(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "copy",
+            "test-remote:test-instance",
+            "test-remote:test-copy",
+        ],
+    )
+
+    LXC().copy(
+        source_instance_name="test-instance",
+        destination_instance_name="test-copy",
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_copy_all_opts(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "copy",
+            "test-remote:test-instance/test-snapshot",
+            "test-remote:test-copy",
+            "--ephemeral",
+            "--config",
+            "test-key=test-value",
+            "--config",
+            "test-key2=test-value2",
+        ],
+    )
+
+    LXC().copy(
+        source_instance_name="test-instance",
+        source_snapshot_name="test-snapshot",
+        destination_instance_name="test-copy",
+        config_keys={"test-key": "test-value", "test-key2": "test-value2"},
+        ephemeral=True,
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_copy_error(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "copy",
+            "test-remote:test-instance",
+            "test-remote:test-copy",
+        ],
+        returncode=1,
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        LXC().copy(
+            source_instance_name="test-instance",
+            destination_instance_name="test-copy",
+            project="test-project",
+            remote="test-remote",
+        )
+
+    assert exc_info.value == LXDError(
+        brief="Failed to copy instance 'test-instance' to 'test-copy'.",
+        details=errors.details_from_called_process_error(
+            exc_info.value.__cause__  # type: ignore
+        ),
+    )
+
+
 def test_delete(fake_process):
     fake_process.register_subprocess(
         [
@@ -709,6 +885,103 @@ def test_info(fake_process):
     assert info == {"config": {}, "api_extensions": ["foo"]}
 
 
+@pytest.fixture
+def mock_lxd_snap(tmp_path, monkeypatch):
+    """Pretend revision 123 of the LXD snap is installed, on kernel 1.2.3."""
+    revision_path = tmp_path / "current"
+    revision_path.symlink_to("123")
+    monkeypatch.setattr(lxc, "_LXD_SNAP_REVISION_PATH", revision_path)
+    monkeypatch.setattr(lxc.platform, "release", lambda: "1.2.3")
+    yield revision_path
+
+
+def test_server_info(fake_process):
+    lxc_client = LXC()
+    for remote in ["local", "test-remote"]:
+        fake_process.register_subprocess(
+            ["lxc", "--project", "test-project", "info", f"{remote}:"],
+            stdout=f"config: {{}}\nremote: {remote}\n",
+        )
+
+    for _ in range(3):
+        for remote in ["local", "test-remote"]:
+            info = lxc_client.server_info(project="test-project", remote=remote)
+            assert info == {"config": {}, "remote": remote}
+
+    assert len(fake_process.calls) == 2
+
+
+def test_server_info_cache_path(fake_process, mock_lxd_snap, tmp_path):
+    cache_path = tmp_path / "cache" / "lxd-server-info.json"
+    fake_process.register_subprocess(
+        ["lxc", "--project", "default", "info", "local:"],
+        stdout="api_extensions:\n - foo\n",
+    )
+
+    info = LXC(server_info_cache_path=cache_path).server_info()
+    cached_info = LXC(server_info_cache_path=cache_path).server_info()
+
+    assert info == cached_info == {"api_extensions": ["foo"]}
+    assert len(fake_process.calls) == 1
+    assert json.loads(cache_path.read_text()) == {
+        "key": "lxd-123-1.2.3",
+        "info": {"api_extensions": ["foo"]},
+    }
+
+
+def test_server_info_cache_path_refresh(fake_process, mock_lxd_snap, tmp_path):
+    cache_path = tmp_path / "lxd-server-info.json"
+    cache_path.write_text(json.dumps({"key": "lxd-122-1.2.3", "info": {"old": "1"}}))
+    fake_process.register_subprocess(
+        ["lxc", "--project", "default", "info", "local:"],
+        stdout="new: '1'\n",
+    )
+
+    info = LXC(server_info_cache_path=cache_path).server_info()
+
+    assert info == {"new": "1"}
+    assert json.loads(cache_path.read_text())["key"] == "lxd-123-1.2.3"
+
+
+def test_server_info_cache_path_invalid(fake_process, mock_lxd_snap, tmp_path):
+    cache_path = tmp_path / "lxd-server-info.json"
+    cache_path.write_text("not json")
+    fake_process.register_subprocess(
+        ["lxc", "--project", "default", "info", "local:"],
+        stdout="new: '1'\n",
+    )
+
+    info = LXC(server_info_cache_path=cache_path).server_info()
+
+    assert info == {"new": "1"}
+
+
+def test_server_info_cache_path_remote(fake_process, mock_lxd_snap, tmp_path):
+    """Only the local server is cached."""
+    cache_path = tmp_path / "lxd-server-info.json"
+    fake_process.register_subprocess(
+        ["lxc", "--project", "default", "info", "test-remote:"],
+        stdout="config: {}\n",
+    )
+
+    LXC(server_info_cache_path=cache_path).server_info(remote="test-remote")
+
+    assert not cache_path.exists()
+
+
+def test_server_info_cache_path_no_snap(fake_process, tmp_path, monkeypatch):
+    cache_path = tmp_path / "lxd-server-info.json"
+    monkeypatch.setattr(lxc, "_LXD_SNAP_REVISION_PATH", tmp_path / "missing")
+    fake_process.register_subprocess(
+        ["lxc", "--project", "default", "info", "local:"],
+        stdout="config: {}\n",
+    )
+
+    LXC(server_info_cache_path=cache_path).server_info()
+
+    assert not cache_path.exists()
+
+
 def test_info_with_instance(fake_process):
     fake_process.register_subprocess(
         [
@@ -867,28 +1140,171 @@ def test_launch_error(fake_process):
     )
 
 
+_IMAGE_ALIAS_LIST_COMMAND = [
+    "lxc",
+    "--project",
+    "test-project",
+    "image",
+    "alias",
+    "list",
+    "test-remote:",
+    "--format=json",
+]
+_IMAGE_ALIASES = (
+    '[{"name": "image1", "target": "fingerprint1"},'
+    ' {"name": "image10", "target": "fingerprint10"},'
+    ' {"name": "image2", "target": "fingerprint2"}]'
+)
+
+
 def test_has_image(fake_process):
     lxc = LXC()
+    fake_process.register_subprocess(
+        [*_IMAGE_ALIAS_LIST_COMMAND, "image1"],
+        stdout='[{"name": "image1", "target": "fingerprint1"},'
+        ' {"name": "image10", "target": "fingerprint10"}]',
+    )
+    fake_process.register_subprocess(
+        [*_IMAGE_ALIAS_LIST_COMMAND, "image3"],
+        stdout="[]\n",
+    )
+
+    assert lxc.has_image("image1", project="test-project", remote="test-remote") is True
+    assert (
+        lxc.has_image("image3", project="test-project", remote="test-remote") is False
+    )
+
+
+def test_image_alias_list(fake_process):
+    fake_process.register_subprocess(_IMAGE_ALIAS_LIST_COMMAND, stdout=_IMAGE_ALIASES)
+
+    aliases = LXC().image_alias_list(project="test-project", remote="test-remote")
+
+    assert [a["name"] for a in aliases] == ["image1", "image10", "image2"]
+
+
+def test_image_alias_list_alias(fake_process):
+    # lxc also lists aliases merely containing the requested one.
+    fake_process.register_subprocess(
+        [*_IMAGE_ALIAS_LIST_COMMAND, "image1"],
+        stdout='[{"name": "image1", "target": "fingerprint1"},'
+        ' {"name": "image10", "target": "fingerprint10"}]',
+    )
+
+    aliases = LXC().image_alias_list(
+        alias="image1", project="test-project", remote="test-remote"
+    )
+
+    assert aliases == [{"name": "image1", "target": "fingerprint1"}]
+
+
+def test_image_alias_list_error(fake_process):
+    fake_process.register_subprocess(_IMAGE_ALIAS_LIST_COMMAND, returncode=1)
+
+    with pytest.raises(LXDError) as exc_info:
+        LXC().image_alias_list(project="test-project", remote="test-remote")
+
+    assert exc_info.value == LXDError(
+        brief="Failed to list image aliases for project 'test-project'.",
+        details=errors.details_from_called_process_error(
+            exc_info.value.__cause__  # type: ignore
+        ),
+    )
+
+
+def test_image_alias_list_parse_error(fake_process):
+    fake_process.register_subprocess(_IMAGE_ALIAS_LIST_COMMAND, stdout="fail:\nthis\n")
+
+    with pytest.raises(LXDError) as exc_info:
+        LXC().image_alias_list(project="test-project", remote="test-remote")
+
+    assert exc_info.value == LXDError(
+        brief="Failed to parse lxc image alias list.",
+        details=(
+            "* Command that failed:"
+            " 'lxc --project test-project image alias list test-remote:"
+            " --format=json'\n"
+            "* Command output: b'fail:\\nthis\\n'"
+        ),
+    )
+
+
+def test_image_fingerprint(fake_process):
+    fake_process.register_subprocess(
+        [*_IMAGE_ALIAS_LIST_COMMAND, "image2"],
+        stdout='[{"name": "image2", "target": "fingerprint2"}]',
+    )
+
+    fingerprint = LXC().image_fingerprint(
+        "image2", project="test-project", remote="test-remote"
+    )
+
+    assert fingerprint == "fingerprint2"
+
+
+def test_image_fingerprint_index(fake_process):
+    lxc = LXC(image_alias_index=True)
+    fake_process.register_subprocess(_IMAGE_ALIAS_LIST_COMMAND, stdout=_IMAGE_ALIASES)
+
+    fingerprints = [
+        lxc.image_fingerprint(name, project="test-project", remote="test-remote")
+        for name in ["image1", "image2", "image3"]
+    ]
+
+    assert fingerprints == ["fingerprint1", "fingerprint2", None]
+    assert len(fake_process.calls) == 1
+
+
+@pytest.mark.parametrize(
+    "method,kwargs",
+    [
+        ("image_delete", {"image": "image1"}),
+        ("image_copy", {"image": "image3", "image_remote": "other"}),
+        ("publish", {"instance_name": "instance", "image_remote": "test-remote"}),
+    ],
+)
+def test_image_fingerprint_index_reloaded(fake_process, method, kwargs):
+    lxc = LXC(image_alias_index=True)
+    fake_process.register_subprocess(_IMAGE_ALIAS_LIST_COMMAND, stdout=_IMAGE_ALIASES)
+    fake_process.register_subprocess([fake_process.any()])
+    fake_process.register_subprocess(
+        _IMAGE_ALIAS_LIST_COMMAND,
+        stdout='[{"name": "image3", "target": "fingerprint3"}]',
+    )
+
+    assert (
+        lxc.has_image("image3", project="test-project", remote="test-remote") is False
+    )
+    getattr(lxc, method)(project="test-project", remote="test-remote", **kwargs)
+
+    assert (
+        lxc.has_image("image1", project="test-project", remote="test-remote") is False
+    )
+    assert lxc.has_image("image3", project="test-project", remote="test-remote") is True
+    assert len(fake_process.calls) == 3
+
+
+def test_image_fingerprint_index_other_project(fake_process):
+    lxc = LXC(image_alias_index=True)
+    fake_process.register_subprocess(_IMAGE_ALIAS_LIST_COMMAND, stdout=_IMAGE_ALIASES)
     fake_process.register_subprocess(
         [
             "lxc",
             "--project",
-            "test-project",
+            "other",
             "image",
+            "alias",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
-        stdout="- aliases:\n  - name: image1\n- aliases:\n  - name: image2\n",
-        occurrences=3,
+        stdout="[]\n",
     )
-    fake_process.keep_last_process(True)
 
     assert lxc.has_image("image1", project="test-project", remote="test-remote") is True
+    assert lxc.has_image("image1", project="other", remote="test-remote") is False
     assert lxc.has_image("image2", project="test-project", remote="test-remote") is True
-    assert (
-        lxc.has_image("image3", project="test-project", remote="test-remote") is False
-    )
+    assert len(fake_process.calls) == 2
 
 
 def test_image_copy(fake_process):
@@ -925,6 +1341,7 @@ def test_image_copy_all_opts(fake_process):
             "test-image-remote:test-image",
             "test-remote:",
             "--alias=test-alias",
+            "--auto-update",
         ]
     )
 
@@ -932,6 +1349,7 @@ def test_image_copy_all_opts(fake_process):
         image="test-image",
         image_remote="test-image-remote",
         alias="test-alias",
+        auto_update=True,
         project="test-project",
         remote="test-remote",
     )
@@ -1027,9 +1445,9 @@ def test_image_list(fake_process):
             "image",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
-        stdout="- image1: stuff\n- image2: stuff\n",
+        stdout='[{"image1": "stuff"}, {"image2": "stuff"}]',
     )
 
     images = LXC().image_list(
@@ -1050,7 +1468,7 @@ def test_image_list_error(fake_process):
             "image",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
         returncode=1,
     )
@@ -1078,7 +1496,7 @@ def test_image_list_parse_error(fake_process):
             "image",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
         stdout="fail:\nthis\n",
     )
@@ -1093,12 +1511,69 @@ def test_image_list_parse_error(fake_process):
         brief="Failed to parse lxc image list.",
         details=(
             "* Command that failed:"
-            " 'lxc --project test-project image list test-remote: --format=yaml'\n"
+            " 'lxc --project test-project image list test-remote: --format=json'\n"
             "* Command output: b'fail:\\nthis\\n'"
         ),
     )
 
 
+def test_image_set_property(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "image",
+            "set-property",
+            "test-remote:test-image",
+            "test-key",
+            "test-value",
+        ],
+    )
+
+    LXC().image_set_property(
+        image="test-image",
+        key="test-key",
+        value="test-value",
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_image_set_property_error(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "image",
+            "set-property",
+            "test-remote:test-image",
+            "test-key",
+            "test-value",
+        ],
+        returncode=1,
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        LXC().image_set_property(
+            image="test-image",
+            key="test-key",
+            value="test-value",
+            project="test-project",
+            remote="test-remote",
+        )
+
+    assert exc_info.value == LXDError(
+        brief="Failed to set property 'test-key' of image 'test-image'.",
+        details=errors.details_from_called_process_error(
+            exc_info.value.__cause__  # type: ignore
+        ),
+    )
+
+
 def test_list(fake_process):
     fake_process.register_subprocess(
         [
@@ -1107,9 +1582,9 @@ def test_list(fake_process):
             "test-project",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
-        stdout="- name: test1\n- name: test2\n",
+        stdout='[{"name": "test1"}, {"name": "test2"}]',
     )
 
     container_names = LXC().list(
@@ -1121,6 +1596,30 @@ def test_list(fake_process):
     assert container_names == [{"name": "test1"}, {"name": "test2"}]
 
 
+def test_list_instance_name(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "list",
+            "test-remote:",
+            "--format=json",
+            "^test1$",
+        ],
+        stdout='[{"name": "test1"}]',
+    )
+
+    instances = LXC().list(
+        instance_name="test1",
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert len(fake_process.calls) == 1
+    assert instances == [{"name": "test1"}]
+
+
 def test_list_error(fake_process):
     fake_process.register_subprocess(
         [
@@ -1129,7 +1628,7 @@ def test_list_error(fake_process):
             "test-project",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
         returncode=1,
     )
@@ -1156,7 +1655,7 @@ def test_list_parse_error(fake_process):
             "test-project",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
         stdout="fail:\nthis\n",
     )
@@ -1171,13 +1670,13 @@ def test_list_parse_error(fake_process):
         brief="Failed to parse lxc list.",
         details=(
             "* Command that failed:"
-            " 'lxc --project test-project list test-remote: --format=yaml'\n"
+            " 'lxc --project test-project list test-remote: --format=json'\n"
             "* Command output: b'fail:\\nthis\\n'"
         ),
     )
 
 
-def test_list_names(fake_process):
+def test_list_columns(fake_process):
     fake_process.register_subprocess(
         [
             "lxc",
@@ -1185,21 +1684,61 @@ def test_list_names(fake_process):
             "test-project",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=csv",
+            "--columns=ns",
+            "^test1$",
         ],
-        stdout="- name: test1\n- name: test2\n",
+        stdout="test1,RUNNING\n",
     )
 
-    container_names = LXC().list_names(
+    instances = LXC().list(
+        instance_name="test1",
+        columns=["name", "status"],
         project="test-project",
         remote="test-remote",
     )
 
     assert len(fake_process.calls) == 1
-    assert container_names == ["test1", "test2"]
+    assert instances == [{"name": "test1", "status": "Running"}]
+
+
+def test_list_columns_quoted(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "list",
+            "test-remote:",
+            "--format=csv",
+            "--columns=nd",
+        ],
+        stdout='test1,"a, b"\ntest2,\n',
+    )
+
+    instances = LXC().list(
+        columns=["name", "description"],
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert instances == [
+        {"name": "test1", "description": "a, b"},
+        {"name": "test2", "description": ""},
+    ]
 
 
-def test_list_names_parse_error(fake_process):
+def test_list_columns_unsupported(fake_process):
+    with pytest.raises(LXDError) as exc_info:
+        LXC().list(columns=["name", "config"])
+
+    assert len(fake_process.calls) == 0
+    assert exc_info.value == LXDError(
+        brief="Unsupported columns for lxc list: ['config']."
+    )
+
+
+def test_list_columns_parse_error(fake_process):
     fake_process.register_subprocess(
         [
             "lxc",
@@ -1207,17 +1746,63 @@ def test_list_names_parse_error(fake_process):
             "test-project",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=csv",
+            "--columns=n",
         ],
-        stdout="- foo: bar",
+        stdout="test1,extra\n",
     )
 
     with pytest.raises(LXDError) as exc_info:
-        LXC().list_names(
+        LXC().list(
+            columns=["name"],
             project="test-project",
             remote="test-remote",
         )
 
+    assert exc_info.value == LXDError(
+        brief="Failed to parse lxc list.",
+        details=(
+            "* Command that failed:"
+            " 'lxc --project test-project list test-remote: --format=csv"
+            " --columns=n'\n"
+            "* Command output: b'test1,extra\\n'"
+        ),
+    )
+
+
+def test_list_names(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "list",
+            "test-remote:",
+            "--format=csv",
+            "--columns=n",
+        ],
+        stdout="test1\ntest2\n",
+    )
+
+    container_names = LXC().list_names(
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert len(fake_process.calls) == 1
+    assert container_names == ["test1", "test2"]
+
+
+def test_list_names_parse_error():
+    lxc = LXC()
+
+    with mock.patch.object(lxc, "list", return_value=[{"foo": "bar"}]):
+        with pytest.raises(LXDError) as exc_info:
+            lxc.list_names(
+                project="test-project",
+                remote="test-remote",
+            )
+
     assert exc_info.value == LXDError(
         brief="Failed to parse lxc list.",
         details=("* Data received from lxc list: [{'foo': 'bar'}]"),
@@ -1236,7 +1821,7 @@ def test_profile_edit(fake_process):
             "test-remote:test-profile",
         ],
         stdin_callable=stdin_records.append,
-        stdout="- name: test1\n- name: test2\n",
+        stdout='[{"name": "test1"}, {"name": "test2"}]',
     )
 
     LXC().profile_edit(
@@ -1431,9 +2016,9 @@ def test_project_list(fake_process):
             "project",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
-        stdout="- name: default\n- name: myproject\n",
+        stdout='[{"name": "default"}, {"name": "myproject"}]',
     )
 
     projects = LXC().project_list(
@@ -1451,7 +2036,7 @@ def test_project_list_error(fake_process):
             "project",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
         returncode=1,
     )
@@ -1476,7 +2061,7 @@ def test_project_list_parse_error(fake_process):
             "project",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
         stdout="fail:\nthis\n",
     )
@@ -1489,7 +2074,7 @@ def test_project_list_parse_error(fake_process):
     assert exc_info.value == LXDError(
         brief="Failed to parse lxc project list.",
         details=(
-            "* Command that failed: 'lxc project list test-remote: --format=yaml'\n"
+            "* Command that failed: 'lxc project list test-remote: --format=json'\n"
             "* Command output: b'fail:\\nthis\\n'"
         ),
     )
@@ -1502,9 +2087,9 @@ def test_project_list_parse_error_missing_name(fake_process):
             "project",
             "list",
             "test-remote:",
-            "--format=yaml",
+            "--format=json",
         ],
-        stdout="- foo: bar",
+        stdout='[{"foo": "bar"}]',
     )
 
     with pytest.raises(LXDError) as exc_info:
@@ -1515,8 +2100,8 @@ def test_project_list_parse_error_missing_name(fake_process):
     assert exc_info.value == LXDError(
         brief="Failed to parse lxc project list.",
         details=(
-            "* Command that failed: 'lxc project list test-remote: --format=yaml'\n"
-            "* Command output: b'- foo: bar'"
+            "* Command that failed: 'lxc project list test-remote: --format=json'\n"
+            '* Command output: b\'[{"foo": "bar"}]\''
         ),
     )
 
@@ -1598,6 +2183,31 @@ def test_publish_all_opts(fake_process):
     assert len(fake_process.calls) == 1
 
 
+def test_publish_snapshot(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "publish",
+            "test-remote:test-instance/test-snapshot",
+            "test-image-remote:",
+            "--alias=test-alias",
+        ],
+    )
+
+    LXC().publish(
+        alias="test-alias",
+        image_remote="test-image-remote",
+        instance_name="test-instance",
+        snapshot_name="test-snapshot",
+        remote="test-remote",
+        project="test-project",
+    )
+
+    assert len(fake_process.calls) == 1
+
+
 def test_remote_add(fake_process):
     fake_process.register_subprocess(
         [
@@ -1653,9 +2263,9 @@ def test_remote_list(fake_process):
             "lxc",
             "remote",
             "list",
-            "--format=yaml",
+            "--format=json",
         ],
-        stdout="r1:\n  addr: a1\nr2:\n  addr: a2\n",
+        stdout='{"r1": {"addr": "a1"}, "r2": {"addr": "a2"}}',
     )
 
     remotes = LXC().remote_list()
@@ -1670,7 +2280,7 @@ def test_remote_list_error(fake_process):
             "lxc",
             "remote",
             "list",
-            "--format=yaml",
+            "--format=json",
         ],
         returncode=1,
     )
@@ -1692,7 +2302,7 @@ def test_remote_list_parse_error(fake_process):
             "lxc",
             "remote",
             "list",
-            "--format=yaml",
+            "--format=json",
         ],
         stdout=b"fail:\nthis",
     )
@@ -1703,12 +2313,166 @@ def test_remote_list_parse_error(fake_process):
     assert exc_info.value == LXDError(
         brief="Failed to parse lxc remote list.",
         details=(
-            "* Command that failed: 'lxc remote list --format=yaml'\n"
+            "* Command that failed: 'lxc remote list --format=json'\n"
             "* Command output: b'fail:\\nthis'"
         ),
     )
 
 
+def test_restore(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "restore",
+            "test-remote:test-instance",
+            "test-snapshot",
+        ],
+    )
+
+    LXC().restore(
+        instance_name="test-instance",
+        snapshot_name="test-snapshot",
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_restore_error(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "restore",
+            "test-remote:test-instance",
+            "test-snapshot",
+        ],
+        returncode=1,
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        LXC().restore(
+            instance_name="test-instance",
+            snapshot_name="test-snapshot",
+            project="test-project",
+            remote="test-remote",
+        )
+
+    assert exc_info.value == LXDError(
+        brief="Failed to restore instance 'test-instance' to snapshot 'test-snapshot'.",
+        details=errors.details_from_called_process_error(
+            exc_info.value.__cause__  # type: ignore
+        ),
+    )
+
+
+@pytest.mark.parametrize("reuse,flags", [(False, []), (True, ["--reuse"])])
+def test_snapshot(fake_process, reuse, flags):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "snapshot",
+            "test-remote:test-instance",
+            "test-snapshot",
+            *flags,
+        ],
+    )
+
+    LXC().snapshot(
+        instance_name="test-instance",
+        snapshot_name="test-snapshot",
+        reuse=reuse,
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_snapshot_error(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "snapshot",
+            "test-remote:test-instance",
+            "test-snapshot",
+        ],
+        returncode=1,
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        LXC().snapshot(
+            instance_name="test-instance",
+            snapshot_name="test-snapshot",
+            project="test-project",
+            remote="test-remote",
+        )
+
+    assert exc_info.value == LXDError(
+        brief="Failed to create snapshot 'test-snapshot' of instance 'test-instance'.",
+        details=errors.details_from_called_process_error(
+            exc_info.value.__cause__  # type: ignore
+        ),
+    )
+
+
+def test_snapshot_delete(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "delete",
+            "test-remote:test-instance/test-snapshot",
+        ],
+    )
+
+    LXC().snapshot_delete(
+        instance_name="test-instance",
+        snapshot_name="test-snapshot",
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert len(fake_process.calls) == 1
+
+
+def test_snapshot_delete_error(fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "test-project",
+            "delete",
+            "test-remote:test-instance/test-snapshot",
+        ],
+        returncode=1,
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        LXC().snapshot_delete(
+            instance_name="test-instance",
+            snapshot_name="test-snapshot",
+            project="test-project",
+            remote="test-remote",
+        )
+
+    assert exc_info.value == LXDError(
+        brief="Failed to delete snapshot 'test-snapshot' of instance 'test-instance'.",
+        details=errors.details_from_called_process_error(
+            exc_info.value.__cause__  # type: ignore
+        ),
+    )
+
+
 def test_start(fake_process):
     fake_process.register_subprocess(
         [
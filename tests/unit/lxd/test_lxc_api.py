@@ -0,0 +1,621 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+import http.server
+import json
+import pathlib
+import shutil
+import socketserver
+import tempfile
+import threading
+import urllib.parse
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from craft_providers.lxd import LXCAPI, LXDError
+
+
+class FakeLXDServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Fake LXD daemon serving canned responses on a unix socket.
+
+    Responses are registered per method and path with `add()`.  Received
+    requests are recorded in `requests`, and accepted connections counted in
+    `connections`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: pathlib.Path) -> None:
+        self.responses: Dict[Tuple[str, str], Tuple[int, bytes, Dict[str, str]]] = {}
+        self.requests: List[Dict[str, Any]] = []
+        self.connections = 0
+        super().__init__(str(socket_path), FakeLXDHandler)
+
+    def add(self, method, path, *, metadata=None, status=200, body=None, headers=None):
+        if body is None:
+            body = json.dumps(
+                {"type": "sync", "status_code": status, "metadata": metadata}
+            ).encode()
+        self.responses[(method, path)] = (status, body, headers or {})
+
+    def add_async(self, method, path, *, operation="op-1", status="Success", err=""):
+        self.add(
+            method,
+            path,
+            status=202,
+            body=json.dumps(
+                {"type": "async", "operation": f"/1.0/operations/{operation}"}
+            ).encode(),
+        )
+        self.add(
+            "GET",
+            f"/1.0/operations/{operation}/wait",
+            metadata={"status": status, "err": err},
+        )
+
+    def add_error(self, method, path, *, status=404, error="not found"):
+        self.add(
+            method,
+            path,
+            status=status,
+            body=json.dumps(
+                {"type": "error", "error": error, "error_code": status}
+            ).encode(),
+        )
+
+
+class FakeLXDHandler(http.server.BaseHTTPRequestHandler):
+    """Handler answering requests to FakeLXDServer with its responses."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1  # type: ignore
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _handle(self):
+        url = urllib.parse.urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        self.server.requests.append(  # type: ignore
+            {
+                "method": self.command,
+                "path": url.path,
+                "query": dict(urllib.parse.parse_qsl(url.query)),
+                "headers": dict(self.headers),
+                "body": body,
+            }
+        )
+
+        status, response, headers = self.server.responses.get(  # type: ignore
+            (self.command, url.path),
+            (404, json.dumps({"type": "error", "error": "not found"}).encode(), {}),
+        )
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+@pytest.fixture
+def fake_lxd():
+    # Keep the socket path short to respect the limit on unix socket paths.
+    tmp_dir = pathlib.Path(tempfile.mkdtemp(prefix="lxd-"))
+    server = FakeLXDServer(tmp_dir / "unix.socket")
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    shutil.rmtree(tmp_dir)
+
+
+@pytest.fixture
+def lxc(fake_lxd):
+    yield LXCAPI(socket_path=pathlib.Path(fake_lxd.server_address))
+
+
+def test_list(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0/instances",
+        metadata=[{"name": "test-instance", "status": "Running"}],
+    )
+
+    instances = lxc.list(project="test-project")
+
+    assert instances == [{"name": "test-instance", "status": "Running"}]
+    assert fake_lxd.requests[0]["query"] == {
+        "project": "test-project",
+        "recursion": "2",
+    }
+
+
+def test_list_instance_name(fake_lxd, lxc):
+    # Filtering also holds for daemons ignoring the server-side filter.
+    fake_lxd.add(
+        "GET",
+        "/1.0/instances",
+        metadata=[{"name": "test-instance"}, {"name": "test-instance-2"}],
+    )
+
+    instances = lxc.list(instance_name="test-instance")
+
+    assert instances == [{"name": "test-instance"}]
+    assert fake_lxd.requests[0]["query"] == {
+        "filter": "name eq test-instance",
+        "project": "default",
+        "recursion": "2",
+    }
+
+
+def test_list_columns(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0/instances",
+        metadata=[{"name": "test-instance", "status": "Stopped", "config": {"a": "b"}}],
+    )
+
+    instances = lxc.list(columns=["name", "status"])
+
+    assert instances == [{"name": "test-instance", "status": "Stopped"}]
+    assert fake_lxd.requests[0]["query"] == {
+        "project": "default",
+        "recursion": "1",
+    }
+
+
+def test_list_columns_unsupported(fake_lxd, lxc):
+    with pytest.raises(LXDError) as exc_info:
+        lxc.list(columns=["config"])
+
+    assert exc_info.value == LXDError(
+        brief="Unsupported columns for lxc list: ['config']."
+    )
+    assert fake_lxd.requests == []
+
+
+def test_image_alias_list(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0/images/aliases",
+        metadata=[
+            {"name": "test-image", "target": "abc"},
+            {"name": "test-image-2", "target": "def"},
+        ],
+    )
+
+    aliases = lxc.image_alias_list(alias="test-image", project="test-project")
+
+    assert aliases == [{"name": "test-image", "target": "abc"}]
+    assert fake_lxd.requests[0]["query"] == {
+        "project": "test-project",
+        "recursion": "1",
+    }
+
+
+def test_image_fingerprint_index(fake_lxd):
+    lxc = LXCAPI(
+        socket_path=pathlib.Path(fake_lxd.server_address), image_alias_index=True
+    )
+    fake_lxd.add(
+        "GET",
+        "/1.0/images/aliases",
+        metadata=[{"name": "test-image", "target": "abc"}],
+    )
+    fake_lxd.add("GET", "/1.0/images/aliases/test-image", metadata={"target": "abc"})
+    fake_lxd.add("DELETE", "/1.0/images/abc", metadata={})
+
+    assert lxc.has_image("test-image") is True
+    assert lxc.has_image("other-image") is False
+    lxc.image_delete(image="test-image")
+    # The fake server still lists the alias, which is reloaded after deletion.
+    assert lxc.has_image("test-image") is True
+
+    assert [r["path"] for r in fake_lxd.requests] == [
+        "/1.0/images/aliases",
+        "/1.0/images/aliases/test-image",
+        "/1.0/images/abc",
+        "/1.0/images/aliases",
+    ]
+
+
+def test_requests_share_connection(fake_lxd, lxc):
+    fake_lxd.add("GET", "/1.0/instances", metadata=[])
+
+    for _ in range(5):
+        lxc.list_names()
+
+    assert len(fake_lxd.requests) == 5
+    assert fake_lxd.connections == 1
+
+
+def test_error_response(fake_lxd, lxc):
+    fake_lxd.add_error("GET", "/1.0/instances", status=403, error="not authorized")
+
+    with pytest.raises(LXDError) as exc_info:
+        lxc.list(project="test-project")
+
+    assert exc_info.value == LXDError(
+        brief="Failed to list instances for project 'test-project'.",
+        details=(
+            "* Request that failed: GET /1.0/instances\n"
+            "* Response code: 403\n"
+            "* Error: not authorized"
+        ),
+    )
+
+
+def test_connection_error(tmp_path):
+    lxc = LXCAPI(socket_path=tmp_path / "missing.socket")
+
+    with pytest.raises(LXDError) as exc_info:
+        lxc.project_list()
+
+    assert exc_info.value.brief == "Failed to list projects on remote 'local'."
+
+
+def test_async_operation(fake_lxd, lxc):
+    fake_lxd.add_async("PUT", "/1.0/instances/test-instance/state")
+
+    lxc.start(instance_name="test-instance", project="test-project")
+
+    assert [(r["method"], r["path"]) for r in fake_lxd.requests] == [
+        ("PUT", "/1.0/instances/test-instance/state"),
+        ("GET", "/1.0/operations/op-1/wait"),
+    ]
+    assert json.loads(fake_lxd.requests[0]["body"]) == {
+        "action": "start",
+        "force": False,
+        "timeout": -1,
+    }
+
+
+def test_async_operation_failure(fake_lxd, lxc):
+    fake_lxd.add_async(
+        "PUT", "/1.0/instances/test-instance/state", status="Failure", err="boom"
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        lxc.stop(instance_name="test-instance", force=True)
+
+    assert exc_info.value == LXDError(
+        brief="Failed to stop 'test-instance'.",
+        details="* Operation that failed: /1.0/operations/op-1\n* Error: boom",
+    )
+
+
+def test_launch_local_image(fake_lxd, lxc):
+    fake_lxd.add_async("POST", "/1.0/instances", operation="op-create")
+    fake_lxd.add_async(
+        "PUT", "/1.0/instances/test-instance/state", operation="op-start"
+    )
+
+    lxc.launch(
+        instance_name="test-instance",
+        image="test-image",
+        image_remote="local",
+        config_keys={"test-key": "test-value"},
+        ephemeral=True,
+        project="test-project",
+    )
+
+    assert json.loads(fake_lxd.requests[0]["body"]) == {
+        "name": "test-instance",
+        "source": {"type": "image", "alias": "test-image"},
+        "config": {"test-key": "test-value"},
+        "ephemeral": True,
+    }
+    assert json.loads(fake_lxd.requests[2]["body"])["action"] == "start"
+
+
+def test_launch_simplestreams_image(fake_lxd, lxc, fake_process):
+    fake_process.register_subprocess(
+        ["lxc", "remote", "list", "--format=json"],
+        stdout=json.dumps(
+            {
+                "test-remote": {
+                    "addr": "https://example.com/images",
+                    "protocol": "simplestreams",
+                }
+            }
+        ),
+    )
+    fake_lxd.add_async("POST", "/1.0/instances", operation="op-create")
+    fake_lxd.add_async(
+        "PUT", "/1.0/instances/test-instance/state", operation="op-start"
+    )
+
+    lxc.launch(instance_name="test-instance", image="22.04", image_remote="test-remote")
+
+    assert json.loads(fake_lxd.requests[0]["body"])["source"] == {
+        "type": "image",
+        "mode": "pull",
+        "alias": "22.04",
+        "server": "https://example.com/images",
+        "protocol": "simplestreams",
+    }
+
+
+def test_launch_other_remote_uses_lxc(fake_lxd, lxc, fake_process):
+    fake_process.register_subprocess(
+        [
+            "lxc",
+            "--project",
+            "default",
+            "launch",
+            "image-remote:test-image",
+            "test-remote:test-instance",
+        ]
+    )
+
+    lxc.launch(
+        instance_name="test-instance",
+        image="test-image",
+        image_remote="image-remote",
+        remote="test-remote",
+    )
+
+    assert fake_lxd.requests == []
+    assert len(fake_process.calls) == 1
+
+
+def test_image_copy_simplestreams_image(fake_lxd, lxc, fake_process):
+    fake_process.register_subprocess(
+        ["lxc", "remote", "list", "--format=json"],
+        stdout=json.dumps(
+            {
+                "test-remote": {
+                    "addr": "https://example.com/images",
+                    "protocol": "simplestreams",
+                }
+            }
+        ),
+    )
+    fake_lxd.add_async("POST", "/1.0/images", operation="op-copy")
+
+    lxc.image_copy(
+        image="22.04",
+        image_remote="test-remote",
+        alias="test-alias",
+        auto_update=True,
+        project="test-project",
+    )
+
+    assert json.loads(fake_lxd.requests[0]["body"]) == {
+        "source": {
+            "type": "image",
+            "mode": "pull",
+            "alias": "22.04",
+            "server": "https://example.com/images",
+            "protocol": "simplestreams",
+        },
+        "aliases": [{"name": "test-alias"}],
+        "auto_update": True,
+    }
+    assert fake_lxd.requests[0]["query"] == {"project": "test-project"}
+
+
+def test_config_device_add_disk(fake_lxd, lxc, tmp_path):
+    fake_lxd.add(
+        "GET",
+        "/1.0/instances/test-instance",
+        metadata={"name": "test-instance", "config": {}, "devices": {}},
+        headers={"ETag": "test-etag"},
+    )
+    fake_lxd.add_async("PUT", "/1.0/instances/test-instance")
+
+    lxc.config_device_add_disk(
+        instance_name="test-instance",
+        source=tmp_path,
+        path=pathlib.PurePosixPath("/mnt"),
+        device="disk-/mnt",
+    )
+
+    put = fake_lxd.requests[1]
+    assert put["headers"]["If-Match"] == "test-etag"
+    assert json.loads(put["body"])["devices"] == {
+        "disk-/mnt": {"type": "disk", "source": tmp_path.as_posix(), "path": "/mnt"}
+    }
+
+
+def test_config_device_remove_missing(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0/instances/test-instance",
+        metadata={"name": "test-instance", "devices": {}},
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        lxc.config_device_remove(instance_name="test-instance", device="foo")
+
+    assert exc_info.value == LXDError(
+        brief="Failed to remove device from instance 'test-instance'.",
+        details="* Device 'foo' doesn't exist",
+    )
+
+
+def test_delete_force_running(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0/instances/test-instance",
+        metadata={"name": "test-instance", "status": "Running"},
+    )
+    fake_lxd.add_async("PUT", "/1.0/instances/test-instance/state", operation="op-stop")
+    fake_lxd.add_async("DELETE", "/1.0/instances/test-instance", operation="op-del")
+
+    lxc.delete(instance_name="test-instance", force=True)
+
+    assert [(r["method"], r["path"]) for r in fake_lxd.requests] == [
+        ("GET", "/1.0/instances/test-instance"),
+        ("PUT", "/1.0/instances/test-instance/state"),
+        ("GET", "/1.0/operations/op-stop/wait"),
+        ("DELETE", "/1.0/instances/test-instance"),
+        ("GET", "/1.0/operations/op-del/wait"),
+    ]
+
+
+def test_file_push(fake_lxd, lxc, tmp_path):
+    source = tmp_path / "source"
+    source.write_bytes(b"test-content")
+    fake_lxd.add("POST", "/1.0/instances/test-instance/files")
+
+    lxc.file_push(
+        instance_name="test-instance",
+        source=source,
+        destination=pathlib.PurePosixPath("/etc/test"),
+        mode="0644",
+        uid=0,
+        gid=0,
+    )
+
+    request = fake_lxd.requests[0]
+    assert request["query"] == {"path": "/etc/test", "project": "default"}
+    assert request["body"] == b"test-content"
+    assert request["headers"]["X-LXD-mode"] == "0644"
+    assert request["headers"]["X-LXD-uid"] == "0"
+    assert request["headers"]["X-LXD-gid"] == "0"
+
+
+def test_file_pull(fake_lxd, lxc, tmp_path):
+    fake_lxd.add(
+        "GET",
+        "/1.0/instances/test-instance/files",
+        body=b"test-content",
+        headers={"X-LXD-type": "file"},
+    )
+
+    lxc.file_pull(
+        instance_name="test-instance",
+        source=pathlib.PurePosixPath("/etc/test"),
+        destination=tmp_path / "dest",
+    )
+
+    assert (tmp_path / "dest").read_bytes() == b"test-content"
+
+
+def test_file_pull_not_found(fake_lxd, lxc, tmp_path):
+    fake_lxd.add_error("GET", "/1.0/instances/test-instance/files")
+
+    with pytest.raises(LXDError) as exc_info:
+        lxc.file_pull(
+            instance_name="test-instance",
+            source=pathlib.PurePosixPath("/etc/test"),
+            destination=tmp_path / "dest",
+        )
+
+    assert exc_info.value.brief == (
+        "Failed to pull file '/etc/test' from instance 'test-instance'."
+    )
+
+
+def test_image_delete_alias(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0/images/aliases/test-alias",
+        metadata={"name": "test-alias", "target": "abcd"},
+    )
+    fake_lxd.add_async("DELETE", "/1.0/images/abcd")
+
+    lxc.image_delete(image="test-alias")
+
+    assert fake_lxd.requests[1]["path"] == "/1.0/images/abcd"
+
+
+def test_project_list(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0/projects",
+        metadata=["/1.0/projects/zz", "/1.0/projects/default"],
+    )
+
+    assert lxc.project_list() == ["default", "zz"]
+
+
+def test_publish_running_force(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0/instances/test-instance",
+        metadata={"name": "test-instance", "status": "Running"},
+    )
+    fake_lxd.add_async("PUT", "/1.0/instances/test-instance/state", operation="op-s")
+    fake_lxd.add_async("POST", "/1.0/images", operation="op-publish")
+
+    lxc.publish(instance_name="test-instance", alias="test-alias", force=True)
+
+    bodies = [json.loads(r["body"]) for r in fake_lxd.requests if r["body"]]
+    assert bodies == [
+        {"action": "stop", "force": False, "timeout": -1},
+        {
+            "source": {"type": "instance", "name": "test-instance"},
+            "aliases": [{"name": "test-alias"}],
+        },
+        {"action": "start", "force": False, "timeout": -1},
+    ]
+
+
+def test_publish_running_no_force(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0/instances/test-instance",
+        metadata={"name": "test-instance", "status": "Running"},
+    )
+
+    with pytest.raises(LXDError) as exc_info:
+        lxc.publish(instance_name="test-instance")
+
+    assert exc_info.value.details == "* The instance is currently running"
+
+
+def test_publish_snapshot(fake_lxd, lxc):
+    fake_lxd.add_async("POST", "/1.0/images", operation="op-publish")
+
+    lxc.publish(
+        instance_name="test-instance",
+        snapshot_name="test-snapshot",
+        alias="test-alias",
+    )
+
+    bodies = [json.loads(r["body"]) for r in fake_lxd.requests if r["body"]]
+    assert bodies == [
+        {
+            "source": {"type": "snapshot", "name": "test-instance/test-snapshot"},
+            "aliases": [{"name": "test-alias"}],
+        },
+    ]
+
+
+def test_info(fake_lxd, lxc):
+    fake_lxd.add(
+        "GET",
+        "/1.0",
+        metadata={"environment": {"kernel_features": {"seccomp_listener": "true"}}},
+    )
+
+    assert lxc.info() == {
+        "environment": {"kernel_features": {"seccomp_listener": "true"}}
+    }
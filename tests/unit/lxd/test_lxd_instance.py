@@ -19,17 +19,15 @@ import hashlib
 import io
 import os
 import pathlib
-import shutil
 import subprocess
 import sys
-import tempfile
 from unittest import mock
 
 import pytest
 from logassert import Exact  # type: ignore
 
-from craft_providers import errors
-from craft_providers.lxd import LXC, LXDError, LXDInstance
+from craft_providers import Base, errors
+from craft_providers.lxd import LXC, LXDError, LXDInstance, instance_helpers
 
 # These names include invalid characters so a lxd-compatible instance_name
 # is generated. This ensures an Instance's `name` and `instance_name` are
@@ -76,97 +74,102 @@ def mock_lxc(project_path):
                 "type": "disk",
             },
         }
-        lxc.info.return_value = {
+        lxc.server_info.return_value = {
             "environment": {"kernel_features": {}},
         }
         yield lxc
 
 
-@pytest.fixture
-def mock_named_temporary_file():
-    with mock.patch(
-        "craft_providers.lxd.lxd_instance.tempfile.NamedTemporaryFile",
-        spec=tempfile.NamedTemporaryFile,
-    ) as mock_tf:
-        mock_tf.return_value.__enter__.return_value.name = "test-tmp-file"
-        yield mock_tf.return_value
-
-
-@pytest.fixture
-def mock_shutil_copyfileobj():
-    with mock.patch.object(shutil, "copyfileobj") as mock_copyfileobj:
-        yield mock_copyfileobj
-
-
-@pytest.fixture
-def mock_os_unlink():
-    with mock.patch.object(os, "unlink") as mock_unlink:
-        yield mock_unlink
-
-
 @pytest.fixture
 def instance(mock_lxc):
     yield LXDInstance(name=_TEST_INSTANCE["name"], lxc=mock_lxc)
 
 
-def test_push_file_io(
-    mock_lxc,
-    mock_named_temporary_file,
-    mock_shutil_copyfileobj,
-    mock_os_unlink,
-    instance,
-):
-    mock_lxc.exec.side_effect = [
-        None,
-        None,
-        None,
-        None,
-    ]
-
+def test_push_file_io(mock_lxc, instance):
     instance.push_file_io(
         destination=pathlib.Path("/etc/test.conf"),
         content=io.BytesIO(b"foo"),
         file_mode="0644",
+        user="test-user",
+        group="test-group",
     )
 
     assert mock_lxc.mock_calls == [
-        mock.call.file_push(
-            instance_name=instance.instance_name,
-            source=pathlib.Path("test-tmp-file"),
-            destination=pathlib.Path("/etc/test.conf"),
-            mode="0644",
-            project=instance.project,
-            remote=instance.remote,
-        ),
         mock.call.exec(
             instance_name=instance.instance_name,
             command=[
-                "chown",
-                "root:root",
+                "sh",
+                "-c",
+                instance_helpers.PUSH_FILE_IO_SCRIPT,
+                "sh",
                 "/etc/test.conf",
+                "test-user:test-group",
+                "0644",
             ],
             cwd=None,
             project=instance.project,
             remote=instance.remote,
             runner=subprocess.run,
+            input=b"foo",
             capture_output=True,
             check=True,
         ),
     ]
 
-    assert mock_named_temporary_file.mock_calls == [
-        mock.call.__enter__(),
-        mock.call.__exit__(None, None, None),
-    ]
-    assert mock_shutil_copyfileobj.mock_calls == [
-        mock.call(mock.ANY, mock_named_temporary_file.__enter__.return_value)
-    ]
-    assert mock_os_unlink.mock_calls == [mock.call("test-tmp-file")]
+
+def test_push_file_io_script(tmp_path):
+    """The script writes the file atomically with its mode and owner."""
+    (tmp_path / "etc").mkdir()
+    destination = tmp_path / "etc" / "test.conf"
+    destination.write_text("old")
+    owner = f"{os.getuid()}:{os.getgid()}"
+
+    subprocess.run(
+        [
+            "sh",
+            "-c",
+            instance_helpers.PUSH_FILE_IO_SCRIPT,
+            "sh",
+            destination,
+            owner,
+            "0600",
+        ],
+        input=b"new",
+        check=True,
+    )
+
+    assert destination.read_bytes() == b"new"
+    assert destination.stat().st_mode & 0o777 == 0o600
+    assert list(destination.parent.iterdir()) == [destination]
+
+
+def test_push_file_io_script_error(tmp_path):
+    """The temporary file is removed if the file cannot be written."""
+    (tmp_path / "etc").mkdir()
+    destination = tmp_path / "etc" / "test.conf"
+
+    proc = subprocess.run(
+        [
+            "sh",
+            "-c",
+            instance_helpers.PUSH_FILE_IO_SCRIPT,
+            "sh",
+            destination,
+            "root:root",
+            "invalid-mode",
+        ],
+        input=b"new",
+        capture_output=True,
+        check=False,
+    )
+
+    assert proc.returncode != 0
+    assert list(destination.parent.iterdir()) == []
 
 
 def test_push_file_io_error(mock_lxc, instance):
     error = subprocess.CalledProcessError(
-        -1, ["chown", "root:root", "/etc/test.conf"], "test stdout", "test stderr"
+        -1, ["sh", "-c", "...", "/etc/test.conf"], "test stdout", "test stderr"
     )
 
     mock_lxc.exec.side_effect = error
@@ -187,6 +190,148 @@ def test_push_file_io_error(mock_lxc, instance):
     )
 
 
+_FOO_DIGEST = hashlib.sha256(b"foo").hexdigest()
+
+
+@pytest.mark.parametrize(
+    "returncode,stdout,skipped",
+    [
+        (0, f"{_FOO_DIGEST}  /etc/test.conf\n".encode(), True),
+        (0, f"\\{_FOO_DIGEST}  /etc/test\\nconf\n".encode(), True),
+        (0, f"{'0' * 64}  /etc/test.conf\n".encode(), False),
+        (1, b"", False),
+    ],
+)
+def test_push_file_io_skip_if_unchanged(
+    mock_lxc, instance, returncode, stdout, skipped
+):
+    mock_lxc.exec.return_value = subprocess.CompletedProcess(
+        [], returncode, stdout=stdout
+    )
+    content = io.BytesIO(b"foo")
+
+    instance.push_file_io(
+        destination=pathlib.Path("/etc/test.conf"),
+        content=content,
+        file_mode="0644",
+        skip_if_unchanged=True,
+    )
+
+    assert mock_lxc.exec.mock_calls[0] == mock.call(
+        instance_name=instance.instance_name,
+        command=["sha256sum", "--", "/etc/test.conf"],
+        cwd=None,
+        project=instance.project,
+        remote=instance.remote,
+        runner=subprocess.run,
+        capture_output=True,
+        check=False,
+    )
+    if skipped:
+        assert len(mock_lxc.exec.mock_calls) == 1
+    else:
+        assert len(mock_lxc.exec.mock_calls) == 2
+        assert mock_lxc.exec.mock_calls[1].kwargs["input"] == b"foo"
+
+
+@pytest.mark.parametrize(
+    "stdout,skipped",
+    [
+        (f"{_FOO_DIGEST}  /tmp/dst.txt\n".encode(), True),
+        (f"{'0' * 64}  /tmp/dst.txt\n".encode(), False),
+    ],
+)
+def test_push_file_skip_if_unchanged(mock_lxc, instance, tmp_path, stdout, skipped):
+    mock_lxc.exec.return_value = subprocess.CompletedProcess([], 0, stdout=stdout)
+    source = tmp_path / "src.txt"
+    source.write_bytes(b"foo")
+
+    instance.push_file(
+        source=source,
+        destination=pathlib.Path("/tmp/dst.txt"),
+        skip_if_unchanged=True,
+    )
+
+    assert mock_lxc.exec.mock_calls[0].kwargs["command"] == [
+        "sha256sum",
+        "--",
+        "/tmp/dst.txt",
+    ]
+    assert (mock_lxc.file_push.mock_calls == []) == skipped
+
+
+def test_checkpoint(mock_lxc, instance):
+    instance.checkpoint()
+
+    assert mock_lxc.mock_calls == [
+        mock.call.list(
+            instance_name=instance.instance_name,
+            columns=["name", "status"],
+            project=instance.project,
+            remote=instance.remote,
+        ),
+        mock.call.exec(
+            instance_name=instance.instance_name,
+            command=["sync"],
+            project=instance.project,
+            remote=instance.remote,
+            runner=subprocess.run,
+            cwd=None,
+            capture_output=True,
+            check=True,
+        ),
+        mock.call.snapshot(
+            instance_name=instance.instance_name,
+            snapshot_name="craft-providers-checkpoint",
+            reuse=True,
+            project=instance.project,
+            remote=instance.remote,
+        ),
+    ]
+
+
+def test_checkpoint_stopped(mock_lxc):
+    instance = LXDInstance(name=_STOPPED_INSTANCE["name"], lxc=mock_lxc)
+
+    instance.checkpoint("test-checkpoint")
+
+    assert mock_lxc.exec.mock_calls == []
+    assert mock_lxc.snapshot.mock_calls == [
+        mock.call(
+            instance_name=instance.instance_name,
+            snapshot_name="test-checkpoint",
+            reuse=True,
+            project=instance.project,
+            remote=instance.remote,
+        )
+    ]
+
+
+def test_checkpoint_sync_error(mock_lxc, instance):
+    mock_lxc.exec.side_effect = subprocess.CalledProcessError(1, ["sync"])
+
+    with pytest.raises(LXDError) as exc_info:
+        instance.checkpoint()
+
+    assert exc_info.value.brief == (
+        f"Failed to flush writes in instance {instance.instance_name!r}."
+    )
+    assert mock_lxc.snapshot.mock_calls == []
+
+
+def test_delete_checkpoint(mock_lxc, instance):
+    instance.delete_checkpoint("test-checkpoint")
+
+    assert mock_lxc.mock_calls == [
+        mock.call.snapshot_delete(
+            instance_name=instance.instance_name,
+            snapshot_name="test-checkpoint",
+            project=instance.project,
+            remote=instance.remote,
+        )
+    ]
+
+
 def test_delete(mock_lxc, instance):
     instance.delete()
 
@@ -366,10 +511,91 @@ def test_execute_run_with_env_unset(mock_lxc, instance):
     ]
 
 
+@pytest.fixture
+def mock_session_shell(mock_lxc):
+    """Serve exec sessions from a shell on the host."""
+    mock_lxc.exec.side_effect = lambda command, runner, **kwargs: (
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            command, stdin=kwargs["stdin"], stdout=kwargs["stdout"]
+        )
+        if runner is subprocess.Popen
+        else mock.DEFAULT
+    )
+
+
+def test_exec_session(mock_lxc, mock_session_shell, instance):
+    with instance.exec_session():
+        proc = instance.execute_run(
+            ["echo", "test"], env={"foo": "bar"}, capture_output=True
+        )
+        instance.execute_run(["echo", "test"], capture_output=True, check=True)
+
+    assert proc.returncode == 0
+    assert proc.stdout == b"test\n"
+    assert mock_lxc.mock_calls == [
+        mock.call.exec(
+            instance_name=instance.instance_name,
+            command=["sh"],
+            project=instance.project,
+            remote=instance.remote,
+            runner=subprocess.Popen,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    ]
+
+
+def test_exec_session_unsupported_command(mock_lxc, mock_session_shell, instance):
+    with instance.exec_session():
+        instance.execute_run(["test-command"], input=b"foo")
+
+    assert mock_lxc.mock_calls[1] == mock.call.exec(
+        instance_name=instance.instance_name,
+        command=["test-command"],
+        cwd=None,
+        project=instance.project,
+        remote=instance.remote,
+        runner=subprocess.run,
+        input=b"foo",
+    )
+
+
+def test_exec_session_nested(mock_lxc, mock_session_shell, instance):
+    with instance.exec_session():
+        with instance.exec_session():
+            instance.execute_run(["true"], capture_output=True)
+        instance.execute_run(["true"], capture_output=True)
+
+    assert len(mock_lxc.mock_calls) == 1
+
+
+def test_exec_session_closed(mock_lxc, mock_session_shell, instance):
+    with instance.exec_session():
+        pass
+
+    instance.execute_run(["test-command"], capture_output=True)
+
+    assert mock_lxc.mock_calls[1] == mock.call.exec(
+        instance_name=instance.instance_name,
+        command=["test-command"],
+        cwd=None,
+        project=instance.project,
+        remote=instance.remote,
+        runner=subprocess.run,
+        capture_output=True,
+    )
+
+
 def test_exists(mock_lxc, instance):
     assert instance.exists() is True
     assert mock_lxc.mock_calls == [
-        mock.call.list(project=instance.project, remote=instance.remote)
+        mock.call.list(
+            instance_name=instance.instance_name,
+            columns=["name", "status"],
+            project=instance.project,
+            remote=instance.remote,
+        )
     ]
 
 
@@ -378,10 +604,100 @@ def test_exists_false(mock_lxc):
 
     assert instance.exists() is False
     assert mock_lxc.mock_calls == [
-        mock.call.list(project=instance.project, remote=instance.remote)
+        mock.call.list(
+            instance_name=instance.instance_name,
+            columns=["name", "status"],
+            project=instance.project,
+            remote=instance.remote,
+        )
     ]
 
 
+def test_state_not_cached_by_default(mock_lxc, instance):
+    instance.exists()
+    instance.is_running()
+
+    assert len(mock_lxc.list.mock_calls) == 2
+
+
+def test_state_cached(mock_lxc):
+    instance = LXDInstance(
+        name=_TEST_INSTANCE["name"], lxc=mock_lxc, state_cache_ttl=60
+    )
+
+    assert instance.exists() is True
+    assert instance.is_running() is True
+    assert len(mock_lxc.list.mock_calls) == 1
+
+
+def test_state_cache_expires(mock_lxc, mocker):
+    mock_time = mocker.patch("time.monotonic", return_value=100.0)
+    instance = LXDInstance(name=_TEST_INSTANCE["name"], lxc=mock_lxc, state_cache_ttl=5)
+
+    instance.exists()
+    mock_time.return_value = 104.9
+    instance.exists()
+    mock_time.return_value = 105.0
+    instance.exists()
+
+    assert len(mock_lxc.list.mock_calls) == 2
+
+
+def test_state_cache_missing_instance(mock_lxc):
+    instance = LXDInstance(name="does-not-exist", lxc=mock_lxc, state_cache_ttl=60)
+
+    assert instance.exists() is False
+    assert instance.exists() is False
+    assert len(mock_lxc.list.mock_calls) == 1
+
+
+@pytest.mark.parametrize(
+    "method,kwargs",
+    [
+        ("start", {}),
+        ("stop", {}),
+        ("delete", {}),
+        ("launch", {"image": "test-image", "image_remote": "test-remote"}),
+    ],
+)
+def test_state_cache_invalidated_by_lifecycle(mock_lxc, method, kwargs):
+    instance = LXDInstance(
+        name=_TEST_INSTANCE["name"], lxc=mock_lxc, state_cache_ttl=60
+    )
+    instance.exists()
+
+    getattr(instance, method)(**kwargs)
+    instance.exists()
+
+    assert len(mock_lxc.list.mock_calls) == 2
+
+
+def test_state_cache_invalidated_on_error(mock_lxc):
+    mock_lxc.start.side_effect = LXDError(brief="test error")
+    instance = LXDInstance(
+        name=_TEST_INSTANCE["name"], lxc=mock_lxc, state_cache_ttl=60
+    )
+    instance.exists()
+
+    with pytest.raises(LXDError):
+        instance.start()
+    instance.exists()
+
+    assert len(mock_lxc.list.mock_calls) == 2
+
+
+def test_invalidate_state_cache(mock_lxc):
+    instance = LXDInstance(
+        name=_TEST_INSTANCE["name"], lxc=mock_lxc, state_cache_ttl=60
+    )
+    instance.exists()
+
+    instance.invalidate_state_cache()
+    instance.exists()
+
+    assert len(mock_lxc.list.mock_calls) == 2
+
+
 def test_get_disk_devices_path_parse_error(mock_lxc, instance):
     mock_lxc.config_device_show.return_value = {
         "mount_missing_path": {
@@ -466,7 +782,12 @@ def test_is_running_false(mock_lxc):
     assert instance.is_running() is False
 
     assert mock_lxc.mock_calls == [
-        mock.call.list(project=instance.project, remote=instance.remote)
+        mock.call.list(
+            instance_name=instance.instance_name,
+            columns=["name", "status"],
+            project=instance.project,
+            remote=instance.remote,
+        )
     ]
 
 
@@ -474,7 +795,12 @@ def test_is_running_true(mock_lxc, instance):
     assert instance.is_running() is True
 
     assert mock_lxc.mock_calls == [
-        mock.call.list(project=instance.project, remote=instance.remote)
+        mock.call.list(
+            instance_name=instance.instance_name,
+            columns=["name", "status"],
+            project=instance.project,
+            remote=instance.remote,
+        )
     ]
 
 
@@ -496,7 +822,7 @@ def test_launch(mock_lxc, instance):
     )
 
     assert mock_lxc.mock_calls == [
-        mock.call.info(project=instance.project, remote=instance.remote),
+        mock.call.server_info(project=instance.project, remote=instance.remote),
         mock.call.launch(
             config_keys={},
             ephemeral=False,
@@ -520,7 +846,7 @@ def test_launch_all_opts(mock_lxc, instance):
 
     uid = str(os.getuid())
     assert mock_lxc.mock_calls == [
-        mock.call.info(project=instance.project, remote=instance.remote),
+        mock.call.server_info(project=instance.project, remote=instance.remote),
         mock.call.launch(
             config_keys={"raw.idmap": f"both {uid} 0"},
             ephemeral=True,
@@ -534,7 +860,7 @@ def test_launch_all_opts(mock_lxc, instance):
 
 
 def test_launch_with_mknod(mock_lxc, instance):
-    mock_lxc.info.return_value = {
+    mock_lxc.server_info.return_value = {
         "environment": {"kernel_features": {"seccomp_listener": "true"}}
     }
 
@@ -544,7 +870,7 @@ def test_launch_with_mknod(mock_lxc, instance):
     )
 
     assert mock_lxc.mock_calls == [
-        mock.call.info(project=instance.project, remote=instance.remote),
+        mock.call.server_info(project=instance.project, remote=instance.remote),
         mock.call.launch(
             config_keys={
                 "security.syscalls.intercept.mknod": "true",
@@ -617,8 +943,6 @@ def test_mount_already_mounted(mock_lxc, instance, project_path):
 
 
 def test_pull_file(mock_lxc, instance, tmp_path):
-    mock_lxc.exec.return_value = mock.Mock(returncode=0)
-
     source = pathlib.Path("/tmp/src.txt")
     destination = tmp_path / "dst.txt"
 
@@ -628,15 +952,6 @@ def test_pull_file(mock_lxc, instance, tmp_path):
     )
 
     assert mock_lxc.mock_calls == [
-        mock.call.exec(
-            instance_name=instance.instance_name,
-            command=["test", "-f", "/tmp/src.txt"],
-            cwd=None,
-            project=instance.project,
-            remote=instance.remote,
-            runner=subprocess.run,
-            check=False,
-        ),
         mock.call.file_pull(
             instance_name=instance.instance_name,
             source=source,
@@ -647,8 +962,16 @@ def test_pull_file(mock_lxc, instance, tmp_path):
     ]
 
 
-def test_pull_file_no_source(mock_lxc, instance, tmp_path):
-    mock_lxc.exec.return_value = mock.Mock(returncode=1)
+@pytest.mark.parametrize(
+    "details",
+    [
+        "* Command standard error output: b'Error: not found\\n'",
+        "* Response code: 404\n* Error: Not Found",
+    ],
+)
+def test_pull_file_no_source(mock_lxc, instance, tmp_path, details):
+    error = LXDError(brief="Failed to pull file.", details=details)
+    mock_lxc.file_pull.side_effect = error
 
     source = pathlib.Path("/tmp/src.txt")
     destination = tmp_path / "dst.txt"
@@ -659,23 +982,27 @@ def test_pull_file_no_source(mock_lxc, instance, tmp_path):
             destination=destination,
         )
 
-    assert mock_lxc.mock_calls == [
-        mock.call.exec(
-            instance_name=instance.instance_name,
-            command=["test", "-f", "/tmp/src.txt"],
-            cwd=None,
-            project=instance.project,
-            remote=instance.remote,
-            runner=subprocess.run,
-            check=False,
-        ),
-    ]
     assert str(exc_info.value) == "File not found: '/tmp/src.txt'"
+    assert exc_info.value.__cause__ is error
 
 
-def test_pull_file_no_parent_directory(mock_lxc, instance, tmp_path):
-    mock_lxc.exec.return_value = mock.Mock(returncode=0)
+def test_pull_file_error(mock_lxc, instance, tmp_path):
+    error = LXDError(
+        brief="Failed to pull file.",
+        details="* Command standard error output: b'Error: permission denied\\n'",
+    )
+    mock_lxc.file_pull.side_effect = error
+
+    with pytest.raises(LXDError) as exc_info:
+        instance.pull_file(
+            source=pathlib.Path("/tmp/src.txt"),
+            destination=tmp_path / "dst.txt",
+        )
+
+    assert exc_info.value is error
+
 
+def test_pull_file_no_parent_directory(mock_lxc, instance, tmp_path):
     source = pathlib.Path("/tmp/src.txt")
     destination = tmp_path / "not-created" / "dst.txt"
 
@@ -685,23 +1012,11 @@ def test_pull_file_no_parent_directory(mock_lxc, instance, tmp_path):
             destination=destination,
         )
 
-    assert mock_lxc.mock_calls == [
-        mock.call.exec(
-            instance_name=instance.instance_name,
-            command=["test", "-f", "/tmp/src.txt"],
-            cwd=None,
-            project=instance.project,
-            remote=instance.remote,
-            runner=subprocess.run,
-            check=False,
-        ),
-    ]
+    assert mock_lxc.mock_calls == []
     assert str(exc_info.value) == f"Directory not found: {str(destination.parent)!r}"
 
 
 def test_push_file(mock_lxc, instance, tmp_path):
-    mock_lxc.exec.return_value = mock.Mock(returncode=0)
-
     source = tmp_path / "src.txt"
     source.write_text("this is a test")
     destination = pathlib.Path("/tmp/dst.txt")
@@ -712,15 +1027,6 @@ def test_push_file(mock_lxc, instance, tmp_path):
     )
 
     assert mock_lxc.mock_calls == [
-        mock.call.exec(
-            instance_name=instance.instance_name,
-            command=["test", "-d", "/tmp"],
-            cwd=None,
-            project=instance.project,
-            remote=instance.remote,
-            runner=subprocess.run,
-            check=False,
-        ),
         mock.call.file_push(
             instance_name=instance.instance_name,
             source=source,
@@ -748,7 +1054,14 @@ def test_push_file_no_source(mock_lxc, instance, tmp_path):
 
 
 def test_push_file_no_parent_directory(mock_lxc, instance, tmp_path):
-    mock_lxc.exec.return_value = mock.Mock(returncode=1)
+    error = LXDError(
+        brief="Failed to push file.",
+        details=(
+            "* Command standard error output: b'Error: open /tmp/dst.txt:"
+            " no such file or directory\\n'"
+        ),
+    )
+    mock_lxc.file_push.side_effect = error
 
     source = tmp_path / "src.txt"
     source.write_text("this is a test")
@@ -760,18 +1073,86 @@ def test_push_file_no_parent_directory(mock_lxc, instance, tmp_path):
             destination=destination,
         )
 
+    assert str(exc_info.value) == "Directory not found: '/tmp'"
+    assert exc_info.value.__cause__ is error
+
+
+def test_push_file_error(mock_lxc, instance, tmp_path):
+    error = LXDError(brief="Failed to push file.", details="* Error: disk full")
+    mock_lxc.file_push.side_effect = error
+
+    source = tmp_path / "src.txt"
+    source.write_text("this is a test")
+
+    with pytest.raises(LXDError) as exc_info:
+        instance.push_file(
+            source=source,
+            destination=pathlib.Path("/tmp/dst.txt"),
+        )
+
+    assert exc_info.value is error
+
+
+def test_reset(mock_lxc, instance):
+    instance.reset()
+
     assert mock_lxc.mock_calls == [
-        mock.call.exec(
+        mock.call.restore(
             instance_name=instance.instance_name,
-            command=["test", "-d", "/tmp"],
-            cwd=None,
+            snapshot_name="craft-providers-checkpoint",
+            project=instance.project,
+            remote=instance.remote,
+        ),
+        mock.call.list(
+            instance_name=instance.instance_name,
+            columns=["name", "status"],
             project=instance.project,
             remote=instance.remote,
-            runner=subprocess.run,
-            check=False,
         ),
     ]
-    assert str(exc_info.value) == "Directory not found: '/tmp'"
+
+
+def test_reset_stopped(mock_lxc):
+    instance = LXDInstance(name=_STOPPED_INSTANCE["name"], lxc=mock_lxc)
+
+    instance.reset("test-checkpoint")
+
+    assert mock_lxc.restore.mock_calls == [
+        mock.call(
+            instance_name=instance.instance_name,
+            snapshot_name="test-checkpoint",
+            project=instance.project,
+            remote=instance.remote,
+        )
+    ]
+    assert mock_lxc.start.mock_calls == [
+        mock.call(
+            instance_name=instance.instance_name,
+            project=instance.project,
+            remote=instance.remote,
+        )
+    ]
+
+
+def test_reset_warmup(mock_lxc, instance):
+    """The instance is waited for after restoring, given its base configuration."""
+    base_configuration = mock.Mock(spec=Base)
+
+    instance.reset(base_configuration=base_configuration)
+
+    assert mock_lxc.restore.call_count == 1
+    assert base_configuration.mock_calls == [mock.call.warmup(executor=instance)]
+
+
+def test_reset_error(mock_lxc, instance):
+    """The cached state is discarded even if restoring fails."""
+    mock_lxc.restore.side_effect = LXDError(brief="Failed to restore.")
+    instance.is_running()
+
+    with pytest.raises(LXDError):
+        instance.reset()
+
+    assert instance._cached_state is None
 
 
 def test_start(mock_lxc, instance):
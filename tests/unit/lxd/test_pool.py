@@ -0,0 +1,213 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+import itertools
+from unittest import mock
+
+import pytest
+
+from craft_providers import Base, lxd
+from craft_providers.bases import BaseConfigurationError
+from craft_providers.lxd import LXDError
+
+
+@pytest.fixture
+def mock_base_configuration():
+    yield mock.Mock(spec=Base)
+
+
+@pytest.fixture
+def mock_lxc():
+    yield mock.Mock(spec=lxd.LXC)
+
+
+@pytest.fixture
+def mock_launch():
+    counter = itertools.count()
+
+    def launch(name, **_kwargs):
+        instance = mock.Mock(spec=lxd.LXDInstance)
+        instance.name = name
+        instance.instance_name = f"instance-{next(counter)}"
+        instance.is_running.return_value = True
+        return instance
+
+    with mock.patch(
+        "craft_providers.lxd.launcher.launch", side_effect=launch
+    ) as mock_launch:
+        yield mock_launch
+
+
+@pytest.fixture
+def pool(mock_base_configuration, mock_lxc, mock_launch):
+    pool = lxd.InstancePool(
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        size=2,
+        name_prefix="test-pool",
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+    yield pool
+    pool.close()
+
+
+def test_fill(pool, mock_base_configuration, mock_lxc, mock_launch):
+    pool.fill(wait=True)
+
+    assert pool.idle_count == 2
+    assert mock_launch.call_count == 2
+    assert mock_launch.mock_calls[0] == mock.call(
+        mock.ANY,
+        base_configuration=mock_base_configuration,
+        image_name="image-name",
+        image_remote="image-remote",
+        map_user_uid=False,
+        uid=None,
+        use_snapshots=False,
+        use_golden_instances=False,
+        project="test-project",
+        remote="test-remote",
+        lxc=mock_lxc,
+    )
+    assert mock_launch.mock_calls[0].args[0].startswith("test-pool-")
+    for instance in pool._idle:
+        instance.checkpoint.assert_called_once_with("craft-providers-pool")
+
+
+def test_acquire_idle(pool, mock_launch):
+    pool.fill(wait=True)
+
+    instance = pool.acquire()
+    pool.fill(wait=True)
+
+    assert instance.instance_name in ("instance-0", "instance-1")
+    assert pool.idle_count == 2
+    assert mock_launch.call_count == 3
+
+
+def test_acquire_empty(pool, mock_launch):
+    instance = pool.acquire()
+
+    assert instance.instance_name.startswith("instance-")
+    pool.fill(wait=True)
+    assert mock_launch.call_count == 3
+
+
+def test_acquire_launch_error(pool, mock_launch):
+    mock_launch.side_effect = LXDError(brief="boom")
+
+    with pytest.raises(LXDError) as exc_info:
+        pool.acquire()
+
+    assert exc_info.value == LXDError(brief="boom")
+
+
+def test_acquire_closed(pool):
+    pool.close()
+
+    with pytest.raises(LXDError) as exc_info:
+        pool.acquire()
+
+    assert exc_info.value == LXDError(brief="Instance pool is closed.")
+
+
+def test_release_reset(pool, mock_base_configuration):
+    pool.fill(wait=True)
+    instance = pool.acquire()
+    pool._idle.pop()  # simulate the replacement not having launched yet
+
+    pool.release(instance)
+
+    instance.reset.assert_called_once_with(
+        "craft-providers-pool", base_configuration=mock_base_configuration
+    )
+    assert instance.delete.mock_calls == []
+    assert instance in pool._idle
+
+
+def test_release_full_pool(pool):
+    pool.fill(wait=True)
+    instance = pool.acquire()
+    pool.fill(wait=True)
+
+    pool.release(instance)
+
+    assert instance.reset.mock_calls == []
+    instance.delete.assert_called_once_with()
+
+
+def test_release_without_reset(pool):
+    instance = pool.acquire()
+
+    pool.release(instance, reset=False)
+
+    assert instance.reset.mock_calls == []
+    instance.delete.assert_called_once_with()
+
+
+def test_release_reset_error(pool):
+    instance = pool.acquire()
+    pool.fill(wait=True)
+    pool._idle.pop()
+    instance.reset.side_effect = LXDError(brief="boom")
+
+    pool.release(instance)
+
+    instance.delete.assert_called_once_with()
+    assert instance not in pool._idle
+
+
+def test_release_warmup_error(pool):
+    instance = pool.acquire()
+    pool.fill(wait=True)
+    pool._idle.pop()
+    instance.reset.side_effect = BaseConfigurationError(brief="boom")
+
+    pool.release(instance)
+
+    instance.delete.assert_called_once_with()
+    assert instance not in pool._idle
+
+
+def test_release_unknown(pool):
+    instance = mock.Mock(spec=lxd.LXDInstance)
+    instance.instance_name = "other-instance"
+
+    with pytest.raises(LXDError) as exc_info:
+        pool.release(instance)
+
+    assert exc_info.value == LXDError(
+        brief="Instance 'other-instance' was not acquired from pool."
+    )
+
+
+def test_close(pool):
+    pool.fill(wait=True)
+    idle = list(pool._idle)
+    instance = pool.acquire()
+
+    pool.close()
+    pool.release(instance)
+
+    for idle_instance in idle:
+        if idle_instance is not instance:
+            idle_instance.delete.assert_called_once_with()
+    instance.delete.assert_called_once_with()
+    assert pool.idle_count == 0
@@ -58,7 +58,9 @@ def test_purge(mock_lxc):
     mock_lxc.list_names.return_value = ["test-instance1", "test-instance2"]
     mock_lxc.image_list.return_value = [{"fingerprint": "i1"}, {"fingerprint": "i2"}]
 
-    project.purge(lxc=mock_lxc, project="test-project", remote="test-remote")
+    project.purge(
+        lxc=mock_lxc, project="test-project", remote="test-remote", max_workers=1
+    )
 
     assert mock_lxc.mock_calls == [
         mock.call.project_list(remote="test-remote"),
@@ -75,7 +77,7 @@ def test_purge(mock_lxc):
             remote="test-remote",
             force=True,
         ),
-        mock.call.image_list(project="test-project"),
+        mock.call.image_list(project="test-project", remote="test-remote"),
         mock.call.image_delete(
             image="i1", project="test-project", remote="test-remote"
         ),
@@ -86,6 +88,52 @@ def test_purge(mock_lxc):
     ]
 
 
+def test_purge_concurrently(mock_lxc):
+    mock_lxc.project_list.return_value = ["test-project", "default"]
+    mock_lxc.list_names.return_value = [f"test-instance{i}" for i in range(10)]
+    mock_lxc.image_list.return_value = [{"fingerprint": "i1"}, {"fingerprint": "i2"}]
+    progress = mock.Mock()
+
+    project.purge(
+        lxc=mock_lxc,
+        project="test-project",
+        remote="test-remote",
+        max_workers=4,
+        progress=progress,
+    )
+
+    assert sorted(c.kwargs["instance_name"] for c in mock_lxc.delete.mock_calls) == (
+        sorted(mock_lxc.list_names.return_value)
+    )
+    assert sorted(c.kwargs["image"] for c in mock_lxc.image_delete.mock_calls) == [
+        "i1",
+        "i2",
+    ]
+    assert [c.args[0] for c in progress.mock_calls] == ["instance"] * 10 + ["image"] * 2
+    assert [c.args[2:] for c in progress.mock_calls] == [
+        (i, 10) for i in range(1, 11)
+    ] + [(1, 2), (2, 2)]
+    mock_lxc.project_delete.assert_called_once_with(
+        project="test-project", remote="test-remote"
+    )
+
+
+def test_purge_error(mock_lxc):
+    mock_lxc.project_list.return_value = ["test-project", "default"]
+    mock_lxc.list_names.return_value = ["test-instance1", "test-instance2"]
+    mock_lxc.delete.side_effect = [lxd.LXDError(brief="Failed to delete."), None]
+
+    with pytest.raises(lxd.LXDError) as exc_info:
+        project.purge(
+            lxc=mock_lxc, project="test-project", remote="test-remote", max_workers=1
+        )
+
+    assert exc_info.value == lxd.LXDError(brief="Failed to delete.")
+    assert len(mock_lxc.delete.mock_calls) == 2
+    assert mock_lxc.image_list.mock_calls == []
+    assert mock_lxc.project_delete.mock_calls == []
+
+
 def test_purge_no_project(mock_lxc):
     mock_lxc.project_list.return_value = ["default"]
     mock_lxc.list.return_value = ["test-instance1", "test-instance2"]
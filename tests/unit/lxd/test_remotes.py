@@ -55,3 +55,52 @@ def test_configure_buildd_image_remote_already_exists(mock_lxc):
     assert mock_lxc.mock_calls == [
         mock.call.remote_list(),
     ]
+
+
+def test_get_prefetch_alias():
+    assert (
+        lxd.remotes.get_prefetch_alias(image="core22", image_remote="test-remote")
+        == "prefetch-test-remote-core22"
+    )
+
+
+def test_prefetch_images(mock_lxc):
+    mock_lxc.has_image.side_effect = lambda image_name, **kwargs: (
+        image_name == "prefetch-test-remote-core20"
+    )
+
+    futures = lxd.remotes.prefetch_images(
+        [("test-remote", "core20"), ("test-remote", "core22")],
+        max_workers=2,
+        project="test-project",
+        remote="test-remote-2",
+        lxc=mock_lxc,
+    )
+
+    assert list(futures) == [("test-remote", "core20"), ("test-remote", "core22")]
+    assert [future.result(timeout=10) for future in futures.values()] == [None, None]
+    assert mock_lxc.image_copy.mock_calls == [
+        mock.call(
+            image="core22",
+            image_remote="test-remote",
+            alias="prefetch-test-remote-core22",
+            auto_update=True,
+            project="test-project",
+            remote="test-remote-2",
+        )
+    ]
+
+
+def test_prefetch_images_error(mock_lxc):
+    mock_lxc.has_image.return_value = False
+    mock_lxc.image_copy.side_effect = lxd.LXDError(brief="Failed to copy image.")
+
+    futures = lxd.remotes.prefetch_images(
+        [("test-remote", "core22")], auto_update=False, lxc=mock_lxc
+    )
+
+    with pytest.raises(lxd.LXDError) as exc_info:
+        futures[("test-remote", "core22")].result(timeout=10)
+
+    assert exc_info.value == lxd.LXDError(brief="Failed to copy image.")
+    assert mock_lxc.image_copy.mock_calls[0].kwargs["auto_update"] is False
@@ -0,0 +1,198 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+import datetime
+from unittest import mock
+
+import pytest
+
+from craft_providers import lxd
+from craft_providers.lxd import LXDError, snapshot_images
+from craft_providers.lxd.snapshot_images import SnapshotImage
+
+UTC = datetime.timezone.utc
+
+
+def _image(fingerprint, alias, size, last_used_at, properties=None):
+    return {
+        "fingerprint": fingerprint,
+        "aliases": [{"name": alias, "description": ""}] if alias else [],
+        "size": size,
+        "created_at": "2022-01-01T00:00:00Z",
+        "last_used_at": last_used_at,
+        "properties": properties or {},
+    }
+
+
+@pytest.fixture
+def mock_lxc():
+    lxc = mock.Mock(spec=lxd.LXC)
+    lxc.image_list.return_value = [
+        _image("f1", "snapshot-ubuntu-20.04-v1", 100, "2022-01-02T00:00:00Z"),
+        _image("f2", "snapshot-ubuntu-20.04-v2", 200, "2022-01-04T00:00:00.5Z"),
+        _image(
+            "f3",
+            "snapshot-ubuntu-22.04-v2",
+            300,
+            "0001-01-01T00:00:00Z",
+            {"craft_providers.last_used": "2022-01-03T00:00:00+00:00"},
+        ),
+        _image("f4", "snapshot-ubuntu-18.04-v1", 400, "0001-01-01T00:00:00Z"),
+        _image("f5", None, 500, "2022-01-05T00:00:00Z"),
+        _image("f6", "ubuntu-22.04", 600, "2022-01-05T00:00:00Z"),
+    ]
+    lxc.list.return_value = [
+        {"name": "i1", "status": "Stopped", "config": {"volatile.base_image": "f2"}},
+        {"name": "i2", "status": "Running", "config": {}},
+    ]
+    yield lxc
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (
+            "2022-05-10T12:34:56Z",
+            datetime.datetime(2022, 5, 10, 12, 34, 56, tzinfo=UTC),
+        ),
+        (
+            "2022-05-10T12:34:56.123456789Z",
+            datetime.datetime(2022, 5, 10, 12, 34, 56, 123456, tzinfo=UTC),
+        ),
+        (
+            "2022-05-10T12:34:56.5+00:00",
+            datetime.datetime(2022, 5, 10, 12, 34, 56, 500000, tzinfo=UTC),
+        ),
+        ("0001-01-01T00:00:00Z", None),
+        ("", None),
+        (None, None),
+        ("garbage", None),
+    ],
+)
+def test_parse_timestamp(value, expected):
+    assert snapshot_images._parse_timestamp(value) == expected
+
+
+def test_list_snapshot_images(mock_lxc):
+    images = lxd.list_snapshot_images(
+        lxc=mock_lxc, project="test-project", remote="test-remote"
+    )
+
+    assert images == [
+        SnapshotImage(
+            alias="snapshot-ubuntu-20.04-v2",
+            fingerprint="f2",
+            size=200,
+            created_at=datetime.datetime(2022, 1, 1, tzinfo=UTC),
+            last_used_at=datetime.datetime(2022, 1, 4, 0, 0, 0, 500000, tzinfo=UTC),
+        ),
+        SnapshotImage(
+            alias="snapshot-ubuntu-22.04-v2",
+            fingerprint="f3",
+            size=300,
+            created_at=datetime.datetime(2022, 1, 1, tzinfo=UTC),
+            last_used_at=datetime.datetime(2022, 1, 3, tzinfo=UTC),
+        ),
+        SnapshotImage(
+            alias="snapshot-ubuntu-20.04-v1",
+            fingerprint="f1",
+            size=100,
+            created_at=datetime.datetime(2022, 1, 1, tzinfo=UTC),
+            last_used_at=datetime.datetime(2022, 1, 2, tzinfo=UTC),
+        ),
+        SnapshotImage(
+            alias="snapshot-ubuntu-18.04-v1",
+            fingerprint="f4",
+            size=400,
+            created_at=datetime.datetime(2022, 1, 1, tzinfo=UTC),
+            last_used_at=None,
+        ),
+    ]
+    assert mock_lxc.mock_calls == [
+        mock.call.image_list(project="test-project", remote="test-remote")
+    ]
+
+
+def test_record_snapshot_image_use(mock_lxc):
+    snapshot_images.record_snapshot_image_use(
+        lxc=mock_lxc,
+        image_name="snapshot-test",
+        project="test-project",
+        remote="test-remote",
+    )
+
+    assert mock_lxc.mock_calls == [
+        mock.call.image_set_property(
+            image="snapshot-test",
+            key="craft_providers.last_used",
+            value=mock.ANY,
+            project="test-project",
+            remote="test-remote",
+        )
+    ]
+    value = mock_lxc.image_set_property.mock_calls[0].kwargs["value"]
+    assert snapshot_images._parse_timestamp(value) is not None
+
+
+def test_record_snapshot_image_use_error(mock_lxc, logs):
+    mock_lxc.image_set_property.side_effect = LXDError(brief="unsupported")
+
+    snapshot_images.record_snapshot_image_use(lxc=mock_lxc, image_name="snapshot-test")
+
+    assert "Failed to record use of image 'snapshot-test'" in logs.debug
+
+
+@pytest.mark.parametrize(
+    "limits,evicted",
+    [
+        ({}, []),
+        ({"max_count": 2}, ["f1", "f4"]),
+        ({"max_count": 0}, ["f2", "f3", "f1", "f4"]),
+        ({"max_bytes": 550}, ["f1", "f4"]),
+        ({"max_bytes": 450}, ["f3", "f1", "f4"]),
+        ({"max_count": 3, "max_bytes": 650}, ["f4"]),
+    ],
+)
+def test_collect_snapshot_images(mock_lxc, limits, evicted):
+    images = lxd.collect_snapshot_images(
+        lxc=mock_lxc, project="test-project", remote="test-remote", **limits
+    )
+
+    assert [image.fingerprint for image in images] == evicted
+    assert mock_lxc.image_delete.mock_calls == [
+        mock.call(image=fingerprint, project="test-project", remote="test-remote")
+        for fingerprint in evicted
+    ]
+
+
+def test_collect_snapshot_images_keeps_running(mock_lxc):
+    mock_lxc.list.return_value = [
+        {"name": "i1", "status": "Running", "config": {"volatile.base_image": "f2"}},
+        {"name": "i2", "status": "Running", "config": {"volatile.base_image": "f4"}},
+    ]
+
+    images = lxd.collect_snapshot_images(lxc=mock_lxc, max_count=0)
+
+    assert [image.fingerprint for image in images] == ["f3", "f1"]
+    assert mock_lxc.list.mock_calls == [mock.call(project="default", remote="local")]
+
+
+def test_collect_snapshot_images_dry_run(mock_lxc):
+    images = lxd.collect_snapshot_images(lxc=mock_lxc, max_count=1, dry_run=True)
+
+    assert [image.fingerprint for image in images] == ["f3", "f1", "f4"]
+    assert mock_lxc.image_delete.mock_calls == []
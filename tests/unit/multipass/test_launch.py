@@ -19,7 +19,7 @@ from unittest import mock
 
 import pytest
 
-from craft_providers import Base, bases, multipass
+from craft_providers import Base, LaunchSpec, bases, multipass
 
 
 @pytest.fixture
@@ -125,3 +125,36 @@ def test_launch_with_existing_instance_incompatible_without_auto_clean(
     assert mock_base_configuration.mock_calls == [
         mock.call.warmup(executor=mock_multipass_instance)
     ]
+
+
+def test_launch_many(mock_base_configuration):
+    specs = [
+        LaunchSpec(
+            name=f"test-instance-{i}",
+            base_configuration=mock_base_configuration,
+            image_name="snapcraft:core22",
+        )
+        for i in range(2)
+    ]
+
+    with mock.patch("craft_providers.multipass._launch.launch") as mock_launch:
+        mock_launch.side_effect = [
+            mock_launch.return_value,
+            multipass.MultipassError(brief="Failed to launch."),
+        ]
+        results = multipass.launch_many(specs, max_workers=1, cpus=4)
+
+    assert results[0].instance is mock_launch.return_value
+    assert results[1].error == multipass.MultipassError(brief="Failed to launch.")
+    assert mock_launch.mock_calls == [
+        mock.call(
+            f"test-instance-{i}",
+            base_configuration=mock_base_configuration,
+            image_name="snapcraft:core22",
+            cpus=4,
+            disk_gb=64,
+            mem_gb=2,
+            auto_clean=False,
+        )
+        for i in range(2)
+    ]
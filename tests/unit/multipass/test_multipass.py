@@ -22,6 +22,7 @@ from unittest import mock
 
 import pytest
 
+from craft_providers import instrumentation
 from craft_providers.errors import details_from_command_error
 from craft_providers.multipass import Multipass
 from craft_providers.multipass.errors import MultipassError
@@ -104,6 +105,31 @@ def mock_details_from_command_error():
         yield mock_details
 
 
+def test_instrumentation(fake_process):
+    timings = []
+    fake_process.register_subprocess(["multipass", "delete", "test-instance"])
+    fake_process.register_subprocess(
+        ["multipass", "exec", "test-instance", "--", "echo", "hi"], stdout="hi\n"
+    )
+
+    instrumentation.add_hook(timings.append)
+    try:
+        Multipass().delete(instance_name="test-instance", purge=False)
+        Multipass().exec(
+            command=["echo", "hi"], instance_name="test-instance", capture_output=True
+        )
+    finally:
+        instrumentation.remove_hook(timings.append)
+
+    assert [
+        (t.provider, t.subcommand, t.project, t.remote, t.returncode, t.output_bytes)
+        for t in timings
+    ] == [
+        ("multipass", "delete", None, None, 0, 0),
+        ("multipass", "exec", None, None, 0, 3),
+    ]
+
+
 def test_delete(fake_process):
     fake_process.register_subprocess(["multipass", "delete", "test-instance"])
 
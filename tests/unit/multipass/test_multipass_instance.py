@@ -15,6 +15,7 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 #
 import copy
+import hashlib
 import io
 import pathlib
 import subprocess
@@ -170,6 +171,30 @@ def test_push_file_io(mock_multipass, instance):
     ]
 
 
+def test_push_file_io_skip_if_unchanged(mock_multipass, instance):
+    digest = hashlib.sha256(b"foo").hexdigest()
+    mock_multipass.exec.return_value = subprocess.CompletedProcess(
+        [], 0, stdout=f"{digest}  /etc/test.conf\n".encode()
+    )
+
+    instance.push_file_io(
+        destination=pathlib.Path("/etc/test.conf"),
+        content=io.BytesIO(b"foo"),
+        file_mode="0644",
+        skip_if_unchanged=True,
+    )
+
+    assert mock_multipass.mock_calls == [
+        mock.call.exec(
+            instance_name="test-instance",
+            command=["sudo", "-H", "--", "sha256sum", "--", "/etc/test.conf"],
+            runner=subprocess.run,
+            capture_output=True,
+            check=False,
+        ),
+    ]
+
+
 def test_push_file_io_error(mock_multipass, instance):
     error = subprocess.CalledProcessError(-1, ["mktemp"], "test stdout", "test stderr")
 
@@ -15,10 +15,28 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 #
 
+import io
+import os
+import pathlib
 import shutil
+import subprocess
+import tarfile
+import types
+from unittest import mock
 
 import pytest
 
+from craft_providers import Executor, FileContent, ProviderError
+
+# Command run in the environment by pull_tree() of "/root/tree".
+PULL_TREE_COMMAND = [
+    "sh",
+    "-c",
+    '[ -d "$1" ] || exit 66; cd -- "$1" && exec tar -c -f - .',
+    "sh",
+    "/root/tree",
+]
+
 
 @pytest.fixture
 def fake_executor_local_pull(fake_executor):
@@ -31,6 +49,30 @@ def fake_executor_local_pull(fake_executor):
     return fake_executor
 
 
+@pytest.fixture
+def fake_executor_local_popen(fake_executor):
+    """Provide an executor that runs commands locally on 'popen'."""
+
+    def popen(command, **kwargs):
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            command, **kwargs
+        )
+
+    fake_executor.execute_popen = popen
+    return fake_executor
+
+
+@pytest.fixture
+def source_tree(tmp_path):
+    source = tmp_path / "source"
+    (source / "dir" / "subdir").mkdir(parents=True)
+    (source / "file.txt").write_text("file")
+    (source / "dir" / "subdir" / "nested.txt").write_text("nested")
+    (source / "dir" / "excluded.pyc").write_text("excluded")
+    (source / "link").symlink_to("file.txt")
+    return source
+
+
 def test_temporarypull_ok(monkeypatch, tmp_path, fake_executor_local_pull):
     """Successful case."""
     # change dir so the temp file is created in a temp dir
@@ -95,3 +137,267 @@ def test_temporarypull_temp_file_cleaned(
 
     # file is removed afterwards
     assert not localfilepath.exists()  # pyright: ignore [reportUnboundVariable]
+
+
+def test_push_tree(tmp_path, fake_executor_local_popen, source_tree):
+    destination = tmp_path / "destination" / "tree"
+
+    fake_executor_local_popen.push_tree(source=source_tree, destination=destination)
+
+    assert (destination / "file.txt").read_text() == "file"
+    assert (destination / "dir" / "subdir" / "nested.txt").read_text() == "nested"
+    assert (destination / "dir" / "excluded.pyc").exists()
+    assert (destination / "link").is_symlink()
+    assert os.readlink(destination / "link") == "file.txt"
+
+
+def test_push_tree_exclude(tmp_path, fake_executor_local_popen, source_tree):
+    destination = tmp_path / "destination"
+    excluded = []
+
+    def exclude(path):
+        excluded.append(path)
+        return path.suffix == ".pyc" or path == pathlib.PurePosixPath("dir/subdir")
+
+    fake_executor_local_popen.push_tree(
+        source=source_tree, destination=destination, exclude=exclude
+    )
+
+    assert sorted(
+        p.relative_to(destination).as_posix() for p in destination.rglob("*")
+    ) == [
+        "dir",
+        "file.txt",
+        "link",
+    ]
+    assert pathlib.PurePosixPath("dir/subdir/nested.txt") not in excluded
+
+
+def test_push_tree_missing_source(tmp_path, fake_executor_local_popen):
+    source = tmp_path / "missing"
+
+    with pytest.raises(FileNotFoundError) as exc_info:
+        fake_executor_local_popen.push_tree(
+            source=source, destination=tmp_path / "destination"
+        )
+
+    assert str(exc_info.value) == f"Directory not found: {str(source)!r}"
+
+
+def test_push_tree_error(tmp_path, fake_executor_local_popen, source_tree):
+    destination = tmp_path / "destination"
+    destination.write_text("not a directory")
+
+    with pytest.raises(ProviderError) as exc_info:
+        fake_executor_local_popen.push_tree(source=source_tree, destination=destination)
+
+    assert exc_info.value.brief == (
+        f"Failed to push directory {str(source_tree)!r} to {destination.as_posix()!r}."
+    )
+    assert "mkdir" in str(exc_info.value.details)
+
+
+def test_pull_tree(tmp_path, fake_executor_local_popen, source_tree):
+    destination = tmp_path / "destination" / "tree"
+
+    fake_executor_local_popen.pull_tree(source=source_tree, destination=destination)
+
+    assert (destination / "file.txt").read_text() == "file"
+    assert (destination / "dir" / "subdir" / "nested.txt").read_text() == "nested"
+    assert (destination / "dir" / "excluded.pyc").exists()
+    assert os.readlink(destination / "link") == "file.txt"
+
+
+def test_pull_tree_include_globs(tmp_path, fake_executor_local_popen, source_tree):
+    destination = tmp_path / "destination"
+
+    fake_executor_local_popen.pull_tree(
+        source=source_tree, destination=destination, include_globs=["*.txt", "*/subdir"]
+    )
+
+    assert sorted(
+        p.relative_to(destination).as_posix() for p in destination.rglob("*")
+    ) == ["dir", "dir/subdir", "dir/subdir/nested.txt", "file.txt"]
+
+
+def test_pull_tree_include_globs_no_match(
+    tmp_path, fake_executor_local_popen, source_tree
+):
+    destination = tmp_path / "destination"
+
+    fake_executor_local_popen.pull_tree(
+        source=source_tree, destination=destination, include_globs=["*.snap"]
+    )
+
+    assert list(destination.iterdir()) == []
+
+
+def test_pull_tree_missing_source(tmp_path, fake_executor_local_popen):
+    source = tmp_path / "missing"
+
+    with pytest.raises(FileNotFoundError) as exc_info:
+        fake_executor_local_popen.pull_tree(
+            source=source, destination=tmp_path / "destination"
+        )
+
+    assert str(exc_info.value) == f"Directory not found: {source.as_posix()!r}"
+
+
+def test_pull_tree_error(tmp_path, fake_executor):
+    def popen(command, **kwargs):
+        assert command == PULL_TREE_COMMAND
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            ["sh", "-c", "echo failed >&2; exit 2"], **kwargs
+        )
+
+    fake_executor.execute_popen = popen
+
+    with pytest.raises(ProviderError) as exc_info:
+        fake_executor.pull_tree(
+            source=pathlib.PurePosixPath("/root/tree"),
+            destination=tmp_path / "destination",
+        )
+
+    assert exc_info.value.brief == (
+        f"Failed to pull directory '/root/tree' to {str(tmp_path / 'destination')!r}."
+    )
+    assert "failed" in str(exc_info.value.details)
+
+
+def test_pull_tree_command_error(tmp_path, fake_executor, source_tree):
+    def popen(command, **kwargs):
+        assert command == PULL_TREE_COMMAND
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            ["sh", "-c", f"tar -c -f - -C {source_tree} .; exit 2"], **kwargs
+        )
+
+    fake_executor.execute_popen = popen
+
+    with pytest.raises(ProviderError) as exc_info:
+        fake_executor.pull_tree(
+            source=pathlib.PurePosixPath("/root/tree"),
+            destination=tmp_path / "destination",
+        )
+
+    assert "* Command exit code: 2" in str(exc_info.value.details)
+
+
+@pytest.mark.parametrize(
+    "name,linkname",
+    [("../escape", None), ("/etc/escape", None), ("link", "../../escape")],
+)
+def test_pull_tree_unsafe_member(tmp_path, fake_executor, name, linkname):
+    archive = tmp_path / "archive.tar"
+    with tarfile.open(archive, "w") as tar:
+        member = tarfile.TarInfo(name)
+        if linkname is not None:
+            member.type = tarfile.SYMTYPE
+            member.linkname = linkname
+        tar.addfile(member, io.BytesIO(b""))
+
+    def popen(command, **kwargs):
+        assert command == PULL_TREE_COMMAND
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            ["cat", str(archive)], **kwargs
+        )
+
+    fake_executor.execute_popen = popen
+    destination = tmp_path / "destination"
+
+    with pytest.raises(ProviderError) as exc_info:
+        fake_executor.pull_tree(
+            source=pathlib.PurePosixPath("/root/tree"), destination=destination
+        )
+
+    assert exc_info.value.brief == (
+        f"Refusing to extract unsafe archive member {name!r}."
+    )
+    assert list(destination.iterdir()) == []
+
+
+@pytest.fixture
+def fake_executor_local_root(fake_executor, tmp_path):
+    """Provide an executor that runs commands locally, rooted in tmp_path."""
+    root = tmp_path / "root"
+
+    def popen(command, **kwargs):
+        assert command[-1] == "/"
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            [*command[:-1], str(root)], **kwargs
+        )
+
+    fake_executor.execute_popen = popen
+    # Use the real implementation rather than the fake's recording one.
+    fake_executor.push_files_io = types.MethodType(
+        Executor.push_files_io, fake_executor
+    )
+    fake_executor.root = root
+    return fake_executor
+
+
+def test_push_files_io(fake_executor_local_root):
+    owner = str(os.getuid())
+    group = str(os.getgid())
+
+    fake_executor_local_root.push_files_io(
+        [
+            FileContent(
+                destination=pathlib.PurePosixPath("/etc/foo.conf"),
+                content=io.BytesIO(b"foo"),
+                file_mode="0644",
+                user=owner,
+                group=group,
+            ),
+            FileContent(
+                destination=pathlib.PurePosixPath("/etc/new/bar.conf"),
+                content=io.BytesIO(b"bar"),
+                file_mode="0600",
+                user=owner,
+                group=group,
+            ),
+        ]
+    )
+
+    root = fake_executor_local_root.root
+    assert (root / "etc" / "foo.conf").read_bytes() == b"foo"
+    assert (root / "etc" / "foo.conf").stat().st_mode & 0o777 == 0o644
+    assert (root / "etc" / "new" / "bar.conf").read_bytes() == b"bar"
+    assert (root / "etc" / "new" / "bar.conf").stat().st_mode & 0o777 == 0o600
+
+
+def test_push_files_io_empty(fake_executor_local_root):
+    fake_executor_local_root.execute_popen = mock.Mock()
+
+    fake_executor_local_root.push_files_io([])
+
+    assert fake_executor_local_root.execute_popen.mock_calls == []
+
+
+def test_push_files_io_error(fake_executor_local_root):
+    def popen(command, **kwargs):
+        assert command == [
+            "sh",
+            "-c",
+            'mkdir -p -- "$1" && exec tar -x -f - -C "$1"',
+            "sh",
+            "/",
+        ]
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            ["sh", "-c", "cat >/dev/null; echo failed >&2; exit 2"], **kwargs
+        )
+
+    fake_executor_local_root.execute_popen = popen
+
+    with pytest.raises(ProviderError) as exc_info:
+        fake_executor_local_root.push_files_io(
+            [
+                FileContent(
+                    destination=pathlib.PurePosixPath("/etc/foo.conf"),
+                    content=io.BytesIO(b"foo"),
+                    file_mode="0644",
+                )
+            ]
+        )
+
+    assert exc_info.value.brief == "Failed to create files ['/etc/foo.conf']."
+    assert "failed" in str(exc_info.value.details)
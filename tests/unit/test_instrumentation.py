@@ -0,0 +1,420 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+import logging
+import subprocess
+import threading
+from unittest import mock
+
+import pytest
+
+from craft_providers import instrumentation
+from craft_providers.instrumentation import (
+    CommandTiming,
+    Span,
+    SpanLogger,
+    SpanRecorder,
+    TimingCollector,
+)
+
+
+@pytest.fixture
+def timings():
+    recorded = []
+    instrumentation.add_hook(recorded.append)
+
+    yield recorded
+
+    instrumentation.remove_hook(recorded.append)
+
+
+def _timing(subcommand="launch", duration=0.1, returncode=0, output_bytes=0):
+    return CommandTiming(
+        provider="lxc",
+        subcommand=subcommand,
+        project="default",
+        remote="local",
+        duration=duration,
+        returncode=returncode,
+        output_bytes=output_bytes,
+    )
+
+
+def test_timed_run(fake_process, timings):
+    fake_process.register_subprocess(["lxc", "list"], stdout="out", stderr="err!")
+
+    proc = instrumentation.timed_run(
+        subprocess.run,
+        ["lxc", "list"],
+        provider="lxc",
+        subcommand="list",
+        project="test-project",
+        remote="test-remote",
+        capture_output=True,
+    )
+
+    assert proc.stdout == b"out"
+    assert len(timings) == 1
+    assert timings[0].provider == "lxc"
+    assert timings[0].subcommand == "list"
+    assert timings[0].project == "test-project"
+    assert timings[0].remote == "test-remote"
+    assert timings[0].returncode == 0
+    assert timings[0].output_bytes == 7
+    assert timings[0].duration >= 0
+
+
+def test_timed_run_error(fake_process, timings):
+    fake_process.register_subprocess(["lxc", "list"], stderr="error", returncode=2)
+
+    with pytest.raises(subprocess.CalledProcessError):
+        instrumentation.timed_run(
+            subprocess.run,
+            ["lxc", "list"],
+            provider="lxc",
+            subcommand="list",
+            capture_output=True,
+            check=True,
+        )
+
+    assert timings[0].returncode == 2
+    assert timings[0].output_bytes == 5
+
+
+def test_timed_run_popen(fake_process, timings):
+    fake_process.register_subprocess(["lxc", "exec"])
+
+    process = instrumentation.timed_run(
+        subprocess.Popen, ["lxc", "exec"], provider="lxc", subcommand="exec"
+    )
+    process.wait()
+
+    assert timings[0].returncode is None
+    assert timings[0].output_bytes == 0
+
+
+def test_timed_run_no_hooks():
+    runner = mock.Mock()
+
+    result = instrumentation.timed_run(
+        runner, ["lxc", "list"], provider="lxc", subcommand="list", check=True
+    )
+
+    assert result == runner.return_value
+    assert runner.mock_calls == [mock.call(["lxc", "list"], check=True)]
+
+
+def test_timed_run_failing_hook(fake_process, timings, logs):
+    def failing_hook(timing):
+        raise RuntimeError("broken")
+
+    fake_process.register_subprocess(["lxc", "list"])
+    instrumentation.add_hook(failing_hook)
+    try:
+        instrumentation.timed_run(
+            subprocess.run, ["lxc", "list"], provider="lxc", subcommand="list"
+        )
+    finally:
+        instrumentation.remove_hook(failing_hook)
+
+    assert len(timings) == 1
+    assert "Instrumentation hook" in logs.error
+
+
+def test_collector():
+    collector = TimingCollector(buckets=(0.1, 1.0))
+
+    collector(_timing(duration=0.05, output_bytes=10))
+    collector(_timing(duration=0.5, returncode=1))
+    collector(_timing(duration=5.0))
+    collector(_timing(subcommand="list", duration=0.01))
+
+    histograms = collector.histograms
+    launch = histograms[("lxc", "launch")]
+    assert launch.counts == [1, 1, 1]
+    assert launch.count == 3
+    assert launch.total == pytest.approx(5.55)
+    assert launch.mean == pytest.approx(1.85)
+    assert launch.minimum == 0.05
+    assert launch.maximum == 5.0
+    assert launch.failures == 1
+    assert launch.output_bytes == 10
+    assert histograms[("lxc", "list")].counts == [1, 0, 0]
+
+
+def test_collector_histograms_are_copies():
+    collector = TimingCollector()
+    collector(_timing())
+
+    collector.histograms[("lxc", "launch")].counts[0] = 100
+
+    assert sum(collector.histograms[("lxc", "launch")].counts) == 1
+
+
+def test_collector_reset():
+    collector = TimingCollector()
+    collector(_timing())
+
+    collector.reset()
+
+    assert collector.histograms == {}
+
+
+def test_collector_report():
+    collector = TimingCollector()
+    collector(_timing(subcommand="list", duration=0.5))
+    collector(_timing(subcommand="launch", duration=2.0))
+
+    lines = collector.report().splitlines()
+
+    assert lines[0].split() == [
+        "operation",
+        "count",
+        "total",
+        "mean",
+        "min",
+        "max",
+        "failed",
+    ]
+    assert lines[1].split() == [
+        "lxc",
+        "launch",
+        "1",
+        "2.000s",
+        "2.000s",
+        "2.000s",
+        "2.000s",
+        "0",
+    ]
+    assert lines[2].split()[:2] == ["lxc", "list"]
+
+
+@pytest.fixture
+def spans():
+    recorded = []
+    instrumentation.add_span_sink(recorded.append)
+
+    yield recorded
+
+    instrumentation.remove_span_sink(recorded.append)
+
+
+def _span(name, parents=(), start=0.0, duration=0.1, error=None):
+    return Span(
+        name=name,
+        parents=parents,
+        start=start,
+        duration=duration,
+        error=error,
+        thread="MainThread",
+    )
+
+
+def test_span(spans):
+    with instrumentation.span("launch"):
+        with instrumentation.span("setup"):
+            pass
+
+    assert [(span.name, span.parents) for span in spans] == [
+        ("setup", ("launch",)),
+        ("launch", ()),
+    ]
+    assert spans[0].path == ("launch", "setup")
+    assert spans[1].duration >= spans[0].duration
+    assert spans[1].start <= spans[0].start
+    assert spans[1].error is None
+    assert spans[1].thread == threading.current_thread().name
+
+
+def test_span_error(spans):
+    with pytest.raises(RuntimeError):
+        with instrumentation.span("launch"):
+            raise RuntimeError("broken")
+
+    with instrumentation.span("setup"):
+        pass
+
+    assert [(span.name, span.parents, span.error) for span in spans] == [
+        ("launch", (), "RuntimeError"),
+        ("setup", (), None),
+    ]
+
+
+def test_span_threads(spans):
+    """Spans are only nested within those of the same thread."""
+
+    def run():
+        with instrumentation.span("setup"):
+            pass
+
+    with instrumentation.span("launch"):
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+
+    assert [(span.name, span.parents) for span in spans] == [
+        ("setup", ()),
+        ("launch", ()),
+    ]
+    assert spans[0].thread != spans[1].thread
+
+
+def test_span_no_sinks():
+    instrumentation.remove_span_sink(instrumentation.span_recorder)
+    try:
+        with instrumentation.span("launch"):
+            pass
+    finally:
+        instrumentation.add_span_sink(instrumentation.span_recorder)
+
+    assert not hasattr(instrumentation._span_stack, "names") or (
+        instrumentation._span_stack.names == []
+    )
+
+
+def test_span_failing_sink(spans, logs):
+    def failing_sink(span):
+        raise RuntimeError("broken")
+
+    instrumentation.add_span_sink(failing_sink)
+    try:
+        with instrumentation.span("launch"):
+            pass
+    finally:
+        instrumentation.remove_span_sink(failing_sink)
+
+    assert len(spans) == 1
+    assert "Instrumentation span sink" in logs.error
+
+
+def test_traced(spans):
+    @instrumentation.traced("launch")
+    def launch(name, *, image):
+        """Launch instance."""
+        return (name, image)
+
+    assert launch("test-instance", image="22.04") == ("test-instance", "22.04")
+    assert launch.__doc__ == "Launch instance."
+    assert [span.name for span in spans] == ["launch"]
+
+
+def test_recorder():
+    recorder = SpanRecorder()
+
+    recorder(_span("setup"))
+    recorder(_span("launch"))
+
+    assert [span.name for span in recorder.spans] == ["setup", "launch"]
+
+    recorder.spans.clear()
+    assert len(recorder.spans) == 2
+
+    recorder.reset()
+    assert recorder.spans == []
+
+
+def test_recorder_report():
+    recorder = SpanRecorder()
+    recorder(_span("apt", parents=("launch", "setup"), start=2.0, duration=1.0))
+    recorder(_span("files", parents=("launch", "setup"), start=1.0, duration=0.5))
+    recorder(_span("setup", parents=("launch",), start=1.0, duration=2.0))
+    recorder(_span("publish", parents=("launch",), start=3.0, duration=3.0))
+    recorder(_span("launch", start=0.0, duration=6.0))
+    recorder(_span("launch", start=10.0, duration=2.0, error="LXDError"))
+
+    lines = recorder.report().splitlines()
+
+    assert lines[0].split() == ["phase", "count", "total", "mean", "max", "failed"]
+    assert [line.split() for line in lines[1:]] == [
+        ["launch", "2", "8.000s", "4.000s", "6.000s", "1"],
+        ["setup", "1", "2.000s", "2.000s", "2.000s", "0"],
+        ["files", "1", "0.500s", "0.500s", "0.500s", "0"],
+        ["apt", "1", "1.000s", "1.000s", "1.000s", "0"],
+        ["publish", "1", "3.000s", "3.000s", "3.000s", "0"],
+    ]
+    assert lines[2].startswith("  setup")
+    assert lines[3].startswith("    files")
+
+
+def test_span_recorder_default():
+    instrumentation.span_recorder.reset()
+    try:
+        with instrumentation.span("launch"):
+            with instrumentation.span("setup"):
+                pass
+
+        spans = instrumentation.span_recorder.spans
+        lines = instrumentation.span_recorder.report().splitlines()
+    finally:
+        instrumentation.span_recorder.reset()
+
+    assert [(span.name, span.parents) for span in spans] == [
+        ("setup", ("launch",)),
+        ("launch", ()),
+    ]
+    assert lines[0].split() == ["phase", "count", "total", "mean", "max", "failed"]
+    assert lines[1].split()[:2] == ["launch", "1"]
+    assert lines[2].split()[:2] == ["setup", "1"]
+    assert instrumentation.span_recorder.spans == []
+
+
+def test_span_logger_not_default(caplog):
+    with caplog.at_level(logging.DEBUG, logger="craft_providers.instrumentation"):
+        with instrumentation.span("launch"):
+            pass
+
+    assert caplog.records == []
+
+
+def test_span_logger(caplog):
+    span_logger = SpanLogger()
+
+    with caplog.at_level(logging.DEBUG, logger="craft_providers.instrumentation"):
+        span_logger(_span("setup", parents=("launch",)))
+        assert caplog.records == []
+
+        span_logger(_span("launch"))
+        span_logger(_span("warmup"))
+
+    assert [record.getMessage().splitlines()[0] for record in caplog.records] == [
+        "Timing of launch:",
+        "Timing of warmup:",
+    ]
+    assert [
+        line.split()[0] for line in caplog.records[0].getMessage().splitlines()[2:]
+    ] == ["launch", "setup"]
+    assert [
+        line.split()[0] for line in caplog.records[1].getMessage().splitlines()[2:]
+    ] == ["warmup"]
+
+
+def test_span_logger_threads(caplog):
+    """Spans of other threads are not included in the report."""
+    span_logger = SpanLogger()
+
+    def run():
+        span_logger(_span("setup", parents=("launch",)))
+
+    with caplog.at_level(logging.DEBUG, logger="craft_providers.instrumentation"):
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        span_logger(_span("launch"))
+
+    assert [
+        line.split()[0] for line in caplog.records[0].getMessage().splitlines()[2:]
+    ] == ["launch"]
@@ -0,0 +1,106 @@
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+import threading
+from unittest import mock
+
+import pytest
+
+from craft_providers import Base, LaunchResult, LaunchSpec, ProviderError, parallel
+
+
+@pytest.fixture
+def specs():
+    base_configuration = mock.Mock(spec=Base)
+    yield [
+        LaunchSpec(
+            name=f"test-instance-{i}",
+            base_configuration=base_configuration,
+            image_name="22.04",
+        )
+        for i in range(4)
+    ]
+
+
+def test_launch_many(specs):
+    instances = {spec.name: mock.Mock() for spec in specs}
+
+    results = parallel.launch_many(specs, lambda spec: instances[spec.name])
+
+    assert results == [
+        LaunchResult(spec=spec, instance=instances[spec.name]) for spec in specs
+    ]
+
+
+def test_launch_many_max_workers(specs):
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+    barrier = threading.Barrier(2, timeout=10)
+
+    def launcher(_spec):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        # Both workers must be running at once to pass the barrier.
+        barrier.wait()
+        with lock:
+            running -= 1
+        return mock.Mock()
+
+    results = parallel.launch_many(specs, launcher, max_workers=2)
+
+    assert peak == 2
+    assert all(result.error is None for result in results)
+
+
+def test_launch_many_errors(specs):
+    error = ProviderError(brief="Failed to launch.")
+
+    def launcher(spec):
+        if spec.name == "test-instance-1":
+            raise error
+        return mock.Mock()
+
+    results = parallel.launch_many(specs, launcher)
+
+    assert [result.error for result in results] == [None, error, None, None]
+    assert [result.instance is None for result in results] == [
+        False,
+        True,
+        False,
+        False,
+    ]
+    assert not any(result.cancelled for result in results)
+
+
+def test_launch_many_fail_fast(specs):
+    error = ProviderError(brief="Failed to launch.")
+    launched = []
+
+    def launcher(spec):
+        if spec.name == "test-instance-0":
+            raise error
+        launched.append(spec.name)
+        return mock.Mock()
+
+    results = parallel.launch_many(specs, launcher, max_workers=1, fail_fast=True)
+
+    assert results[0] == LaunchResult(spec=specs[0], error=error)
+    assert launched == []
+    assert all(result.cancelled for result in results[1:])
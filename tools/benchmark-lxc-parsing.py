@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+
+"""Compare parse times of lxc query output in the formats it can be read.
+
+Generates output resembling `lxc list` and `lxc image list` for many
+instances and images, then times parsing it as YAML with the pure Python
+loader, as YAML with the libyaml loader and as JSON.
+"""
+
+import argparse
+import json
+import timeit
+
+import yaml
+
+
+def make_instances(count):
+    """Make instance list entries shaped like those of lxc list."""
+    return [
+        {
+            "name": f"instance-{i}",
+            "status": "Running",
+            "type": "container",
+            "architecture": "x86_64",
+            "created_at": "2022-06-01T12:00:00.123456789Z",
+            "config": {
+                "image.os": "ubuntu",
+                "image.release": "jammy",
+                "volatile.base_image": "a" * 64,
+                "volatile.eth0.hwaddr": "00:16:3e:00:00:00",
+            },
+            "devices": {"root": {"path": "/", "pool": "default", "type": "disk"}},
+            "profiles": ["default"],
+            "state": {
+                "status": "Running",
+                "pid": 1000 + i,
+                "processes": 42,
+                "memory": {"usage": 123456789, "usage_peak": 0},
+                "network": {
+                    "eth0": {
+                        "addresses": [
+                            {"family": "inet", "address": "10.0.0.1", "netmask": "24"}
+                        ],
+                        "counters": {"bytes_received": 1234, "bytes_sent": 5678},
+                    }
+                },
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def make_images(count):
+    """Make image list entries shaped like those of lxc image list."""
+    return [
+        {
+            "aliases": [{"name": f"snapshot-image-{i}", "description": ""}],
+            "architecture": "x86_64",
+            "fingerprint": f"{i:064x}",
+            "filename": f"image-{i}.tar.xz",
+            "size": 123456789,
+            "public": False,
+            "properties": {"description": f"Image {i}", "os": "ubuntu"},
+            "created_at": "2022-06-01T12:00:00Z",
+            "uploaded_at": "2022-06-01T12:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    """Print parse times of generated lxc output."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fixtures = {
+        "list": make_instances(args.count),
+        "image list": make_images(args.count),
+    }
+    loaders = {
+        "yaml (BaseLoader)": lambda data: yaml.load(data, Loader=yaml.BaseLoader),
+        "yaml (CBaseLoader)": lambda data: yaml.load(data, Loader=yaml.CBaseLoader),
+        "json": json.loads,
+    }
+
+    for name, fixture in fixtures.items():
+        outputs = {
+            "yaml": yaml.safe_dump(fixture).encode(),
+            "json": json.dumps(fixture).encode(),
+        }
+        print(f"lxc {name}, {args.count} entries:")
+        for loader_name, loader in loaders.items():
+            data = outputs[loader_name.split()[0]]
+            seconds = min(
+                timeit.repeat(lambda: loader(data), number=1, repeat=args.repeat)
+            )
+            print(f"  {loader_name:<20} {seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()